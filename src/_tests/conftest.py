@@ -9,8 +9,12 @@ def enable_db_access_for_all_tests(db):
 
 
 pytest_plugins = [
+    '_tests.fixtures.bybit',
     '_tests.fixtures.clients',
     '_tests.fixtures.finances',
+    '_tests.fixtures.metrics',
+    '_tests.fixtures.positions',
+    '_tests.fixtures.redis',
 ]
 
 
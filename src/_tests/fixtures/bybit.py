@@ -0,0 +1,177 @@
+import pytest
+
+from typing import Any, Callable, Iterator
+from unittest.mock import Mock
+
+from apps.bybit.connections import bybit_clients, public_bybit
+from apps.bybit.models import ByBitAccess
+from apps.bybit.standin import StandInConfig, StandInHTTPServer
+from apps.users.models import User
+
+
+def get_instrument_data(
+    base_coin: str,
+    quote_coin: str = 'USDT',
+    is_pre_listing: bool = False,
+    symbol: str | None = None,
+    tick_size: str = '0.10',
+    qty_step: str = '0.001',
+) -> dict[str, Any]:
+    return {
+        'symbol': symbol or f'{base_coin}{quote_coin}',
+        'baseCoin': base_coin,
+        'quoteCoin': quote_coin,
+        'status': 'Trading',
+        'isPreListing': is_pre_listing,
+        'launchTime': '1584230400000',
+        'priceFilter': {'minPrice': '0.10', 'maxPrice': '1999999.80', 'tickSize': tick_size},
+        'lotSizeFilter': {'maxOrderQty': '1190.000', 'minOrderQty': qty_step, 'qtyStep': qty_step},
+        'leverageFilter': {'minLeverage': '1', 'maxLeverage': '100.00', 'leverageStep': '0.01'},
+    }
+
+
+def get_instruments_page(
+    instruments: list[dict[str, Any]], next_page_cursor: str = '', category: str = 'linear'
+) -> dict[str, Any]:
+    return {
+        'retCode': 0,
+        'retMsg': 'OK',
+        'result': {'category': category, 'list': instruments, 'nextPageCursor': next_page_cursor},
+    }
+
+
+@pytest.fixture
+def bybit_instruments_api(mocker) -> Callable[..., Any]:
+    """
+    Подменяет запрос списка инструментов Bybit постраничными ответами.
+
+    Принимает страницы по категориям, например: `linear=[[...], [...]]`, каждая страница - список
+    инструментов или исключение, которое выбросит запрос страницы. Страницы связываются курсорами,
+    а ответ выбирается по категории и курсору запроса и фильтруется по `baseCoin`, как это делает API:
+    без `baseCoin` опционы отдаются только на BTC. Для категорий без страниц
+    возвращается пустой список. Возвращает мок для проверки вызовов.
+    """
+
+    def patch(**categories: list[list[dict[str, Any]] | Exception]) -> Any:
+        responses: dict[tuple[str, str | None], dict[str, Any] | Exception] = {}
+        for category, pages in categories.items():
+            for index, instruments in enumerate(pages):
+                cursor = f'cursor-{index}' if index else None
+                next_page_cursor = f'cursor-{index + 1}' if index + 1 < len(pages) else ''
+                if isinstance(instruments, Exception):
+                    responses[(category, cursor)] = instruments
+                else:
+                    responses[(category, cursor)] = get_instruments_page(instruments, next_page_cursor, category)
+
+        def get_instruments_info(**params: Any) -> dict[str, Any]:
+            category = params['category']
+            response = responses.get((category, params.get('cursor')), get_instruments_page([], category=category))
+            if isinstance(response, Exception):
+                raise response
+            base_coin = params.get('baseCoin') or ('BTC' if category == 'option' else None)
+            if base_coin:
+                instruments = [item for item in response['result']['list'] if item['baseCoin'] == base_coin]
+                response = {**response, 'result': {**response['result'], 'list': instruments}}
+            return response
+
+        return mocker.patch.object(public_bybit, 'get_instruments_info', side_effect=get_instruments_info)
+
+    return patch
+
+
+def get_execution_data(symbol: str, exec_time: int, closed_size: str = '0', side: str = 'Buy') -> dict[str, Any]:
+    return {
+        'symbol': symbol,
+        'side': side,
+        'execType': 'Trade',
+        'execQty': '1',
+        'closedSize': closed_size,
+        'execTime': str(exec_time),
+    }
+
+
+def get_closed_pnl_data(
+    symbol: str, order_id: str, created_time: int, updated_time: int, side: str = 'Sell', closed_size: str = '1'
+) -> dict[str, Any]:
+    return {
+        'symbol': symbol,
+        'orderId': order_id,
+        'side': side,
+        'qty': closed_size,
+        'closedSize': closed_size,
+        'avgEntryPrice': '100',
+        'avgExitPrice': '110',
+        'closedPnl': '10',
+        'leverage': '10',
+        'createdTime': str(created_time),
+        'updatedTime': str(updated_time),
+    }
+
+
+def get_position_data(symbol: str, created_time: int, side: str = 'Buy', size: str = '1') -> dict[str, Any]:
+    return {
+        'symbol': symbol,
+        'positionIdx': 0,
+        'side': side,
+        'size': size,
+        'avgPrice': '100',
+        'leverage': '10',
+        'liqPrice': '91',
+        'takeProfit': '120',
+        'stopLoss': '0',
+        'trailingStop': '0',
+        'createdTime': str(created_time),
+        'updatedTime': str(created_time),
+    }
+
+
+@pytest.fixture
+def bybit_access(user: User) -> ByBitAccess:
+    return ByBitAccess.objects.create(user=user, key='key', secret='secret')
+
+
+@pytest.fixture
+def bybit_account_api(mocker) -> Callable[..., Mock]:
+    """
+    Подменяет клиент Bybit импорта сделок ответами со списками исполнений, закрытых и открытых позиций.
+
+    Исполнения и закрытые позиции отбираются по `startTime` и `endTime` запроса, как это делает API,
+    открытые позиции возвращаются для расчетной монеты USDT. Каждый вызов заменяет данные.
+    Возвращает мок клиента для проверки вызовов.
+    """
+    client = Mock()
+    mocker.patch('apps.bybit.services.celery.trades_importer.get_bybit_client', return_value=client)
+
+    def get_page(records: list[dict[str, Any]]) -> dict[str, Any]:
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'list': records, 'nextPageCursor': ''}}
+
+    def get_history(records: list[dict[str, Any]], time_field: str) -> Callable[..., dict[str, Any]]:
+        def get(**params: Any) -> dict[str, Any]:
+            start, end = params['startTime'], params['endTime']
+            return get_page([record for record in records if start <= int(record[time_field]) <= end])
+
+        return get
+
+    def patch(
+        executions: list[dict[str, Any]] | None = None,
+        closed_pnl: list[dict[str, Any]] | None = None,
+        positions: list[dict[str, Any]] | None = None,
+    ) -> Mock:
+        client.reset_mock()
+        client.get_executions.side_effect = get_history(executions or [], 'execTime')
+        client.get_closed_pnl.side_effect = get_history(closed_pnl or [], 'updatedTime')
+        client.get_positions.side_effect = lambda **params: get_page(
+            positions or [] if params['settleCoin'] == 'USDT' else []
+        )
+        return client
+
+    patch()
+    return patch
+
+
+@pytest.fixture
+def standin_server(request) -> Iterator[StandInHTTPServer]:
+    """Запускает сервер-заменитель Bybit и направляет на него клиенты, настройки передаются параметром фикстуры."""
+    config = getattr(request, 'param', None) or StandInConfig(instruments=25, page_size=10)
+    with StandInHTTPServer(config) as server, bybit_clients.override(server.url, None):
+        yield server
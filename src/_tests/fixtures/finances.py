@@ -1,21 +1,29 @@
 import pytest
 
+from decimal import Decimal
+
 from _tests import FixtureFactory
-from apps.accounting.models import FinancialAsset, TradingPair
+from apps.accounting.models import FinancialAsset, TradingPair, TradingPairSpec
 from apps.accounting.models.enums import AssetType, Exchange, MarketType
+from apps.accounting.resolvers import trading_pair_spec_cache
 
 
 def get_bybit_financial_asset_schema(
     factory: FixtureFactory, market: MarketType, exchange: Exchange, iterations: int = 10
 ) -> list[dict]:
-    return factory.schema(
+    schema = factory.schema(
         lambda: {
             'ticker': factory.field('word'),
             'type': AssetType.CURRENCY,
             'market': market,
             'exchange': exchange,
         },
+        iterations=iterations,
     ).create()
+    # Случайные слова могут повторяться, а тикер входит в уникальное ограничение актива.
+    for index, data in enumerate(schema):
+        data['ticker'] = f'{data["ticker"]}{index}'
+    return schema
 
 
 @pytest.fixture
@@ -70,3 +78,25 @@ def bybit_futures_trading_pairs(bybit_futures_financial_assets: list[FinancialAs
 @pytest.fixture
 def bybit_spot_trading_pairs(bybit_spot_financial_assets: list[FinancialAsset]) -> list[TradingPair]:
     return create_trading_pairs(bybit_spot_financial_assets)
+
+
+@pytest.fixture(autouse=True)
+def clear_trading_pair_spec_cache() -> None:
+    """Сбрасывает кэш торговых параметров в памяти процесса, чтобы тесты не видели параметры друг друга."""
+    trading_pair_spec_cache.clear()
+
+
+@pytest.fixture
+def bybit_futures_trading_pair_specs(bybit_futures_trading_pairs: list[TradingPair]) -> list[TradingPairSpec]:
+    specs = [
+        TradingPairSpec(
+            trading_pair=trading_pair,
+            tick_size=Decimal('0.05'),
+            qty_step=Decimal('0.1'),
+            min_order_qty=Decimal('0.5'),
+            max_order_qty=Decimal('1000'),
+            max_leverage=Decimal('50'),
+        )
+        for trading_pair in bybit_futures_trading_pairs
+    ]
+    return TradingPairSpec.objects.bulk_create(specs)
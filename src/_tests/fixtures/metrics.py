@@ -0,0 +1,13 @@
+import pytest
+
+from fakeredis import FakeRedis
+
+from apps.core.metrics import MetricsRegistry, metrics_registry
+
+
+@pytest.fixture(autouse=True)
+def metrics(mocker, redis: FakeRedis) -> MetricsRegistry:
+    """Выключает запись метрик в тестах и подменяет Redis реестра метрик на Redis теста."""
+    mocker.patch.object(metrics_registry, 'redis', redis)
+    mocker.patch.object(metrics_registry, 'enabled', False)
+    return metrics_registry
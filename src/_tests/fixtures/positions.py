@@ -0,0 +1,51 @@
+import pytest
+
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from apps.accounting.models import Position, PositionComment, TradingPair
+from apps.accounting.models.enums import PositionSide
+from apps.users.models import User
+
+POSITIONS_OPENED_AT = datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+def create_positions(user: User, trading_pairs: list[TradingPair], count: int) -> list[Position]:
+    """
+    Создает позиции пользователя по торговым парам по кругу.
+
+    Каждые две соседние позиции открыты в один и тот же момент, чтобы сортировка по `opened_at` имела повторы.
+    """
+    positions = [
+        Position(
+            user=user,
+            trading_pair=trading_pairs[index % len(trading_pairs)],
+            side=PositionSide.LONG if index % 2 else PositionSide.SHORT,
+            size=Decimal(index + 1),
+            entry_price=Decimal('100.5') + index,
+            leverage=Decimal(index % 5 + 1),
+            opened_at=POSITIONS_OPENED_AT + timedelta(hours=index // 2),
+        )
+        for index in range(count)
+    ]
+    return Position.objects.bulk_create(positions)
+
+
+@pytest.fixture
+def bybit_futures_positions(user: User, bybit_futures_trading_pairs: list[TradingPair]) -> list[Position]:
+    return create_positions(user, bybit_futures_trading_pairs, count=7)
+
+
+@pytest.fixture
+def bybit_futures_positions_with_comments(bybit_futures_positions: list[Position]) -> list[Position]:
+    """Позиции, у каждой из которых по несколько комментариев с разной датой создания."""
+    comments = PositionComment.objects.bulk_create(
+        PositionComment(position=position, comment=f'Комментарий {number}')
+        for position in bybit_futures_positions
+        for number in range(5)
+    )
+    for index, comment in enumerate(comments):
+        PositionComment.objects.filter(pk=comment.pk).update(
+            created_at=POSITIONS_OPENED_AT + timedelta(days=1, minutes=index)
+        )
+    return bybit_futures_positions
@@ -0,0 +1,22 @@
+import pytest
+
+from fakeredis import FakeRedis, FakeServer
+
+from apps.accounting.prices import mark_price_store
+from apps.accounting.resolvers import trading_pair_resolver
+from apps.bybit.connections import bybit_rate_limiter
+from apps.bybit.services.celery.trades_sync import trades_import_lock, trades_sync_lock
+
+
+@pytest.fixture(autouse=True)
+def redis(mocker) -> FakeRedis:
+    """Подменяет Redis во всех сервисах, которые его используют, на изолированный для теста экземпляр."""
+    client = FakeRedis(server=FakeServer())
+    mocker.patch.object(trading_pair_resolver, 'redis', client)
+    mocker.patch.object(bybit_rate_limiter, 'redis', client)
+    mocker.patch.object(trades_import_lock, 'redis', client)
+    mocker.patch.object(trades_sync_lock, 'redis', client)
+    mocker.patch.object(mark_price_store, 'redis', client)
+    trading_pair_resolver.clear()
+    trading_pair_resolver.reset_stats()
+    return client
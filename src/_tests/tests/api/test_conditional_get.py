@@ -0,0 +1,97 @@
+import pytest
+
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounting.models import Position, PositionComment, TradingPair
+from apps.accounting.prices import mark_price_store
+
+
+@pytest.mark.usefixtures('bybit_futures_trading_pairs')
+class TestTradingPairConditionalGet:
+    url_list = reverse('api:v1:accounting:trading-pair-list')
+
+    def test_not_modified(self, api_client: APIClient, django_assert_max_num_queries):
+        response = api_client.get(self.url_list)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['ETag']
+        assert 'Last-Modified' not in response.headers
+
+        with django_assert_max_num_queries(5):
+            response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=response.headers['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response.headers['ETag']
+
+    def test_if_modified_since(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        url = reverse('api:v1:accounting:trading-pair-detail', args=[bybit_futures_trading_pairs[0].pk])
+        response = api_client.get(url)
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_modified(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        etag = api_client.get(self.url_list).headers['ETag']
+        bybit_futures_trading_pairs[0].base_asset.save()
+        response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['ETag'] != etag
+
+    def test_etag_depends_on_filters(self, api_client: APIClient):
+        etag = api_client.get(self.url_list).headers['ETag']
+        response = api_client.get(self.url_list, {'traded': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['ETag'] != etag
+
+
+class TestPositionConditionalGet:
+    url_list = reverse('api:v1:accounting:position-list')
+
+    def test_retrieve_not_modified(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        url = reverse('api:v1:accounting:position-detail', args=[bybit_futures_positions[0].pk])
+        etag = api_client.get(url).headers['ETag']
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_comment_changes_etag(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        etag = api_client.get(self.url_list).headers['ETag']
+        assert api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+        PositionComment.objects.create(position=bybit_futures_positions[0], comment='Комментарий')
+        response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        etag = response.headers['ETag']
+        PositionComment.objects.all().delete()
+        response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_deletion_changes_etag(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        etag = api_client.get(self.url_list).headers['ETag']
+        Position.objects.filter(pk=bybit_futures_positions[-1].pk).delete()
+        response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_deletion_with_if_modified_since(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        Position.objects.update(is_closed=True)
+        response = api_client.get(self.url_list)
+        assert 'Last-Modified' not in response.headers
+        Position.objects.filter(pk=bybit_futures_positions[-1].pk).delete()
+        response = api_client.get(self.url_list, HTTP_IF_MODIFIED_SINCE=http_date())
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == len(bybit_futures_positions) - 1
+
+    def test_mark_prices_change_etag_of_open_positions(
+        self, api_client: APIClient, bybit_futures_positions: list[Position]
+    ):
+        response = api_client.get(self.url_list)
+        etag = response.headers['ETag']
+        assert 'Last-Modified' not in response.headers
+        trading_pair = bybit_futures_positions[0].trading_pair
+        mark_price_store.set_many({(trading_pair.symbol, trading_pair.market, trading_pair.exchange): ('1', 0)})
+        response = api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers['ETag'] != etag
+        Position.objects.update(is_closed=True)
+        etag = api_client.get(self.url_list).headers['ETag']
+        mark_price_store.set_many({(trading_pair.symbol, trading_pair.market, trading_pair.exchange): ('2', 0)})
+        assert api_client.get(self.url_list, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from _tests.fixtures.positions import create_positions
+from apps.accounting.models import Position, PositionComment, Tombstone, TradingPair
+from apps.accounting.tasks import prune_tombstones
+from apps.users.models import User
+
+
+class TestPositionDeltaSync:
+    url_list = reverse('api:v1:accounting:position-list')
+    url_deleted = reverse('api:v1:accounting:position-deleted')
+
+    def test_modified_since(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        since = timezone.now()
+        Position.objects.filter(pk=bybit_futures_positions[0].pk).update(modified_at=since + timedelta(seconds=1))
+        PositionComment.objects.create(position=bybit_futures_positions[1], comment='Комментарий')
+        response = api_client.get(self.url_list, {'modified_since': since.isoformat()})
+        assert response.status_code == status.HTTP_200_OK
+        ids = {position['id'] for position in response.data['results']}
+        assert ids == {bybit_futures_positions[0].pk, bybit_futures_positions[1].pk}
+
+    def test_deleted(
+        self,
+        api_client: APIClient,
+        bybit_futures_positions: list[Position],
+        bybit_futures_trading_pairs: list[TradingPair],
+    ):
+        other_user = User.objects.create_user(username='other_user', password='password123')
+        other_position = create_positions(other_user, bybit_futures_trading_pairs, count=1)[0]
+        since = timezone.now()
+        deleted_ids = [position.pk for position in bybit_futures_positions[:2]]
+        Position.objects.filter(pk__in=deleted_ids + [other_position.pk]).delete()
+
+        response = api_client.get(self.url_deleted, {'modified_since': since.isoformat()})
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(tombstone['id'] for tombstone in response.data) == sorted(deleted_ids)
+
+        response = api_client.get(self.url_deleted, {'modified_since': timezone.now().isoformat()})
+        assert response.data == []
+
+    def test_deleted_requires_modified_since(self, api_client: APIClient):
+        response = api_client.get(self.url_deleted)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_deleted_before_retention_requires_resync(self, api_client: APIClient):
+        since = timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS, minutes=1)
+        response = api_client.get(self.url_deleted, {'modified_since': since.isoformat()})
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_prune_tombstones(self, bybit_futures_positions: list[Position]):
+        old, recent = bybit_futures_positions[:2]
+        Position.objects.filter(pk__in=[old.pk, recent.pk]).delete()
+        Tombstone.objects.filter(object_id=old.pk).update(
+            deleted_at=timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS, minutes=1)
+        )
+        assert prune_tombstones() == 1
+        assert list(Tombstone.objects.values_list('object_id', flat=True)) == [recent.pk]
+
+    def test_sync_watermark(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        started_at = timezone.now()
+        response = api_client.get(self.url_list, {'modified_since': started_at.isoformat()})
+        watermark = datetime.fromisoformat(response['X-Sync-Watermark'])
+        margin = timedelta(seconds=settings.SYNC_WATERMARK_MARGIN)
+        assert started_at - margin <= watermark <= timezone.now() - margin
+        # Строка, дата изменения которой поставлена до запроса, а транзакция зафиксирована после него.
+        Position.objects.filter(pk=bybit_futures_positions[0].pk).update(modified_at=started_at - timedelta(seconds=1))
+        response = api_client.get(self.url_list, {'modified_since': watermark.isoformat()})
+        assert bybit_futures_positions[0].pk in {position['id'] for position in response.data['results']}
+        response = api_client.get(self.url_deleted, {'modified_since': watermark.isoformat()})
+        assert 'X-Sync-Watermark' in response
+
+
+class TestTradingPairDeltaSync:
+    url_list = reverse('api:v1:accounting:trading-pair-list')
+    url_deleted = reverse('api:v1:accounting:trading-pair-deleted')
+
+    def test_modified_since_and_deleted(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        since = timezone.now()
+        changed, deleted = bybit_futures_trading_pairs[:2]
+        changed.traded = False
+        changed.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        response = api_client.get(self.url_list, {'modified_since': since.isoformat()})
+        assert response.status_code == status.HTTP_200_OK
+        symbols = [pair['symbol'] for markets in response.data.values() for pairs in markets.values() for pair in pairs]
+        assert symbols == [changed.symbol]
+
+        response = api_client.get(self.url_deleted, {'modified_since': since.isoformat()})
+        assert [tombstone['id'] for tombstone in response.data] == [deleted_id]
+
+
+def test_asset_change_touches_trading_pairs(bybit_futures_trading_pairs: list[TradingPair]):
+    since = timezone.now()
+    bybit_futures_trading_pairs[0].quote_asset.save()
+    assert list(TradingPair.objects.filter(modified_at__gte=since)) == [bybit_futures_trading_pairs[0]]
@@ -0,0 +1,42 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounting.models import Position
+
+
+def get_savepoints(context: CaptureQueriesContext) -> list[str]:
+    return [query['sql'] for query in context.captured_queries if query['sql'].startswith('SAVEPOINT')]
+
+
+@pytest.mark.usefixtures('bybit_futures_positions')
+class TestNonAtomicReads:
+    url_list = reverse('api:v1:accounting:position-list')
+
+    def test_reads_are_not_atomic(self, api_client: APIClient):
+        position = Position.objects.first()
+        assert position is not None
+        urls = [
+            self.url_list,
+            reverse('api:v1:accounting:position-detail', args=[position.pk]),
+            reverse('api:v1:accounting:position-stats'),
+            reverse('api:v1:accounting:trading-pair-detail', args=[position.trading_pair_id]),
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                assert api_client.get(url).status_code == 200
+            assert not get_savepoints(context), url
+
+    def test_writes_are_atomic(self, api_client: APIClient):
+        position = Position.objects.first()
+        assert position is not None
+        url = reverse('api:v1:accounting:position-detail', args=[position.pk])
+        with CaptureQueriesContext(connection) as context:
+            assert api_client.patch(url, {'stop_loss': '1'}, format='json').status_code == 200
+        assert len(get_savepoints(context)) == 1
+        with CaptureQueriesContext(connection) as context:
+            api_client.post(f'{self.url_list}bulk/', [], format='json')
+        assert len(get_savepoints(context)) == 1
@@ -0,0 +1,82 @@
+import pytest
+
+import json
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounting.models import Position, TradingPair
+from apps.accounting.models.enums import Exchange, MarketType, PositionSide
+from apps.users.models import User
+
+
+def get_position_row(trading_pair: TradingPair, **kwargs) -> dict:
+    return {
+        'symbol': trading_pair.symbol,
+        'market': MarketType.FUTURES,
+        'exchange': Exchange.BYBIT,
+        'side': PositionSide.LONG,
+        'size': '1.5',
+        'entry_price': '100.25',
+        'leverage': '10',
+        'opened_at': '2025-05-10T10:00:00Z',
+    } | kwargs
+
+
+@pytest.mark.usefixtures('bybit_futures_trading_pairs')
+class TestPositionBulkCreate:
+    url = reverse('api:v1:accounting:position-bulk')
+
+    def test_anonymous_user(self, client: APIClient):
+        response = client.post(self.url, [], content_type='application/json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_json_array(
+        self,
+        api_client: APIClient,
+        user: User,
+        bybit_futures_trading_pairs: list[TradingPair],
+        django_assert_max_num_queries,
+    ):
+        rows = [get_position_row(trading_pair) for trading_pair in bybit_futures_trading_pairs]
+        rows.append(get_position_row(bybit_futures_trading_pairs[0], side='UP'))
+        rows.append(get_position_row(bybit_futures_trading_pairs[0], symbol='UNKNOWN'))
+        # Торговые параметры всех пар загружаются одним запросом.
+        with django_assert_max_num_queries(7):
+            response = api_client.post(self.url, rows, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == len(bybit_futures_trading_pairs)
+        assert response.data['failed'] == 2
+        results = response.data['results']
+        assert [result['index'] for result in results] == list(range(len(rows)))
+        assert 'side' in results[-2]['errors']
+        assert 'symbol' in results[-1]['errors']
+        created_ids = [result['id'] for result in results if 'id' in result]
+        positions = Position.objects.filter(pk__in=created_ids, user=user)
+        assert positions.count() == len(bybit_futures_trading_pairs)
+        assert {position.trading_pair for position in positions} == set(bybit_futures_trading_pairs)
+
+    def test_ndjson(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        rows = [get_position_row(trading_pair) for trading_pair in bybit_futures_trading_pairs]
+        body = '\n'.join(json.dumps(row) for row in rows) + '\n'
+        response = api_client.post(self.url, body, content_type='application/x-ndjson')
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['created'] == len(rows)
+        assert response.data['failed'] == 0
+
+    def test_invalid_ndjson(self, api_client: APIClient):
+        response = api_client.post(self.url, '{"symbol": \n', content_type='application/x-ndjson')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_all_rows_invalid(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        rows = [get_position_row(bybit_futures_trading_pairs[0], size='abc')]
+        response = api_client.post(self.url, rows, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['created'] == 0
+        assert not Position.objects.exists()
+
+    @pytest.mark.parametrize('body', [{}, []])
+    def test_not_a_list(self, api_client: APIClient, body):
+        response = api_client.post(self.url, body, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,70 @@
+from typing import Any
+
+from django.core.management import call_command
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounting.api.serializers.positions import (
+    PositionCommentSerializer,
+    PositionFastReadSerializer,
+    PositionReadSerializer,
+)
+from apps.accounting.models import Position
+from apps.core.serializers import CompiledSerializerMixin
+
+
+class CommentTextSerializer(PositionCommentSerializer):
+    def to_representation(self, instance: Any) -> Any:
+        return instance.comment
+
+
+class CommentCountListSerializer(serializers.ListSerializer):
+    def to_representation(self, data: Any) -> Any:
+        return len(data.all())
+
+
+class CountedCommentSerializer(PositionCommentSerializer):
+    class Meta(PositionCommentSerializer.Meta):
+        list_serializer_class = CommentCountListSerializer
+
+
+class OverriddenNestedSerializer(serializers.ModelSerializer):
+    comments = CommentTextSerializer(many=True, read_only=True)
+    comment_count = CountedCommentSerializer(source='comments', many=True, read_only=True)
+
+    class Meta:
+        model = Position
+        fields = ['id', 'comments', 'comment_count']
+
+
+class FastOverriddenNestedSerializer(CompiledSerializerMixin, OverriddenNestedSerializer):
+    pass
+
+
+def test_fast_read_serializer_output_is_identical(bybit_futures_positions_with_comments: list[Position]):
+    position = bybit_futures_positions_with_comments[0]
+    position.stop_loss = None
+    position.closed_at = position.opened_at
+    position.save()
+    positions = list(Position.objects.with_select_related().with_commets())
+    renderer = JSONRenderer()
+    assert renderer.render(PositionFastReadSerializer(positions, many=True).data) == renderer.render(
+        PositionReadSerializer(positions, many=True).data
+    )
+    assert renderer.render(PositionFastReadSerializer(positions[0]).data) == renderer.render(
+        PositionReadSerializer(positions[0]).data
+    )
+
+
+def test_nested_to_representation_overrides_are_kept(bybit_futures_positions_with_comments: list[Position]):
+    position = Position.objects.with_commets().first()
+    expected = OverriddenNestedSerializer(position).data
+    assert expected['comment_count'] == 5
+    assert expected['comments'][0].startswith('Комментарий')
+    assert FastOverriddenNestedSerializer(position).data == expected
+
+
+def test_benchmark_command(capsys):
+    call_command('benchmark_position_serializers', rows=20, repeat=2)
+    assert 'Ускорение' in capsys.readouterr().out
+    assert not Position.objects.exists()
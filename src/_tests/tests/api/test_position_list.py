@@ -0,0 +1,171 @@
+import pytest
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.accounting.models import FinancialAsset, Position, PositionComment, TradingPair
+from apps.accounting.models.enums import AssetType, Exchange, MarketType, PositionSide
+from apps.accounting.prices import mark_price_store
+from apps.users.models import User
+
+
+@pytest.mark.usefixtures('bybit_futures_positions')
+class TestPositionListPagination:
+    url_list = reverse('api:v1:accounting:position-list')
+
+    def get_expected_ids(self) -> list[int]:
+        return list(Position.objects.order_by('-opened_at', '-id').values_list('id', flat=True))
+
+    def test_page_number_pagination_by_default(self, api_client: APIClient):
+        response = api_client.get(self.url_list, {'page_size': '3'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == Position.objects.count()
+        assert len(response.data['results']) == 3
+
+    def test_keyset_pagination(self, api_client: APIClient):
+        response = api_client.get(self.url_list, {'pagination': 'cursor', 'page_size': '3'})
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert response.data['previous'] is None
+        ids = [position['id'] for position in response.data['results']]
+        pages = [response.data]
+        while response.data['next']:
+            response = api_client.get(response.data['next'])
+            assert response.status_code == status.HTTP_200_OK
+            pages.append(response.data)
+            ids.extend(position['id'] for position in response.data['results'])
+        assert ids == self.get_expected_ids()
+        assert len(pages) == 3
+
+        response = api_client.get(pages[1]['previous'])
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == pages[0]['results']
+        assert response.data['previous'] is None
+        assert response.data['next'] == pages[0]['next']
+
+    def test_keyset_pagination_invalid_cursor(self, api_client: APIClient):
+        response = api_client.get(self.url_list, {'cursor': 'invalid'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.usefixtures('bybit_futures_positions_with_comments')
+class TestPositionListComments:
+    url_list = reverse('api:v1:accounting:position-list')
+
+    def test_positions_ordered_by_last_comment(self, api_client: APIClient):
+        response = api_client.get(self.url_list)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == Position.objects.count()
+        ids = [position['id'] for position in response.data['results']]
+        assert len(ids) == len(set(ids)) == Position.objects.count()
+        last_comment_ids = [position['comments'][0]['id'] for position in response.data['results']]
+        assert last_comment_ids == sorted(last_comment_ids, reverse=True)
+        for position in response.data['results']:
+            created_at = [comment['created_at'] for comment in position['comments']]
+            assert len(created_at) == 5
+            assert created_at == sorted(created_at, reverse=True)
+
+    def test_keyset_pagination_ignores_last_comment(self, api_client: APIClient):
+        expected_ids = list(Position.objects.order_by('-opened_at', '-id').values_list('id', flat=True))
+        PositionComment.objects.create(position_id=expected_ids[-1], comment='Последний комментарий')
+        response = api_client.get(self.url_list)
+        assert response.data['results'][0]['id'] == expected_ids[-1]
+        response = api_client.get(self.url_list, {'pagination': 'cursor'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [position['id'] for position in response.data['results']] == expected_ids
+
+    def test_num_queries_do_not_depend_on_comments(self, api_client: APIClient, django_assert_num_queries):
+        api_client.get(self.url_list)
+        # Сессия, пользователь, валидатор ETag, COUNT, позиции и комментарии, чтение выполняется без транзакции.
+        with django_assert_num_queries(6):
+            response = api_client.get(self.url_list, {'page_size': '3'})
+        assert len(response.data['results']) == 3
+
+
+class TestPositionMarkPrices:
+    url_list = reverse('api:v1:accounting:position-list')
+
+    def to_ms(self, seconds_ago: float) -> int:
+        return int((timezone.now() - timedelta(seconds=seconds_ago)).timestamp() * 1000)
+
+    def test_open_positions_are_valued_with_one_redis_command(
+        self, api_client: APIClient, bybit_futures_positions: list[Position], mocker, redis
+    ):
+        priced, stale = bybit_futures_positions[0], bybit_futures_positions[1]
+        closed = bybit_futures_positions[5]
+        assert closed.trading_pair == priced.trading_pair
+        Position.objects.filter(pk=closed.pk).update(is_closed=True)
+        mark_price_store.set_many(
+            {
+                (priced.trading_pair.symbol, priced.trading_pair.market, priced.trading_pair.exchange): (
+                    '110.5',
+                    self.to_ms(1),
+                ),
+                (stale.trading_pair.symbol, stale.trading_pair.market, stale.trading_pair.exchange): (
+                    '90',
+                    self.to_ms(600),
+                ),
+            }
+        )
+        hmget = mocker.spy(redis, 'hmget')
+        response = api_client.get(self.url_list)
+        assert response.status_code == status.HTTP_200_OK
+        assert hmget.call_count == 1
+        positions = {position['id']: position for position in response.data['results']}
+        # Короткая позиция размером 1 по 100.5 без плеча.
+        assert positions[priced.pk]['mark_price'] == '110.5000000000'
+        assert positions[priced.pk]['unrealized_pnl'] == '-10.0000000000'
+        assert positions[priced.pk]['pnl_pct'] == '-9.95'
+        for position in (stale, closed):
+            assert positions[position.pk]['mark_price'] is None
+            assert positions[position.pk]['unrealized_pnl'] is None
+            assert positions[position.pk]['pnl_pct'] is None
+
+    def test_retrieve_open_position(self, api_client: APIClient, bybit_futures_positions: list[Position]):
+        position = bybit_futures_positions[1]
+        trading_pair = position.trading_pair
+        mark_price_store.set_many(
+            {(trading_pair.symbol, trading_pair.market, trading_pair.exchange): ('111.5', self.to_ms(1))}
+        )
+        url = reverse('api:v1:accounting:position-detail', args=[position.pk])
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        # Длинная позиция размером 2 по 101.5 с плечом 2.
+        assert response.data['unrealized_pnl'] == '20.0000000000'
+        assert response.data['pnl_pct'] == '19.70'
+
+    def test_inverse_position_pnl_in_base_asset(self, api_client: APIClient, user: User):
+        btc, usd = FinancialAsset.objects.bulk_create(
+            FinancialAsset(
+                ticker=ticker, type=AssetType.CRYPTOCURRENCY, market=MarketType.FUTURES, exchange=Exchange.BYBIT
+            )
+            for ticker in ('BTC', 'USD')
+        )
+        trading_pair = TradingPair.objects.create(base_asset=btc, quote_asset=usd)
+        assert trading_pair.is_inverse
+        positions = Position.objects.bulk_create(
+            Position(
+                user=user,
+                trading_pair=trading_pair,
+                side=side,
+                size=Decimal('1000'),
+                entry_price=Decimal('50000'),
+                leverage=Decimal('10'),
+                opened_at=timezone.now(),
+            )
+            for side in (PositionSide.LONG, PositionSide.SHORT)
+        )
+        mark_price_store.set_many({('BTCUSD', MarketType.FUTURES, Exchange.BYBIT): ('62500', self.to_ms(1))})
+        response = api_client.get(self.url_list)
+        assert response.status_code == status.HTTP_200_OK
+        results = {position['id']: position for position in response.data['results']}
+        # 1000 USD * (1 / 50000 - 1 / 62500) = 0.004 BTC при марже 1000 / 50000 / 10 = 0.002 BTC.
+        assert results[positions[0].pk]['unrealized_pnl'] == '0.0040000000'
+        assert results[positions[0].pk]['pnl_pct'] == '200.00'
+        assert results[positions[1].pk]['unrealized_pnl'] == '-0.0040000000'
+        assert results[positions[1].pk]['pnl_pct'] == '-200.00'
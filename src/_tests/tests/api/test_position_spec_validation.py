@@ -0,0 +1,103 @@
+import pytest
+
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from _tests.fixtures.positions import create_positions
+from _tests.tests.api.test_position_bulk_create import get_position_row
+from apps.accounting.models import TradingPair, TradingPairSpec
+from apps.accounting.models.enums import Exchange, MarketType
+from apps.accounting.resolvers import trading_pair_resolver, trading_pair_spec_cache
+from apps.users.models import User
+
+
+@pytest.mark.usefixtures('bybit_futures_trading_pair_specs')
+class TestPositionSpecValidation:
+    url = reverse('api:v1:accounting:position-list')
+
+    def test_create_valid_position(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        row = get_position_row(bybit_futures_trading_pairs[0], size='1.5', entry_price='100.25')
+        response = api_client.post(self.url, row, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_create_averaged_entry_price(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        # Средняя цена исполнений 100.1 и 100.2 и цена ликвидации биржи не лежат на сетке шага цены.
+        row = get_position_row(bybit_futures_trading_pairs[0], entry_price='100.15', liq_price='91.0371')
+        response = api_client.post(self.url, row, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_create_invalid_precision(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        row = get_position_row(
+            bybit_futures_trading_pairs[0], size='1.55', take_profit='120.03', stop_loss='99.5', leverage='75'
+        )
+        response = api_client.post(self.url, row, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {'size', 'take_profit', 'leverage'}
+        assert response.data['take_profit'] == ['Цена должна быть кратна шагу цены 0.05.']
+
+    def test_create_size_below_minimum(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        response = api_client.post(
+            self.url, get_position_row(bybit_futures_trading_pairs[0], size='0.2'), format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['size'] == ['Размер должен быть не меньше минимального количества 0.5.']
+
+    def test_bulk_create_row_errors(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        rows = [
+            get_position_row(bybit_futures_trading_pairs[0]),
+            get_position_row(bybit_futures_trading_pairs[1], stop_loss='90.01'),
+        ]
+        response = api_client.post(reverse('api:v1:accounting:position-bulk'), rows, format='json')
+        assert response.data['created'] == 1
+        assert 'stop_loss' in response.data['results'][1]['errors']
+
+    def test_update_size_after_partial_close(
+        self, api_client: APIClient, user: User, bybit_futures_trading_pairs: list[TradingPair]
+    ):
+        position = create_positions(user, bybit_futures_trading_pairs, 1)[0]
+        url = reverse('api:v1:accounting:position-detail', args=[position.pk])
+        response = api_client.patch(url, {'size': '0.2', 'entry_price': '100.15'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_update_uses_position_spec(
+        self, api_client: APIClient, user: User, bybit_futures_trading_pairs: list[TradingPair]
+    ):
+        position = create_positions(user, bybit_futures_trading_pairs, 1)[0]
+        url = reverse('api:v1:accounting:position-detail', args=[position.pk])
+        response = api_client.patch(url, {'take_profit': '120.03'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert set(response.data) == {'take_profit'}
+        response = api_client.patch(url, {'take_profit': '120.05'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_cache_does_not_query_database(
+        self, django_assert_num_queries, bybit_futures_trading_pairs: list[TradingPair]
+    ):
+        trading_pair = bybit_futures_trading_pairs[0]
+        with django_assert_num_queries(1):
+            spec = trading_pair_spec_cache.get(trading_pair.symbol, MarketType.FUTURES, Exchange.BYBIT)
+        assert spec is not None
+        assert spec.trading_pair_id == trading_pair.pk
+        TradingPairSpec.objects.filter(pk=trading_pair.pk).delete()
+        with django_assert_num_queries(0):
+            assert trading_pair_spec_cache.get_by_trading_pair(trading_pair.pk) == spec
+
+    def test_cache_remembers_missing_specs(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            assert trading_pair_spec_cache.get('UNKNOWN', MarketType.FUTURES, Exchange.BYBIT) is None
+        with django_assert_num_queries(0):
+            assert trading_pair_spec_cache.get('UNKNOWN', MarketType.FUTURES, Exchange.BYBIT) is None
+
+    def test_cache_is_reset_by_catalog_version(self, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        spec = trading_pair_spec_cache.get_by_trading_pair(trading_pair.pk)
+        assert spec is not None
+        TradingPairSpec.objects.filter(pk=spec.pk).update(tick_size='0.5')
+        assert trading_pair_spec_cache.get_by_trading_pair(trading_pair.pk) is spec
+        trading_pair_resolver.invalidate()
+        new_spec = trading_pair_spec_cache.get_by_trading_pair(trading_pair.pk)
+        assert new_spec is not None
+        assert new_spec.tick_size == Decimal('0.5')
@@ -0,0 +1,65 @@
+import pytest
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from _tests.fixtures.positions import create_positions
+from apps.accounting.models import Position, TradingPair
+from apps.accounting.models.enums import PositionSide
+from apps.users.models import User
+
+
+def to_decimal(value: str | Decimal) -> Decimal:
+    return Decimal(value).quantize(Decimal('0.0000000001'))
+
+
+@pytest.mark.usefixtures('bybit_futures_positions')
+class TestPositionStats:
+    url_stats = reverse('api:v1:accounting:position-stats')
+
+    def test_total(self, api_client: APIClient, user: User, bybit_futures_trading_pairs: list[TradingPair]):
+        other_user = User.objects.create_user(username='other_user', password='password123')
+        create_positions(other_user, bybit_futures_trading_pairs, count=3)
+        positions = list(Position.objects.filter(user=user))
+
+        response = api_client.get(self.url_stats, {'group_by': ''})
+        assert response.status_code == status.HTTP_200_OK
+        total = response.data['total']
+        assert total['count'] == len(positions)
+        assert total['long_count'] == len([position for position in positions if position.side == PositionSide.LONG])
+        assert total['short_count'] == len([position for position in positions if position.side == PositionSide.SHORT])
+        expected_value = sum((position.position_value for position in positions), Decimal(0))
+        assert to_decimal(total['value']) == to_decimal(expected_value)
+        assert response.data['groups'] == []
+
+    def test_groups(self, api_client: APIClient, user: User, django_assert_max_num_queries):
+        expected: dict[tuple, Decimal] = defaultdict(Decimal)
+        for position in Position.objects.filter(user=user).select_related('trading_pair'):
+            key = (position.trading_pair.symbol, position.side, position.opened_at.date().replace(day=1).isoformat())
+            expected[key] += position.position_value
+
+        with django_assert_max_num_queries(6):
+            response = api_client.get(self.url_stats, {'group_by': 'trading_pair,side,month'})
+        assert response.status_code == status.HTTP_200_OK
+        groups = {
+            (group['symbol'], group['side'], group['month']): to_decimal(group['value'])
+            for group in response.data['groups']
+        }
+        assert groups == {key: to_decimal(value) for key, value in expected.items()}
+        assert all('market' not in group for group in response.data['groups'])
+
+    def test_filters(self, api_client: APIClient, user: User):
+        response = api_client.get(self.url_stats, {'side': PositionSide.LONG, 'group_by': 'side,market'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total']['count'] == Position.objects.filter(user=user, side=PositionSide.LONG).count()
+        assert response.data['total']['short_count'] == 0
+        assert [group['side'] for group in response.data['groups']] == [PositionSide.LONG]
+
+    def test_invalid_group_by(self, api_client: APIClient):
+        response = api_client.get(self.url_stats, {'group_by': 'side,unknown'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'group_by' in response.data
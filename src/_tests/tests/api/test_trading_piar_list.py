@@ -1,10 +1,15 @@
 import pytest
 
+import json
+from typing import Any
+
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from apps.accounting.api.serializers.finances import TradingPairSerializer
+from apps.accounting.api.services.trading_pair_list_streamer import TradingPairListStreamer
+from apps.accounting.models.enums import Exchange, MarketType
 from apps.accounting.models.finances import TradingPair
 
 
@@ -41,3 +46,39 @@ class TestTradingPairViewSet:
         assert response.status_code == status.HTTP_200_OK
         qs = TradingPair.objects.with_select_related().get(pk=1)
         assert response.data == TradingPairSerializer(qs).data
+
+
+def get_streaming_content(response: Any) -> list[bytes]:
+    return list(response.streaming_content)
+
+
+@pytest.mark.usefixtures('bybit_futures_trading_pairs', 'bybit_spot_trading_pairs')
+class TestTradingPairStreamingList:
+    url_list = reverse('api:v1:accounting:trading-pair-list')
+
+    def test_stream_matches_list(self, api_client: APIClient):
+        response = api_client.get(self.url_list)
+        streaming_response = api_client.get(self.url_list, {'stream': 'true'})
+        assert streaming_response.status_code == status.HTTP_200_OK
+        assert streaming_response.streaming
+        assert streaming_response['Content-Type'] == 'application/json'
+        assert json.loads(b''.join(get_streaming_content(streaming_response))) == json.loads(response.content)
+
+    def test_stream_in_chunks(self, api_client: APIClient, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(TradingPairListStreamer, 'CHUNK_SIZE', 2)
+        response = api_client.get(self.url_list, {'stream': 'true'})
+        chunks = get_streaming_content(response)
+        assert len(chunks) == TradingPair.objects.count() // 2 + 1
+        assert json.loads(b''.join(chunks)) == json.loads(api_client.get(self.url_list).content)
+
+    def test_stream_with_filter(self, api_client: APIClient, bybit_futures_trading_pairs: list[TradingPair]):
+        ticker = bybit_futures_trading_pairs[0].base_asset.ticker
+        response = api_client.get(self.url_list, {'stream': '1', 'base_asset__ticker': ticker})
+        data = json.loads(b''.join(get_streaming_content(response)))
+        assert [pair['symbol'] for pair in data[Exchange.BYBIT][MarketType.FUTURES]] == [
+            bybit_futures_trading_pairs[0].symbol
+        ]
+
+    def test_stream_empty(self, api_client: APIClient):
+        response = api_client.get(self.url_list, {'stream': 'true', 'base_asset__ticker': 'UNKNOWN'})
+        assert json.loads(b''.join(get_streaming_content(response))) == {}
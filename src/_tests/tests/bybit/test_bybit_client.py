@@ -0,0 +1,80 @@
+import pytest
+
+import json
+
+from pybit.exceptions import FailedRequestError, InvalidRequestError
+from requests import Response
+
+from apps.bybit.connections import BybitClientPool, BybitHTTP, bybit_rate_limiter, get_bybit_client, public_bybit
+
+
+def get_response(status_code: int = 200, ret_code: int = 0, headers: dict | None = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps({'retCode': ret_code, 'retMsg': 'OK', 'result': {'list': []}}).encode()
+    response.headers.update(headers or {})
+    return response
+
+
+class TestBybitHTTP:
+    @pytest.fixture
+    def sleep(self, mocker):
+        return mocker.patch('apps.bybit.connections.sleep')
+
+    def get_client(self, mocker, responses: list[Response]) -> BybitHTTP:
+        client = BybitHTTP(rate_limiter=bybit_rate_limiter, backoff_retries=2)
+        mocker.patch.object(client.client, 'send', side_effect=responses)
+        return client
+
+    def test_retry_on_http_429(self, mocker, sleep):
+        client = self.get_client(mocker, [get_response(429), get_response()])
+        acquire = mocker.spy(bybit_rate_limiter, 'acquire')
+        assert client.get_server_time()['retCode'] == 0
+        assert sleep.call_count == 1
+        assert acquire.call_count == 2
+
+    def test_retry_on_rate_limit_code(self, mocker, sleep):
+        client = self.get_client(mocker, [get_response(ret_code=10006), get_response(ret_code=10006), get_response()])
+        assert client.get_server_time()['retCode'] == 0
+        first_delay, second_delay = (call.args[0] for call in sleep.call_args_list)
+        assert 0.25 <= first_delay <= 0.5
+        assert 0.5 <= second_delay <= 1
+
+    def test_retries_exhausted(self, mocker, sleep):
+        client = self.get_client(mocker, [get_response(429)] * 3)
+        with pytest.raises(FailedRequestError):
+            client.get_server_time()
+        assert sleep.call_count == 2
+
+    def test_other_errors_are_not_retried(self, mocker, sleep):
+        client = self.get_client(mocker, [get_response(ret_code=10001)])
+        with pytest.raises(InvalidRequestError):
+            client.get_server_time()
+        sleep.assert_not_called()
+
+    def test_metrics(self, mocker, sleep, metrics):
+        metrics.enabled = True
+        client = self.get_client(mocker, [get_response(ret_code=10006), get_response()])
+        client.get_server_time()
+        metrics.flush()
+        lines = metrics.collect().splitlines()
+        assert 'bybit_request_duration_seconds_count{path="/v5/market/time"} 2' in lines
+        assert 'bybit_request_errors_total{path="/v5/market/time",code="10006"} 1' in lines
+
+    def test_client_is_shared(self):
+        assert get_bybit_client() is public_bybit
+        assert get_bybit_client('key', 'secret') is get_bybit_client('key', 'secret')
+
+    def test_client_is_replaced_on_secret_change(self):
+        client = get_bybit_client('key', 'secret')
+        rotated = get_bybit_client('key', 'rotated')
+        assert rotated is not client
+        assert rotated.api_secret == 'rotated'
+
+    def test_evicted_client_is_not_closed(self, mocker):
+        pool = BybitClientPool(None, maxsize=1)
+        client = pool.get('first', 'secret')
+        close = mocker.spy(client.client, 'close')
+        assert pool.get('second', 'secret') is not client
+        assert pool.get('first', 'secret') is not client
+        close.assert_not_called()
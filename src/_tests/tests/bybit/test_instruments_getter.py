@@ -0,0 +1,135 @@
+import pytest
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from _tests.fixtures.bybit import get_instrument_data
+from apps.accounting.models import TradingPair, TradingPairSpec
+from apps.accounting.models.enums import MarketType
+from apps.bybit.constants import BYBIT_INSTRUMENT_CATEGORIES, OPTION_BASE_COINS
+from apps.bybit.services.celery import CategoryInstrumentsGetter, InstrumentsGetter, LinearUSDTGetter
+
+
+def get_traded(market: MarketType = MarketType.FUTURES) -> dict[str, bool]:
+    return dict(TradingPair.objects.filter(market=market).values_list('symbol', 'traded'))
+
+
+class TestLinearUSDTGetter:
+    def test_sync_follows_cursor(self, bybit_instruments_api):
+        api = bybit_instruments_api(
+            linear=[
+                [get_instrument_data('BTC'), get_instrument_data('ETH'), get_instrument_data('BTC', 'USDC')],
+                [get_instrument_data('SOL'), get_instrument_data('NEW', is_pre_listing=True)],
+                [get_instrument_data('XRP')],
+            ]
+        )
+        assert LinearUSDTGetter()() == {'linear': {'listed': 4, 'added': 4, 'reactivated': 0, 'delisted': 0}}
+        assert [call.kwargs.get('cursor') for call in api.call_args_list] == [None, 'cursor-1', 'cursor-2']
+        assert get_traded() == {'BTCUSDT': True, 'ETHUSDT': True, 'SOLUSDT': True, 'XRPUSDT': True}
+
+    def test_pairs_from_later_pages_stay_traded(self, bybit_instruments_api):
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')], [get_instrument_data('ETH')]])
+        LinearUSDTGetter()()
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')], [get_instrument_data('SOL')]])
+        LinearUSDTGetter()()
+        assert get_traded() == {'BTCUSDT': True, 'ETHUSDT': False, 'SOLUSDT': True}
+
+    def test_failed_page_does_not_deactivate(self, bybit_instruments_api):
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')], [get_instrument_data('ETH')]])
+        LinearUSDTGetter()()
+        bybit_instruments_api(linear=[[get_instrument_data('SOL')], ConnectionError('timeout')])
+        with pytest.raises(ConnectionError):
+            LinearUSDTGetter()()
+        assert get_traded() == {'BTCUSDT': True, 'ETHUSDT': True, 'SOLUSDT': True}
+
+    def test_relisted_pairs_are_reactivated(self, bybit_instruments_api):
+        bybit_instruments_api(linear=[[get_instrument_data('BTC'), get_instrument_data('ETH')]])
+        LinearUSDTGetter()()
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')]])
+        assert LinearUSDTGetter()() == {'linear': {'listed': 1, 'added': 0, 'reactivated': 0, 'delisted': 1}}
+        bybit_instruments_api(linear=[[get_instrument_data('BTC'), get_instrument_data('ETH')]])
+        assert LinearUSDTGetter()() == {'linear': {'listed': 2, 'added': 0, 'reactivated': 1, 'delisted': 0}}
+        assert get_traded() == {'BTCUSDT': True, 'ETHUSDT': True}
+
+    def test_specs_are_stored(self, bybit_instruments_api):
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')]])
+        LinearUSDTGetter()()
+        bybit_instruments_api(linear=[[get_instrument_data('BTC', tick_size='0.5', qty_step='0.01')]])
+        LinearUSDTGetter()()
+        spec = TradingPairSpec.objects.get(trading_pair__symbol='BTCUSDT')
+        assert spec.tick_size == Decimal('0.5')
+        assert spec.qty_step == Decimal('0.01')
+        assert spec.min_order_qty == Decimal('0.01')
+        assert spec.max_order_qty == Decimal('1190')
+        assert spec.max_leverage == Decimal('100')
+        assert spec.launched_at == datetime(2020, 3, 15, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize('changed', [1, 50])
+    def test_query_count_does_not_depend_on_changes(self, django_assert_num_queries, bybit_instruments_api, changed):
+        listed = [get_instrument_data(f'OLD{index}') for index in range(changed)]
+        bybit_instruments_api(linear=[listed + [get_instrument_data('BTC')]])
+        LinearUSDTGetter()()
+        bybit_instruments_api(linear=[[get_instrument_data('BTC')]])
+        LinearUSDTGetter()()
+        relisted = [get_instrument_data(f'NEW{index}') for index in range(changed)]
+        bybit_instruments_api(linear=[listed + relisted])
+        with django_assert_num_queries(11):
+            result = LinearUSDTGetter()()
+        assert result == {'linear': {'listed': changed * 2, 'added': changed, 'reactivated': changed, 'delisted': 1}}
+
+
+class TestInstrumentsGetter:
+    def test_sync_all_categories(self, bybit_instruments_api):
+        bybit_instruments_api(
+            spot=[[get_instrument_data('BTC'), get_instrument_data('ETH', 'BTC')]],
+            linear=[[get_instrument_data('BTC'), get_instrument_data('BTC', 'USDT', symbol='BTC-26DEC25')]],
+            inverse=[[get_instrument_data('BTC', 'USD')]],
+            option=[
+                [
+                    get_instrument_data('BTC', 'USDC', symbol='BTC-26DEC25-100000-C'),
+                    get_instrument_data('BTC', 'USDC', symbol='BTC-26DEC25-100000-P'),
+                    get_instrument_data('ETH', 'USDC', symbol='ETH-26DEC25-4000-C'),
+                ]
+            ],
+        )
+        result = InstrumentsGetter()()
+        assert {category: counts['listed'] for category, counts in result.items()} == {
+            'spot': 2,
+            'linear': 1,
+            'inverse': 1,
+            'option': 2,
+        }
+        assert get_traded(MarketType.SPOT) == {'BTCUSDT': True, 'ETHBTC': True}
+        assert get_traded(MarketType.FUTURES) == {'BTCUSDT': True, 'BTCUSD': True}
+        assert get_traded(MarketType.OPTIONS) == {'BTCUSDC': True, 'ETHUSDC': True}
+
+    def test_options_are_requested_by_base_coin(self, bybit_instruments_api):
+        api = bybit_instruments_api(option=[[get_instrument_data('SOL', 'USDC', symbol='SOL-26DEC25-200-C')]])
+        InstrumentsGetter(categories=(BYBIT_INSTRUMENT_CATEGORIES[-1],))()
+        assert [call.kwargs['baseCoin'] for call in api.call_args_list] == list(OPTION_BASE_COINS)
+        assert get_traded(MarketType.OPTIONS) == {'SOLUSDC': True}
+
+    def test_categories_deactivate_independently(self, bybit_instruments_api):
+        bybit_instruments_api(
+            spot=[[get_instrument_data('BTC')]],
+            linear=[[get_instrument_data('BTC'), get_instrument_data('ETH')]],
+            inverse=[[get_instrument_data('BTC', 'USD')]],
+        )
+        InstrumentsGetter()()
+        bybit_instruments_api(
+            spot=[ConnectionError('timeout')],
+            linear=[[get_instrument_data('BTC')]],
+            inverse=[[get_instrument_data('BTC', 'USD')]],
+        )
+        with pytest.raises(ConnectionError):
+            InstrumentsGetter()()
+        assert get_traded(MarketType.SPOT) == {'BTCUSDT': True}
+        assert get_traded(MarketType.FUTURES) == {'BTCUSDT': True, 'ETHUSDT': False, 'BTCUSD': True}
+
+    def test_save_error_stops_fetching(self, mocker, bybit_instruments_api):
+        api = bybit_instruments_api(linear=[[get_instrument_data(f'COIN{index}')] for index in range(20)])
+        mocker.patch.object(CategoryInstrumentsGetter, 'save_to_database', side_effect=RuntimeError('database'))
+        with pytest.raises(RuntimeError):
+            InstrumentsGetter()()
+        linear_calls = [call for call in api.call_args_list if call.kwargs['category'] == 'linear']
+        assert len(linear_calls) < 20
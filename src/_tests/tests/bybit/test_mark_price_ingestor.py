@@ -0,0 +1,77 @@
+import pytest
+
+from decimal import Decimal
+from time import monotonic, sleep
+from typing import Callable, Iterator
+
+from apps.accounting.models import TradingPair
+from apps.accounting.models.enums import Exchange, MarketType
+from apps.accounting.prices import mark_price_store
+from apps.accounting.resolvers import trading_pair_resolver
+from apps.bybit.connections import BybitWebSocket, get_bybit_websocket
+from apps.bybit.constants import LINEAR, InstrumentCategory
+from apps.bybit.services.streams import MarkPriceIngestor
+from apps.bybit.standin import StandInConfig, StandInHTTPServer
+
+# Котируемые активы тестовых пар - случайные слова, поэтому категория не фильтрует пары по котируемой монете.
+FUTURES_CATEGORY = InstrumentCategory(LINEAR, MarketType.FUTURES)
+
+
+def wait_for(condition: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = monotonic() + timeout
+    while not condition():
+        assert monotonic() < deadline, 'Условие не выполнено за отведенное время'
+        sleep(0.01)
+
+
+@pytest.mark.parametrize('standin_server', [StandInConfig(ticker_interval=0.01)], indirect=True)
+class TestMarkPriceIngestor:
+    @pytest.fixture
+    def opened(self) -> list[str]:
+        return []
+
+    @pytest.fixture
+    def ingestor(self, standin_server: StandInHTTPServer, opened: list[str]) -> Iterator[MarkPriceIngestor]:
+        def ws_factory(channel_type: str) -> BybitWebSocket:
+            opened.append(channel_type)
+            return get_bybit_websocket(channel_type)
+
+        ingestor = MarkPriceIngestor(ws_factory=ws_factory, categories=(FUTURES_CATEGORY,))
+        yield ingestor
+        ingestor.close()
+
+    def get_keys(self, trading_pairs: list[TradingPair]) -> list[tuple[str, str, str]]:
+        return [(pair.symbol, MarketType.FUTURES, Exchange.BYBIT) for pair in trading_pairs]
+
+    def test_writes_coalesced_prices(self, ingestor: MarkPriceIngestor, bybit_futures_trading_pairs, opened):
+        assert ingestor.refresh()
+        wait_for(lambda: ingestor.stats['received'] >= 3 * len(bybit_futures_trading_pairs))
+        written = ingestor.flush()
+        assert opened == [LINEAR]
+        assert written == len(bybit_futures_trading_pairs) < ingestor.stats['received']
+        prices = mark_price_store.get_many(self.get_keys(bybit_futures_trading_pairs))
+        assert len(prices) == len(bybit_futures_trading_pairs)
+        assert all(price.price > Decimal(0) for price in prices.values())
+
+    def test_resubscribes_when_catalog_changes(
+        self, ingestor: MarkPriceIngestor, bybit_futures_trading_pairs: list[TradingPair], opened, redis
+    ):
+        removed, *traded = bybit_futures_trading_pairs
+        ingestor.refresh()
+        assert not ingestor.refresh()
+        TradingPair.objects.filter(pk=removed.pk).update(traded=False)
+        trading_pair_resolver.invalidate()
+        assert ingestor.refresh()
+        assert opened == [LINEAR, LINEAR]
+        ingestor.flush()
+        redis.delete(mark_price_store.KEY)
+        TradingPair.objects.filter(pk=removed.pk).update(traded=True)
+        trading_pair_resolver.invalidate()
+        assert ingestor.refresh()
+        assert opened == [LINEAR, LINEAR]
+
+        def removed_price_written() -> bool:
+            ingestor.flush()
+            return bool(mark_price_store.get_many(self.get_keys([removed])))
+
+        wait_for(removed_price_written)
@@ -0,0 +1,57 @@
+import pytest
+
+from apps.accounting.models import TradingPair
+from apps.bybit.connections import get_bybit_client
+from apps.bybit.constants import OPTION_BASE_COINS
+from apps.bybit.services.celery import InstrumentsGetter, LinearUSDTGetter
+from apps.bybit.standin import StandInConfig, StandInHTTPServer
+
+
+class TestStandInServer:
+    def test_instruments_are_paged(self, standin_server: StandInHTTPServer):
+        client = get_bybit_client()
+        first_page = client.get_instruments_info(category='linear', limit=1000)['result']
+        assert len(first_page['list']) == 10
+        assert first_page['nextPageCursor'] == '10'
+        last_page = client.get_instruments_info(category='linear', cursor='20')['result']
+        assert len(last_page['list']) == 5
+        assert last_page['nextPageCursor'] == ''
+
+    def test_tickers_and_klines(self, standin_server: StandInHTTPServer):
+        client = get_bybit_client()
+        tickers = client.get_tickers(category='linear', symbol='C00001USDT')['result']['list']
+        assert [ticker['symbol'] for ticker in tickers] == ['C00001USDT']
+        klines = client.get_kline(category='linear', symbol='C00001USDT', interval='60', limit=3)['result']['list']
+        assert len(klines) == 3
+        assert int(klines[0][0]) - int(klines[1][0]) == 3_600_000
+
+    def test_sync_all_categories(self, standin_server: StandInHTTPServer):
+        result = InstrumentsGetter()()
+        assert {category: counts['added'] for category, counts in result.items()} == {
+            'spot': 25,
+            'linear': 25,
+            'inverse': 25,
+            'option': len(OPTION_BASE_COINS),
+        }
+        assert TradingPair.objects.filter(traded=True).count() == 75 + len(OPTION_BASE_COINS)
+
+    def test_options_default_to_btc(self, standin_server: StandInHTTPServer):
+        client = get_bybit_client()
+        options = client.get_instruments_info(category='option', limit=1000)['result']['list']
+        assert options and {option['baseCoin'] for option in options} == {'BTC'}
+        options = client.get_instruments_info(category='option', baseCoin='ETH', limit=1000)['result']['list']
+        assert options and {option['baseCoin'] for option in options} == {'ETH'}
+
+    @pytest.mark.parametrize(
+        'standin_server',
+        [
+            StandInConfig(instruments=25, page_size=10, error_rate=0.5, error_code=10006, seed=1),
+            StandInConfig(instruments=25, page_size=10, error_rate=0.5, error_code=429, seed=1),
+        ],
+        indirect=True,
+    )
+    def test_sync_retries_rate_limit_errors(self, mocker, standin_server: StandInHTTPServer):
+        sleep = mocker.patch('apps.bybit.connections.sleep')
+        result = LinearUSDTGetter()()
+        assert result['linear']['listed'] == 25
+        assert sleep.call_count > 0
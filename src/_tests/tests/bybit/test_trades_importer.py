@@ -0,0 +1,143 @@
+import pytest
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from _tests.fixtures.bybit import get_closed_pnl_data, get_execution_data, get_position_data
+from apps.accounting.models import Position, TradingPair
+from apps.accounting.models.enums import PositionSide
+from apps.bybit.models import ByBitAccess
+from apps.bybit.services.celery import TradesImporter
+from apps.bybit.tasks import import_bybit_trades
+
+
+def to_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+class TestTradesImporter:
+    @pytest.fixture
+    def now(self) -> datetime:
+        return timezone.now().replace(microsecond=0)
+
+    def test_first_import(self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, now):
+        closed_pair, open_pair = bybit_futures_trading_pairs[:2]
+        opened_at, closed_at = now - timedelta(days=10), now - timedelta(days=2)
+        bybit_account_api(
+            executions=[
+                get_execution_data(closed_pair.symbol, to_ms(opened_at)),
+                get_execution_data(closed_pair.symbol, to_ms(closed_at), closed_size='1', side='Sell'),
+            ],
+            closed_pnl=[get_closed_pnl_data(closed_pair.symbol, 'order-1', to_ms(closed_at), to_ms(closed_at))],
+            positions=[get_position_data(open_pair.symbol, to_ms(now - timedelta(hours=1)), side='Sell')],
+        )
+        result = TradesImporter(bybit_access, now=now)()
+        assert result == {'created': 2, 'updated': 0, 'closed': 0, 'skipped': 0}
+        closed = Position.objects.get(trading_pair=closed_pair)
+        assert (closed.is_closed, closed.side, closed.external_id) == (True, PositionSide.LONG, 'closed-pnl:order-1')
+        assert (closed.opened_at, closed.closed_at) == (opened_at, closed_at)
+        opened = Position.objects.get(trading_pair=open_pair)
+        assert (opened.is_closed, opened.side, opened.size) == (False, PositionSide.SHORT, Decimal('1'))
+        assert (opened.take_profit, opened.stop_loss) == (Decimal('120'), None)
+        bybit_access.refresh_from_db()
+        assert bybit_access.executions_synced_at == bybit_access.closed_pnl_synced_at == now - timedelta(seconds=10)
+
+    def test_repeated_import_fetches_only_new_data(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, django_assert_num_queries, now
+    ):
+        symbol = bybit_futures_trading_pairs[0].symbol
+        bybit_account_api(positions=[get_position_data(symbol, to_ms(now - timedelta(hours=1)))])
+        TradesImporter(bybit_access, now=now)()
+        client = bybit_account_api(positions=[get_position_data(symbol, to_ms(now - timedelta(hours=1)))])
+        with django_assert_num_queries(3):
+            result = TradesImporter(bybit_access, now=now + timedelta(minutes=1))()
+        assert result == {'created': 0, 'updated': 0, 'closed': 0, 'skipped': 0}
+        assert client.get_executions.call_count == client.get_closed_pnl.call_count == 1
+        assert not client.get_positions.called
+
+    def test_closes_imported_open_position(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, now
+    ):
+        symbol = bybit_futures_trading_pairs[0].symbol
+        opened_at = now - timedelta(hours=2)
+        bybit_account_api(positions=[get_position_data(symbol, to_ms(opened_at), size='3')])
+        TradesImporter(bybit_access, now=now - timedelta(hours=1))()
+        position = Position.objects.get()
+        partial_close, close = now - timedelta(minutes=30), now - timedelta(minutes=20)
+        bybit_account_api(
+            closed_pnl=[
+                get_closed_pnl_data(symbol, 'order-1', to_ms(partial_close), to_ms(partial_close), closed_size='1'),
+                get_closed_pnl_data(symbol, 'order-2', to_ms(close), to_ms(close), closed_size='2'),
+            ],
+        )
+        result = TradesImporter(bybit_access, now=now)()
+        assert result == {'created': 0, 'updated': 0, 'closed': 1, 'skipped': 0}
+        position.refresh_from_db()
+        assert (position.is_closed, position.size, position.external_id) == (True, Decimal('3'), 'closed-pnl:order-2')
+        assert (position.opened_at, position.closed_at) == (opened_at, close)
+
+    def test_late_closed_pnl_closes_position(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, now
+    ):
+        symbol = bybit_futures_trading_pairs[0].symbol
+        bybit_account_api(positions=[get_position_data(symbol, to_ms(now - timedelta(hours=2)))])
+        TradesImporter(bybit_access, now=now - timedelta(hours=1))()
+        closed_at = now - timedelta(minutes=30)
+        bybit_account_api(executions=[get_execution_data(symbol, to_ms(closed_at), closed_size='1', side='Sell')])
+        assert TradesImporter(bybit_access, now=now)()['closed'] == 0
+        bybit_access.refresh_from_db()
+        assert bybit_access.closed_pnl_synced_at == now - timedelta(hours=1, seconds=10)
+        bybit_account_api(closed_pnl=[get_closed_pnl_data(symbol, 'order-1', to_ms(closed_at), to_ms(closed_at))])
+        result = TradesImporter(bybit_access, now=now + timedelta(hours=1))()
+        assert result == {'created': 0, 'updated': 0, 'closed': 1, 'skipped': 0}
+        assert Position.objects.get().closed_at == closed_at
+        bybit_access.refresh_from_db()
+        assert bybit_access.closed_pnl_synced_at == now + timedelta(hours=1) - timedelta(seconds=10)
+
+    def test_overlap_does_not_duplicate_closes(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, now
+    ):
+        symbol = bybit_futures_trading_pairs[0].symbol
+        bybit_account_api(positions=[get_position_data(symbol, to_ms(now - timedelta(hours=1)), size='2')])
+        TradesImporter(bybit_access, now=now - timedelta(minutes=10))()
+        partial_close, close = now - timedelta(minutes=8), now - timedelta(minutes=5)
+        client = bybit_account_api(
+            closed_pnl=[
+                get_closed_pnl_data(symbol, 'order-1', to_ms(partial_close), to_ms(partial_close)),
+                get_closed_pnl_data(symbol, 'order-2', to_ms(close), to_ms(close)),
+            ],
+        )
+        assert TradesImporter(bybit_access, now=now)()['closed'] == 1
+        client.reset_mock()
+        result = TradesImporter(bybit_access, now=now + timedelta(minutes=1))()
+        assert result == {'created': 0, 'updated': 0, 'closed': 0, 'skipped': 0}
+        assert client.get_closed_pnl.call_args.kwargs['startTime'] <= to_ms(partial_close)
+        assert not client.get_positions.called
+        assert Position.objects.count() == 1
+
+    def test_reimport_does_not_duplicate_positions(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs, now
+    ):
+        symbol = bybit_futures_trading_pairs[0].symbol
+        closed_at = now - timedelta(days=1)
+        bybit_account_api(closed_pnl=[get_closed_pnl_data(symbol, 'order-1', to_ms(closed_at), to_ms(closed_at))])
+        TradesImporter(bybit_access, now=now)()
+        ByBitAccess.objects.update(executions_synced_at=None, closed_pnl_synced_at=None)
+        bybit_access.refresh_from_db()
+        result = TradesImporter(bybit_access, now=now)()
+        assert result == {'created': 0, 'updated': 1, 'closed': 0, 'skipped': 0}
+        assert Position.objects.count() == 1
+
+    def test_unknown_symbols_are_skipped(self, bybit_access: ByBitAccess, bybit_account_api, now):
+        bybit_account_api(positions=[get_position_data('UNKNOWNUSDT', to_ms(now - timedelta(hours=1)))])
+        result = TradesImporter(bybit_access, now=now)()
+        assert result == {'created': 0, 'updated': 0, 'closed': 0, 'skipped': 1}
+        assert not Position.objects.exists()
+
+    def test_task_skips_inactive_access(
+        self, bybit_access: ByBitAccess, bybit_account_api, bybit_futures_trading_pairs: list[TradingPair]
+    ):
+        ByBitAccess.objects.update(is_active=False)
+        assert import_bybit_trades(bybit_access.pk) == {}
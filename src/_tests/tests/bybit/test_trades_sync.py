@@ -0,0 +1,90 @@
+import pytest
+
+from time import time
+from typing import Iterator
+
+from tradi.celery import celery_app
+
+from apps.bybit.constants import TRADES_SYNC_LOCK_NAME
+from apps.bybit.models import ByBitAccess
+from apps.bybit.services.celery import TradesImporter, TradesShardImporter, get_access_shards, summarize_trades_sync
+from apps.bybit.services.celery.trades_sync import trades_import_lock, trades_sync_lock
+from apps.bybit.tasks import sync_bybit_trades
+from apps.users.models import User
+
+IMPORT_RESULT = {'created': 1, 'updated': 0, 'closed': 0, 'skipped': 0}
+
+
+@pytest.fixture
+def bybit_accesses() -> list[ByBitAccess]:
+    users = [User.objects.create_user(username=f'trader{index}', password='password123') for index in range(5)]
+    return [ByBitAccess.objects.create(user=user, key=f'key{user.pk}', secret='secret') for user in users]
+
+
+@pytest.fixture
+def trades_importer(mocker):
+    return mocker.patch.object(TradesImporter, 'act', autospec=True, return_value=IMPORT_RESULT)
+
+
+class TestTradesSync:
+    def test_shards(self, bybit_accesses: list[ByBitAccess]):
+        ByBitAccess.objects.filter(pk=bybit_accesses[0].pk).update(is_active=False)
+        shards = get_access_shards(3)
+        assert sorted(access_id for shard in shards for access_id in shard) == [
+            access.pk for access in bybit_accesses[1:]
+        ]
+        assert sorted(len(shard) for shard in shards) == [1, 1, 2]
+        assert len(get_access_shards(10)) == 4
+
+    def test_shard_skips_locked_and_failed_accounts(self, bybit_accesses: list[ByBitAccess], trades_importer):
+        locked, failed, synced = bybit_accesses[:3]
+
+        def act(importer: TradesImporter) -> dict[str, int]:
+            if importer.access.pk == failed.pk:
+                raise ValueError('Invalid API key')
+            return IMPORT_RESULT
+
+        trades_importer.side_effect = act
+        trades_import_lock.acquire(str(locked.pk))
+        outcomes = TradesShardImporter([locked.pk, failed.pk, synced.pk])()
+        assert [outcome['status'] for outcome in outcomes] == ['locked', 'failed', 'synced']
+        assert outcomes[1]['error'] == 'ValueError: Invalid API key'
+        assert outcomes[2]['result'] == IMPORT_RESULT
+        assert trades_import_lock.acquire(str(synced.pk)) is not None
+
+    def test_summary(self):
+        shards = [
+            [
+                {'access_id': 1, 'status': 'synced', 'duration': 0.5, 'result': IMPORT_RESULT, 'error': None},
+                {'access_id': 2, 'status': 'failed', 'duration': 0.1, 'result': {}, 'error': 'Error'},
+            ],
+            [{'access_id': 3, 'status': 'synced', 'duration': 1.5, 'result': IMPORT_RESULT, 'error': None}],
+        ]
+        summary = summarize_trades_sync(shards, time())
+        assert (summary['accounts'], summary['synced'], summary['failed'], summary['locked']) == (3, 2, 1, 0)
+        assert summary['import_duration'] == {'total': 2.0, 'mean': 1.0, 'max': 1.5, 'slowest_access_id': 3}
+        assert summary['positions'] == {'created': 2, 'updated': 0, 'closed': 0, 'skipped': 0}
+        assert summary['failures'] == [{'access_id': 2, 'error': 'Error'}]
+
+    @pytest.fixture
+    def celery_eager(self) -> Iterator[None]:
+        celery_app.conf.task_always_eager = True
+        yield
+        celery_app.conf.task_always_eager = False
+
+    def test_dispatcher(self, mocker, celery_eager, bybit_accesses: list[ByBitAccess], trades_importer):
+        summarize = mocker.patch('apps.bybit.tasks.summarize_trades_sync', wraps=summarize_trades_sync)
+        assert sync_bybit_trades() == {'accounts': 5, 'shards': 5}
+        assert trades_importer.call_count == 5
+        shards = summarize.call_args.args[0]
+        assert sorted(outcome['access_id'] for shard in shards for outcome in shard) == [
+            access.pk for access in bybit_accesses
+        ]
+        assert trades_sync_lock.acquire(TRADES_SYNC_LOCK_NAME) is not None
+
+    def test_dispatcher_skips_while_previous_run_is_in_flight(
+        self, celery_eager, bybit_accesses: list[ByBitAccess], trades_importer
+    ):
+        trades_sync_lock.acquire(TRADES_SYNC_LOCK_NAME)
+        assert sync_bybit_trades() == {'accounts': 0, 'shards': 0}
+        assert not trades_importer.called
@@ -0,0 +1,60 @@
+from time import sleep
+
+from fakeredis import FakeRedis
+
+from apps.core.locks import RedisLock
+
+
+class TestRedisLock:
+    def get_lock(self, redis: FakeRedis) -> RedisLock:
+        return RedisLock(redis, 'test:lock:{name}', timeout=60)
+
+    def test_lock_is_exclusive(self, redis: FakeRedis):
+        first, second = self.get_lock(redis), self.get_lock(redis)
+        token = first.acquire('1')
+        assert token is not None
+        assert second.acquire('1') is None
+        assert second.acquire('2') is not None
+        assert first.release('1', token)
+        assert second.acquire('1') is not None
+
+    def test_lock_expires(self, redis: FakeRedis):
+        lock = self.get_lock(redis)
+        lock.acquire('1')
+        assert redis.ttl('test:lock:1') in range(1, 61)
+
+    def test_release_keeps_lock_of_another_owner(self, redis: FakeRedis):
+        lock = self.get_lock(redis)
+        token = lock.acquire('1')
+        assert token is not None
+        redis.delete('test:lock:1')
+        other_token = lock.acquire('1')
+        assert other_token is not None
+        assert not lock.release('1', token)
+        assert redis.get('test:lock:1') == other_token.encode()
+
+    def test_hold(self, redis: FakeRedis):
+        lock = self.get_lock(redis)
+        with lock.hold('1') as acquired:
+            assert acquired
+            with lock.hold('1') as acquired_again:
+                assert not acquired_again
+            assert redis.exists('test:lock:1')
+        assert not redis.exists('test:lock:1')
+
+    def test_extend(self, redis: FakeRedis):
+        lock = self.get_lock(redis)
+        token = lock.acquire('1')
+        assert token is not None
+        redis.expire('test:lock:1', 5)
+        assert lock.extend('1', token)
+        assert redis.ttl('test:lock:1') in range(6, 61)
+        assert not lock.extend('1', 'other')
+
+    def test_hold_renews_lock(self, redis: FakeRedis):
+        lock = RedisLock(redis, 'test:lock:{name}', timeout=1)
+        with lock.hold('1', renew=True) as acquired:
+            assert acquired
+            sleep(1.5)
+            assert redis.exists('test:lock:1')
+        assert not redis.exists('test:lock:1')
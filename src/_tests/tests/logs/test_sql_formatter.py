@@ -0,0 +1,46 @@
+import pytest
+
+from logging import DEBUG, LogRecord
+from unittest.mock import patch
+
+import sqlparse
+
+from tradi.logging_handlers import SQLFormatterFilter, format_sql, format_sql_fingerprint
+
+SQL = (
+    'SELECT "accounting_position"."id" FROM "accounting_position" '
+    'WHERE ("accounting_position"."user_id" = %s AND "accounting_position"."symbol" = %s) LIMIT 21'
+)
+
+
+def get_record(sql: str) -> LogRecord:
+    record = LogRecord(
+        'django.db.backends', DEBUG, __file__, 1, '(%.3f) %s; args=%s; alias=%s', (0.001, sql, None, 'default'), None
+    )
+    record.sql = sql
+    return record
+
+
+class TestSQLFormatter:
+    @pytest.mark.parametrize('params', [(1, "'BTCUSDT'"), (25, "'it''s'")])
+    def test_format_sql_keeps_values(self, params: tuple[int, str]):
+        sql = SQL % params
+        assert format_sql(sql) == sqlparse.format(sql, reindent=True, keyword_case='upper', indent_width=4)
+
+    def test_format_sql_reuses_fingerprint(self):
+        format_sql_fingerprint.cache_clear()
+        for user_id in range(5):
+            format_sql(SQL % (user_id, f"'SYMBOL{user_id}'"))
+        assert format_sql_fingerprint.cache_info().misses == 1
+        assert format_sql_fingerprint.cache_info().hits == 4
+
+    def test_filter_formats_lazily(self):
+        record = get_record(SQL % (1, "'BTCUSDT'"))
+        with patch('tradi.logging_handlers.format_sql', wraps=format_sql) as format_sql_mock:
+            assert SQLFormatterFilter().filter(record)
+            assert format_sql_mock.call_count == 0
+            message = record.getMessage()
+            assert record.getMessage() == message
+            assert format_sql_mock.call_count == 1
+        assert message.startswith('(0.001) SELECT "accounting_position"."id"\nFROM')
+        assert message.endswith('; args=None; alias=default')
@@ -0,0 +1,77 @@
+import pytest
+
+from logging import ERROR, LogRecord
+from threading import Barrier, Event, Thread
+from time import sleep
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+from tradi.logging_handlers import TelegramHandler
+
+
+def get_record(msg: str = 'Ошибка %s', *args: object, lineno: int = 1) -> LogRecord:
+    return LogRecord('django', ERROR, __file__, lineno, msg, args, None)
+
+
+class TestTelegramHandler:
+    @pytest.fixture
+    def handler(self) -> Iterator[TelegramHandler]:
+        handler = TelegramHandler(capacity=3, window=0.05)
+        handler.bot = Mock()
+        yield handler
+        handler.close()
+
+    def get_sent(self, handler: TelegramHandler) -> list[str]:
+        return [call.args[1] for call in handler.bot.send_message.call_args_list]
+
+    def test_identical_records_are_coalesced(self, handler: TelegramHandler):
+        handler.queue.maxsize = 10
+        for _ in range(3):
+            handler.handle(get_record('Ошибка %s', 1))
+        handler.handle(get_record('Ошибка %s', 2))
+        handler.close()
+        assert self.get_sent(handler) == ['Ошибка 1\n\nПовторов за 0.05 с: 3', 'Ошибка 2']
+
+    def test_records_are_dropped_when_queue_is_full(self, handler: TelegramHandler):
+        sending, released = Event(), Event()
+
+        def send_message(*args: object) -> None:
+            sending.set()
+            released.wait(5)
+
+        handler.bot.send_message.side_effect = send_message
+        handler.handle(get_record(lineno=1))
+        assert sending.wait(5)
+        # Отправка заблокирована, но запись лога не ждет ее.
+        for lineno in range(2, 7):
+            handler.handle(get_record(lineno=lineno))
+        assert handler.dropped == 2
+        released.set()
+        handler.close()
+        sent = self.get_sent(handler)
+        assert len(sent) == 5
+        assert sent[-1] == 'Очередь логов Telegram переполнена, отброшено записей: 2'
+
+    def test_concurrent_start_creates_one_thread(self, handler: TelegramHandler):
+        threads: list[Thread] = []
+
+        def create_thread(*args: object, **kwargs: object) -> Thread:
+            # Задержка расширяет окно между проверкой и запуском потока.
+            sleep(0.01)
+            thread = Thread(*args, **kwargs)  # type: ignore[arg-type]
+            threads.append(thread)
+            return thread
+
+        barrier = Barrier(8)
+
+        def start() -> None:
+            barrier.wait(5)
+            handler.start()
+
+        with patch('tradi.logging_handlers.Thread', side_effect=create_thread):
+            starters = [Thread(target=start) for _ in range(8)]
+            for starter in starters:
+                starter.start()
+            for starter in starters:
+                starter.join(5)
+        assert len(threads) == 1
@@ -0,0 +1,24 @@
+from apps.accounting.models import FinancialAsset, TradingPair
+from apps.accounting.models.enums import Exchange, MarketType
+
+
+class TestTradingPairManager:
+    def test_bulk_create_fills_symbol(self, bybit_futures_trading_pairs: list[TradingPair]):
+        for pair in TradingPair.objects.with_select_related():
+            assert pair.symbol == f'{pair.base_asset.ticker}{pair.quote_asset.ticker}'
+            assert pair.market == pair.base_asset.market
+            assert pair.exchange == pair.base_asset.exchange
+
+    def test_get_by_symbol(self, bybit_futures_trading_pairs: list[TradingPair]):
+        pair = bybit_futures_trading_pairs[0]
+        assert TradingPair.objects.get_by_symbol(pair.symbol, MarketType.FUTURES, Exchange.BYBIT) == pair
+        assert TradingPair.objects.get_by_symbol(pair.symbol, MarketType.SPOT, Exchange.BYBIT) is None
+        assert TradingPair.objects.get_by_symbol(pair.symbol, MarketType.FUTURES, Exchange.KUCOIN) is None
+
+    def test_asset_ticker_change_refreshes_symbol(self, bybit_futures_trading_pairs: list[TradingPair]):
+        pair = bybit_futures_trading_pairs[0]
+        asset = FinancialAsset.objects.get(pk=pair.base_asset_id)
+        asset.ticker = 'RENAMED'
+        asset.save()
+        pair.refresh_from_db()
+        assert pair.symbol == f'RENAMED{pair.quote_asset.ticker}'
@@ -0,0 +1,84 @@
+import pytest
+
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from fakeredis import FakeRedis
+
+from apps.bybit.tasks import get_current_usdt_linear_instruments
+from apps.core.metrics import MetricsRegistry
+from apps.core.signals.tasks import celery_task_duration
+from apps.users.models import User
+
+
+class TestMetricsRegistry:
+    @pytest.fixture
+    def registry(self, redis: FakeRedis) -> MetricsRegistry:
+        return MetricsRegistry(redis, flush_interval=60)
+
+    def test_values_of_processes_are_summed(self, registry: MetricsRegistry, redis: FakeRedis):
+        other_process = MetricsRegistry(redis)
+        for metrics in (registry, other_process):
+            errors = metrics.counter('test_errors_total', 'Ошибки.', ('code',))
+            errors.inc(code='10006')
+            errors.inc(2, code='10006')
+            metrics.flush()
+        assert registry.collect() == (
+            '# HELP test_errors_total Ошибки.\n# TYPE test_errors_total counter\ntest_errors_total{code="10006"} 6\n'
+        )
+
+    def test_histogram(self, registry: MetricsRegistry):
+        duration = registry.histogram('test_duration_seconds', 'Время.', ('route',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            duration.observe(value, route='a"b')
+        assert registry.flush() == 5
+        assert registry.collect().splitlines()[2:] == [
+            'test_duration_seconds_bucket{route="a\\"b",le="0.1"} 1',
+            'test_duration_seconds_bucket{route="a\\"b",le="1"} 2',
+            'test_duration_seconds_bucket{route="a\\"b",le="+Inf"} 3',
+            'test_duration_seconds_sum{route="a\\"b"} 5.55',
+            'test_duration_seconds_count{route="a\\"b"} 3',
+        ]
+
+    def test_labels_are_checked(self, registry: MetricsRegistry):
+        errors = registry.counter('test_errors_total', 'Ошибки.', ('code',))
+        with pytest.raises(ValueError):
+            errors.inc(path='/v5/market/tickers')
+
+
+class TestMetricsEndpoint:
+    url = reverse('core:metrics')
+
+    @pytest.fixture(autouse=True)
+    def enabled(self, metrics: MetricsRegistry) -> MetricsRegistry:
+        metrics.enabled = True
+        return metrics
+
+    def test_request_and_task_metrics(self, api_client: APIClient, enabled: MetricsRegistry, mocker, settings):
+        settings.METRICS_TOKEN = 'token'
+        api_client.get(reverse('api:v1:accounting:position-list'))
+        mocker.patch('apps.bybit.tasks.LinearUSDTGetter')
+        get_current_usdt_linear_instruments.apply()
+        enabled.flush()
+        response = api_client.get(self.url, HTTP_AUTHORIZATION='Bearer token')
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        lines = response.content.decode().splitlines()
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="api:v1:accounting:position-list",status="200"} 1'
+            in lines
+        )
+        task = get_current_usdt_linear_instruments.name
+        assert f'{celery_task_duration.name}_count{{task="{task}",state="SUCCESS"}} 1' in lines
+
+    def test_token(self, api_client: APIClient, settings):
+        settings.METRICS_TOKEN = 'token'
+        assert api_client.get(self.url).status_code == 403
+        assert api_client.get(self.url, HTTP_AUTHORIZATION='Bearer token').status_code == 200
+
+    def test_denied_without_token(self, api_client: APIClient, user: User, settings):
+        settings.METRICS_TOKEN = ''
+        assert api_client.get(self.url).status_code == 403
+        assert api_client.get(self.url, HTTP_AUTHORIZATION='Bearer ').status_code == 403
+        user.is_staff = True
+        user.save()
+        assert api_client.get(self.url).status_code == 200
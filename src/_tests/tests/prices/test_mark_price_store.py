@@ -0,0 +1,31 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from redis import RedisError
+
+from apps.accounting.prices import mark_price_store
+
+
+class TestMarkPriceStore:
+    def to_ms(self, seconds_ago: float) -> int:
+        return int((timezone.now() - timedelta(seconds=seconds_ago)).timestamp() * 1000)
+
+    def test_returns_only_fresh_prices(self):
+        fresh, stale, missing = ('BTCUSDT', 'FU', 'BYBIT'), ('ETHUSDT', 'FU', 'BYBIT'), ('XRPUSDT', 'FU', 'BYBIT')
+        mark_price_store.set_many({fresh: ('65000.5', self.to_ms(1)), stale: ('3000', self.to_ms(120))})
+        prices = mark_price_store.get_many([fresh, stale, missing, fresh])
+        assert list(prices) == [fresh]
+        assert prices[fresh].price == Decimal('65000.5')
+
+    def test_reads_all_prices_with_one_command(self, mocker, redis):
+        hmget = mocker.spy(redis, 'hmget')
+        keys = [(f'C{index}USDT', 'FU', 'BYBIT') for index in range(50)]
+        mark_price_store.set_many({key: ('1', self.to_ms(0)) for key in keys})
+        assert len(mark_price_store.get_many(keys)) == 50
+        assert hmget.call_count == 1
+
+    def test_redis_errors_degrade_to_no_prices(self, mocker, redis):
+        mocker.patch.object(redis, 'hmget', side_effect=RedisError)
+        assert mark_price_store.get_many([('BTCUSDT', 'FU', 'BYBIT')]) == {}
@@ -0,0 +1,55 @@
+import pytest
+
+from unittest.mock import patch
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core.middleware import RequestProfilingMiddleware
+from apps.users.models import User
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.REQUEST_PROFILING = 1
+    settings.REQUEST_PROFILING_SLOW_MS = 10_000
+    settings.REQUEST_PROFILING_MAX_QUERIES = 100
+    settings.REQUEST_PROFILING_REPEATED_QUERIES = 3
+    return settings
+
+
+def get_metrics(header: str) -> dict[str, str]:
+    return dict(metric.split(';', 1) for metric in header.split(', '))
+
+
+@pytest.mark.django_db
+class TestRequestProfilingMiddleware:
+    def test_disabled(self, settings):
+        settings.REQUEST_PROFILING = 0
+        with pytest.raises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(HttpResponse)
+
+    @pytest.mark.usefixtures('profiling', 'bybit_futures_positions')
+    def test_server_timing(self, api_client: APIClient):
+        response = api_client.get(reverse('api:v1:accounting:position-list'))
+        metrics = get_metrics(response['Server-Timing'])
+        assert set(metrics) == {'db', 'serializer', 'view', 'total'}
+        assert metrics['db'].endswith(' queries"')
+        assert float(metrics['serializer'].removeprefix('dur=')) > 0
+
+    def test_repeated_queries_are_logged(self, profiling, user: User):
+        def get_response(request: HttpRequest) -> HttpResponse:
+            for _ in range(4):
+                User.objects.filter(pk=user.pk).exists()
+            return HttpResponse()
+
+        middleware = RequestProfilingMiddleware(get_response)
+        with patch('apps.core.middleware.logger') as logger:
+            response = middleware(RequestFactory().get('/api/'))
+        assert '"4 queries"' in response['Server-Timing']
+        message = logger.warning.call_args.args[0]
+        assert 'Вероятно N+1, повторов 4, _tests/tests/profiling/test_request_profiling.py:' in message
+        assert 'in get_response' in message
@@ -0,0 +1,43 @@
+import pytest
+
+from fakeredis import FakeRedis
+from redis import RedisError
+
+from apps.core.exceptions import RateLimitTimeoutError
+from apps.core.ratelimiters import RedisTokenBucket
+
+
+class TestRedisTokenBucket:
+    def get_bucket(self, redis: FakeRedis, **kwargs) -> RedisTokenBucket:
+        return RedisTokenBucket(redis, 'test:bucket', **({'rate': 10, 'capacity': 2} | kwargs))
+
+    def test_burst_then_wait(self, redis: FakeRedis):
+        bucket = self.get_bucket(redis)
+        waits = [bucket.reserve() for _ in range(4)]
+        assert waits[:2] == [0, 0]
+        assert waits[2:] == [pytest.approx(0.1, abs=0.02), pytest.approx(0.2, abs=0.02)]
+
+    def test_buckets_share_state(self, redis: FakeRedis):
+        first, second = self.get_bucket(redis), self.get_bucket(redis)
+        assert first.reserve(2) == 0
+        assert second.reserve() == pytest.approx(0.1, abs=0.02)
+
+    def test_max_wait(self, redis: FakeRedis):
+        bucket = self.get_bucket(redis, max_wait=0.15)
+        bucket.reserve(2)
+        bucket.reserve()
+        with pytest.raises(RateLimitTimeoutError):
+            bucket.reserve()
+        assert bucket.reserve(0) == pytest.approx(0.1, abs=0.02)
+
+    def test_acquire_sleeps(self, redis: FakeRedis, mocker):
+        sleep = mocker.patch('apps.core.ratelimiters.sleep')
+        bucket = self.get_bucket(redis)
+        for _ in range(3):
+            bucket.acquire()
+        sleep.assert_called_once_with(pytest.approx(0.1, abs=0.02))
+
+    def test_acquire_without_redis(self, redis: FakeRedis, mocker):
+        bucket = self.get_bucket(redis)
+        mocker.patch.object(bucket, 'reserve', side_effect=RedisError)
+        bucket.acquire()
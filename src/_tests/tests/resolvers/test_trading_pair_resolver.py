@@ -0,0 +1,90 @@
+from time import monotonic
+
+from apps.accounting.models import TradingPair
+from apps.accounting.models.enums import Exchange, MarketType
+from apps.accounting.resolvers import trading_pair_resolver
+
+
+class TestTradingPairResolver:
+    def resolve(self, trading_pair: TradingPair) -> TradingPair | None:
+        return trading_pair_resolver.resolve(trading_pair.symbol, MarketType.FUTURES, Exchange.BYBIT)
+
+    def test_resolve_caches_locally(self, django_assert_num_queries, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        with django_assert_num_queries(1):
+            assert self.resolve(trading_pair) == trading_pair
+        with django_assert_num_queries(0):
+            resolved = self.resolve(trading_pair)
+        assert resolved == trading_pair
+        assert resolved.base_asset.ticker == trading_pair.base_asset.ticker
+        assert trading_pair_resolver.stats[trading_pair_resolver.LOCAL_HITS] == 1
+
+    def test_resolve_from_redis(self, django_assert_num_queries, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        self.resolve(trading_pair)
+        trading_pair_resolver.clear()
+        with django_assert_num_queries(0):
+            resolved = self.resolve(trading_pair)
+        assert resolved == trading_pair
+        assert resolved.symbol == trading_pair.symbol
+        assert resolved.base_asset == trading_pair.base_asset
+        assert resolved.quote_asset == trading_pair.quote_asset
+        assert trading_pair_resolver.stats[trading_pair_resolver.REDIS_HITS] == 1
+
+    def test_resolve_unknown_symbol(self, bybit_futures_trading_pairs: list[TradingPair]):
+        assert trading_pair_resolver.resolve('UNKNOWN', MarketType.FUTURES, Exchange.BYBIT) is None
+
+    def test_invalidate_on_save(
+        self,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+        bybit_futures_trading_pairs: list[TradingPair],
+    ):
+        trading_pair = bybit_futures_trading_pairs[0]
+        self.resolve(trading_pair)
+        with django_capture_on_commit_callbacks(execute=True):
+            trading_pair.traded = False
+            trading_pair.save()
+        with django_assert_num_queries(1):
+            resolved = self.resolve(trading_pair)
+        assert resolved is not None
+        assert resolved.traded is False
+
+    def test_get_stats(self, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        self.resolve(trading_pair)
+        self.resolve(trading_pair)
+        stats = trading_pair_resolver.get_stats()
+        assert stats[trading_pair_resolver.MISSES] == 1
+        assert stats[trading_pair_resolver.LOCAL_HITS] == 1
+
+    def test_local_hit_does_not_query_redis(self, mocker, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        self.resolve(trading_pair)
+        redis_get = mocker.spy(trading_pair_resolver.redis, 'get')
+        assert self.resolve(trading_pair) == trading_pair
+        redis_get.assert_not_called()
+
+    def test_version_from_other_process(self, mocker, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        self.resolve(trading_pair)
+        trading_pair_resolver.redis.incr(trading_pair_resolver.VERSION_KEY)
+        self.resolve(trading_pair)
+        assert trading_pair_resolver.stats[trading_pair_resolver.LOCAL_HITS] == 1
+        mocker.patch(
+            'apps.accounting.resolvers.monotonic', return_value=monotonic() + trading_pair_resolver.version_ttl
+        )
+        self.resolve(trading_pair)
+        assert trading_pair_resolver.stats[trading_pair_resolver.LOCAL_HITS] == 1
+
+    def test_resolve_returns_copies(self, bybit_futures_trading_pairs: list[TradingPair]):
+        trading_pair = bybit_futures_trading_pairs[0]
+        resolved = self.resolve(trading_pair)
+        assert resolved is not None
+        resolved.traded = False
+        resolved.base_asset.ticker = 'CHANGED'
+        cached = self.resolve(trading_pair)
+        assert cached is not None
+        assert cached is not resolved
+        assert cached.traded is True
+        assert cached.base_asset.ticker == trading_pair.base_asset.ticker
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from apps.accounting.models import FinancialAsset, TradingPair
+from apps.accounting.models import FinancialAsset, TradingPair, TradingPairSpec
 from apps.accounting.models.positions import Position, PositionComment
 
 
@@ -26,10 +26,19 @@ class FinancialAssetAdmin(admin.ModelAdmin):
     ordering = ('ticker',)
 
 
+class TradingPairSpecInline(admin.StackedInline):
+    """Торговые параметры инструмента, заполняемые синхронизацией с биржей."""
+
+    model = TradingPairSpec
+    can_delete = False
+
+
 @admin.register(TradingPair)
 class TradingPairAdmin(admin.ModelAdmin):
     """Административная модель для управления торговыми парами."""
 
+    inlines = (TradingPairSpecInline,)
+
     list_display = (
         'symbol',
         'base_asset',
@@ -42,6 +51,7 @@ class TradingPairAdmin(admin.ModelAdmin):
         'quote_asset',
     )
     search_fields = (
+        'symbol',
         'base_asset__ticker',
         'quote_asset__ticker',
     )
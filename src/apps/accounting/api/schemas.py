@@ -3,12 +3,15 @@ from rest_framework import status
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
-from apps.accounting.api.serializers.finances import TradingPairSerializer
+from apps.accounting.api.serializers.finances import TradingPairListQuerySerializer, TradingPairSerializer
 from apps.accounting.api.serializers.positions import (
     PositionCreateSerializer,
     PositionReadSerializer,
+    PositionStatsQuerySerializer,
+    PositionStatsSerializer,
     PositionUpdateSerializer,
 )
+from apps.accounting.api.serializers.tombstones import TombstoneQuerySerializer, TombstoneSerializer
 from apps.accounting.api.viewsets.filters.finances import PositionFilterSet, TradingPairFilterSet
 from apps.accounting.models.enums import Exchange, MarketType
 
@@ -27,6 +30,16 @@ ERROR_401 = openapi.Schema(
         'The request has not been applied because it lacks valid authentication credentials for the target resource.',
     ),
 )
+ERROR_410 = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={'detail': openapi.Schema(type=openapi.TYPE_STRING, example='Gone.')},
+    required=['detail'],
+    description='410 Gone error. `modified_since` is older than the deletion history, a full resync is required.',
+)
+SYNC_WATERMARK_DESCRIPTION = (
+    'Заголовок ответа `X-Sync-Watermark` содержит время, которое передается следующим `modified_since` '
+    'списка и удаленных объектов, вместо времени по часам клиента.'
+)
 ERROR_400 = openapi.Schema(
     type=openapi.TYPE_OBJECT,
     properties={'detail': openapi.Schema(type=openapi.TYPE_STRING, example='Bad Request.')},
@@ -79,14 +92,57 @@ class TradingPairViewSetSchema:
         tags=[TRADING_PAIR_TAG],
     )
     list = swagger_auto_schema(
-        operation_description='Возвращает список торговых пар, распределенных по биржам и рынкам.',
+        operation_description=(
+            'Возвращает список торговых пар, распределенных по биржам и рынкам. '
+            'С параметром `stream=true` ответ отдается потоком без построения всего списка в памяти. '
+            + SYNC_WATERMARK_DESCRIPTION
+        ),
         responses={status.HTTP_200_OK: resoponse_200} | COMMON_ERRORS,
         tags=[TRADING_PAIR_TAG],
-        query_serializer=TradingPairFilterSet.as_serializer(),
+        query_serializer=type(
+            'TradingPairListSwaggerSerializer',
+            (TradingPairListQuerySerializer, TradingPairFilterSet.as_serializer()),
+            {},
+        ),
+    )
+    deleted = swagger_auto_schema(
+        operation_description=(
+            'Возвращает ID торговых пар, удаленных начиная с `modified_since`. '
+            'Вместе с фильтром `modified_since` списка позволяет синхронизировать только изменения. '
+            'Если `modified_since` старше срока хранения отметок об удалении, возвращается 410 '
+            'и список нужно загрузить заново целиком. ' + SYNC_WATERMARK_DESCRIPTION
+        ),
+        query_serializer=TombstoneQuerySerializer,
+        responses={status.HTTP_200_OK: TombstoneSerializer(many=True), status.HTTP_410_GONE: ERROR_410} | COMMON_ERRORS,
+        tags=[TRADING_PAIR_TAG],
     )
 
 
 class PositionViewSetSchema:
+    bulk_create_schema = openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'created': openapi.Schema(type=openapi.TYPE_INTEGER, description='Количество созданных позиций.'),
+            'failed': openapi.Schema(type=openapi.TYPE_INTEGER, description='Количество строк с ошибками.'),
+            'results': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'index': openapi.Schema(type=openapi.TYPE_INTEGER, description='Номер строки в запросе.'),
+                        'id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID созданной позиции.'),
+                        'errors': openapi.Schema(type=openapi.TYPE_OBJECT, description='Ошибки валидации строки.'),
+                    },
+                    required=['index'],
+                ),
+            ),
+        },
+        required=['created', 'failed', 'results'],
+    )
+    bulk_create_response = openapi.Response(
+        description='Результат импорта по каждой строке.',
+        schema=bulk_create_schema,
+    )
     create = swagger_auto_schema(
         operation_description='Создает позицию.',
         request_body=PositionCreateSerializer,
@@ -105,7 +161,13 @@ class PositionViewSetSchema:
         tags=[POSITION_TAG],
     )
     list = swagger_auto_schema(
-        operation_description='Возвращает список позиций.',
+        operation_description=(
+            'Возвращает список позиций. По умолчанию используется навигация по номеру страницы, '
+            'позиции отсортированы по дате последнего комментария, затем по дате открытия. '
+            'Параметр `pagination=cursor` включает навигацию по ключу (opened_at, id): '
+            'позиции отсортированы по дате открытия, '
+            'ответ содержит ссылки `next` и `previous` без общего количества. ' + SYNC_WATERMARK_DESCRIPTION
+        ),
         responses=COMMON_ERRORS,
         tags=[POSITION_TAG],
         query_serializer=PositionFilterSet.as_serializer(),
@@ -115,6 +177,41 @@ class PositionViewSetSchema:
         responses=COMMON_ERRORS,
         tags=[POSITION_TAG],
     )
+    bulk_create = swagger_auto_schema(
+        operation_description=(
+            'Создает позиции пачкой. Принимает JSON-массив или NDJSON (application/x-ndjson). '
+            'Строки с ошибками пропускаются, ошибки возвращаются для каждой строки.'
+        ),
+        request_body=PositionCreateSerializer(many=True),
+        responses=COMMON_ERRORS | {status.HTTP_201_CREATED: bulk_create_response},
+        tags=[POSITION_TAG],
+    )
+
+    stats = swagger_auto_schema(
+        operation_description=(
+            'Возвращает статистику по позициям пользователя, рассчитанную в базе данных: количество позиций '
+            'и их стоимость (size * entry_price / leverage) всего и по группам. Группировка задается параметром '
+            '`group_by`, фильтры те же, что у списка позиций.'
+        ),
+        query_serializer=type(
+            'PositionStatsSwaggerSerializer',
+            (PositionStatsQuerySerializer, PositionFilterSet.as_serializer()),
+            {},
+        ),
+        responses={status.HTTP_200_OK: PositionStatsSerializer} | COMMON_ERRORS,
+        tags=[POSITION_TAG],
+    )
+    deleted = swagger_auto_schema(
+        operation_description=(
+            'Возвращает ID позиций пользователя, удаленных начиная с `modified_since`. '
+            'Вместе с фильтром `modified_since` списка позволяет синхронизировать только изменения. '
+            'Если `modified_since` старше срока хранения отметок об удалении, возвращается 410 '
+            'и список нужно загрузить заново целиком. ' + SYNC_WATERMARK_DESCRIPTION
+        ),
+        query_serializer=TombstoneQuerySerializer,
+        responses={status.HTTP_200_OK: TombstoneSerializer(many=True), status.HTTP_410_GONE: ERROR_410} | COMMON_ERRORS,
+        tags=[POSITION_TAG],
+    )
 
 
 class PositionCommentViewSetSchema:
@@ -33,7 +33,7 @@ class FinancialAssetSerializer(serializers.ModelSerializer):
 class TradingPairListSerializer(serializers.ListSerializer):
     """
     Сериализатор для списка торговых пар.
-    Группирует торговые пары по биржам и сериализует их.
+    Группирует торговые пары по биржам и сериализует их. Результат вычисляется один раз и кэшируется.
     """
 
     def to_representation(self, data: TradingPairQuerySet | None) -> defaultdict:  # type: ignore[override]
@@ -49,7 +49,9 @@ class TradingPairListSerializer(serializers.ListSerializer):
 
     @property
     def data(self) -> dict:  # type: ignore[override]
-        return self.to_representation(self.instance)
+        if not hasattr(self, '_data'):
+            self._data = self.to_representation(self.instance)
+        return self._data
 
 
 class TradingPairSerializer(serializers.ModelSerializer):
@@ -79,3 +81,13 @@ class TradingPairSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
         ref_name = 'TradingPair'
+
+
+class TradingPairListQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса списка торговых пар."""
+
+    stream = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text='Потоковая выдача: JSON пишется по мере чтения торговых пар, порядок - по бирже и рынку.',
+    )
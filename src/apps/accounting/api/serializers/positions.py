@@ -1,8 +1,18 @@
+from decimal import Decimal
+from typing import Any, Callable, Iterable
+
+from django.db.models.manager import BaseManager
 from rest_framework import serializers
 
 from apps.accounting.api.serializers.finances import TradingPairSerializer
 from apps.accounting.models import Position, PositionComment
-from apps.accounting.models.enums import Exchange, MarketType
+from apps.accounting.models.enums import Exchange, MarketType, PositionSide
+from apps.accounting.prices import mark_price_store
+from apps.accounting.resolvers import TradingPairKey, trading_pair_spec_cache
+from apps.accounting.validators import validate_position_spec
+from apps.core.serializers import CompiledListSerializer, CompiledSerializerMixin
+
+MARK_PRICES = 'mark_prices'
 
 
 class PositionCommentSerializer(serializers.ModelSerializer):
@@ -29,7 +39,12 @@ class PositionCommentSerializer(serializers.ModelSerializer):
 
 
 class PositionCreateSerializer(serializers.ModelSerializer):
-    """Сериализатор для создания позиции."""
+    """
+    Сериализатор для создания позиции.
+
+    Цены, размер и плечо проверяются по торговым параметрам инструмента из кэша в памяти процесса.
+    Если параметров нет (пара не найдена или не синхронизирована с биржей), проверка пропускается.
+    """
 
     symbol = serializers.CharField()
     market = serializers.ChoiceField(choices=MarketType.choices)
@@ -55,18 +70,151 @@ class PositionCreateSerializer(serializers.ModelSerializer):
             'closed_at',
         ]
 
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        spec = trading_pair_spec_cache.get(attrs['symbol'], attrs['market'], attrs['exchange'])
+        if spec is not None:
+            validate_position_spec(spec, attrs, creating=True)
+        return attrs
+
+
+def get_mark_price_key(position: Position) -> TradingPairKey:
+    trading_pair = position.trading_pair
+    return trading_pair.symbol, trading_pair.market, trading_pair.exchange
+
+
+def prefetch_mark_prices(
+    context: dict[str, Any], positions: Iterable[Position]
+) -> dict[TradingPairKey, Decimal | None]:
+    """
+    Загружает цены маркировки торговых пар открытых позиций в контекст сериализатора одной командой Redis.
+
+    Цены уже загруженных пар повторно не запрашиваются. Для пар без актуальной цены сохраняется None.
+
+    Аргументы:
+        context (dict[str, Any]): Контекст сериализатора.
+        positions (Iterable[Position]): Позиции с загруженными торговыми парами.
+
+    Возвращает:
+        dict[TradingPairKey, Decimal | None]: Цены по ключам торговых пар.
+    """
+    prices = context.setdefault(MARK_PRICES, {})
+    keys = [get_mark_price_key(position) for position in positions if not position.is_closed]
+    missing = [key for key in dict.fromkeys(keys) if key not in prices]
+    if missing:
+        mark_prices = mark_price_store.get_many(missing)
+        prices |= {key: mark_prices[key].price if key in mark_prices else None for key in missing}
+    return prices
+
+
+def get_unrealized_pnl(position: Position, mark_price: Decimal) -> Decimal | None:
+    """
+    Возвращает нереализованную прибыль позиции в активе расчета.
+
+    У линейных контрактов и спота прибыль считается в котируемом активе: `(mark_price - entry_price) * size`.
+    У обратных контрактов размер задан в котируемом активе (USD), а прибыль считается в базовом:
+    `size * (1 / entry_price - 1 / mark_price)`. Для длинной позиции знак прибыли сохраняется, для короткой
+    меняется на противоположный.
+    """
+    if position.trading_pair.is_inverse:
+        if not position.entry_price or not mark_price:
+            return None
+        pnl = position.size * (1 / position.entry_price - 1 / mark_price)
+    else:
+        pnl = (mark_price - position.entry_price) * position.size
+    return pnl if position.side == PositionSide.LONG else -pnl
+
+
+def get_margin(position: Position) -> Decimal | None:
+    """
+    Возвращает стоимость позиции в активе расчета, от которой считается процент прибыли.
+
+    У обратных контрактов - `size / entry_price / leverage` в базовом активе, у остальных - `position_value`.
+    """
+    if not position.trading_pair.is_inverse:
+        return position.position_value
+    if not position.entry_price:
+        return None
+    return position.size / position.entry_price / (position.leverage or 1)
+
+
+def get_pnl_pct(position: Position, mark_price: Decimal) -> Decimal | None:
+    """Возвращает нереализованную прибыль позиции в процентах от стоимости позиции в активе расчета."""
+    margin = get_margin(position)
+    pnl = get_unrealized_pnl(position, mark_price)
+    if not margin or pnl is None:
+        return None
+    return pnl / margin * 100
+
+
+class PositionValuationField(serializers.DecimalField):
+    """
+    Поле оценки открытой позиции по текущей цене маркировки.
+
+    Цена берется из контекста сериализатора (см. `prefetch_mark_prices`): сериализатор списка загружает цены
+    всех позиций страницы заранее, а для отдельной позиции цена загружается при первом обращении.
+    У закрытых позиций и позиций без актуальной цены значение - None.
+
+    Атрибуты:
+        valuation (Callable[[Position, Decimal], Decimal | None]): Оценка позиции по цене маркировки.
+    """
+
+    def __init__(self, valuation: Callable[[Position, Decimal], Decimal | None], **kwargs: Any) -> None:
+        self.valuation = valuation
+        kwargs.update(source='*', read_only=True, allow_null=True)
+        kwargs.setdefault('max_digits', None)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance: Position) -> Any:
+        if instance.is_closed:
+            return None
+        mark_price = prefetch_mark_prices(self.context, [instance])[get_mark_price_key(instance)]
+        if mark_price is None:
+            return None
+        return self.valuation(instance, mark_price)
+
+
+class MarkPriceListSerializerMixin:
+    """Загружает цены маркировки всех позиций списка одной командой Redis перед построением представления."""
+
+    context: dict[str, Any]
+
+    def to_representation(self, data: Any) -> list[dict[str, Any]]:
+        positions = list(data.all() if isinstance(data, BaseManager) else data)
+        prefetch_mark_prices(self.context, positions)
+        return super().to_representation(positions)  # type: ignore[misc]
+
+
+class PositionListSerializer(MarkPriceListSerializerMixin, serializers.ListSerializer):
+    """Сериализатор списка позиций."""
+
+
+class PositionFastListSerializer(MarkPriceListSerializerMixin, CompiledListSerializer):
+    """Сериализатор списка позиций, который строит представление элементов функцией из `compile_representation`."""
+
 
 class PositionReadSerializer(serializers.ModelSerializer):
-    """Сериализатор для чтения позиции."""
+    """
+    Сериализатор для чтения позиции.
+
+    Поля `mark_price`, `unrealized_pnl` и `pnl_pct` заполняются для открытых позиций по текущей цене маркировки
+    из Redis (см. `MarkPriceStore`) и равны None, если актуальной цены нет. Прибыль обратных контрактов
+    считается в базовом активе (см. `get_unrealized_pnl`).
+    """
 
     trading_pair = TradingPairSerializer(read_only=True)
     symbol = serializers.CharField(source='trading_pair.symbol')
     market = serializers.CharField(source='trading_pair.base_asset.market')
     exchange = serializers.CharField(source='trading_pair.base_asset.exchange')
     comments = PositionCommentSerializer(many=True, read_only=True)
+    mark_price = PositionValuationField(
+        lambda position, mark_price: mark_price, decimal_places=10, label='Цена маркировки'
+    )
+    unrealized_pnl = PositionValuationField(get_unrealized_pnl, decimal_places=10, label='Нереализованная прибыль')
+    pnl_pct = PositionValuationField(get_pnl_pct, decimal_places=2, label='Нереализованная прибыль, %')
 
     class Meta:
         model = Position
+        list_serializer_class: type[serializers.ListSerializer] = PositionListSerializer
         fields = [
             'id',
             'symbol',
@@ -79,6 +227,9 @@ class PositionReadSerializer(serializers.ModelSerializer):
             'size',
             'position_value',
             'entry_price',
+            'mark_price',
+            'unrealized_pnl',
+            'pnl_pct',
             'leverage',
             'liq_price',
             'take_profit',
@@ -94,8 +245,25 @@ class PositionReadSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class PositionFastReadSerializer(CompiledSerializerMixin, PositionReadSerializer):
+    """
+    Сериализатор для чтения позиции с тем же выводом, что у `PositionReadSerializer`.
+
+    Поля не разбираются заново для каждой позиции и вложенных торговой пары, активов и комментариев:
+    представление собирается один раз на запрос (см. `apps.core.serializers.compile_representation`).
+    """
+
+    class Meta(PositionReadSerializer.Meta):
+        list_serializer_class = PositionFastListSerializer
+
+
 class PositionUpdateSerializer(serializers.ModelSerializer):
-    """Сериализатор для обновления позиции."""
+    """
+    Сериализатор для обновления позиции.
+
+    Переданные цены, размер и плечо проверяются по торговым параметрам инструмента позиции
+    из кэша в памяти процесса.
+    """
 
     class Meta:
         model = Position
@@ -114,3 +282,69 @@ class PositionUpdateSerializer(serializers.ModelSerializer):
             'closed_at',
         ]
         write_only_fields = fields
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        if isinstance(self.instance, Position):
+            spec = trading_pair_spec_cache.get_by_trading_pair(self.instance.trading_pair_id)
+            if spec is not None:
+                validate_position_spec(spec, attrs)
+        return attrs
+
+
+class PositionStatsQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса статистики по позициям."""
+
+    GROUP_BY_CHOICES = ('trading_pair', 'side', 'market', 'month')
+
+    group_by = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        default=','.join(GROUP_BY_CHOICES),
+        help_text=f'Поля группировки через запятую: {", ".join(GROUP_BY_CHOICES)}. Пустое значение - без группировки.',
+    )
+
+    def validate_group_by(self, value: str) -> list[str]:
+        group_by = [field.strip() for field in value.split(',') if field.strip()]
+        unknown = [field for field in group_by if field not in self.GROUP_BY_CHOICES]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown group_by fields: {", ".join(unknown)}. Available: {", ".join(self.GROUP_BY_CHOICES)}.'
+            )
+        return list(dict.fromkeys(group_by))
+
+
+class PositionStatsTotalSerializer(serializers.Serializer):
+    """Сериализатор общей статистики по позициям."""
+
+    count = serializers.IntegerField()
+    open_count = serializers.IntegerField()
+    long_count = serializers.IntegerField()
+    short_count = serializers.IntegerField()
+    value = serializers.DecimalField(max_digits=None, decimal_places=10)
+    open_value = serializers.DecimalField(max_digits=None, decimal_places=10)
+    long_value = serializers.DecimalField(max_digits=None, decimal_places=10)
+    short_value = serializers.DecimalField(max_digits=None, decimal_places=10)
+
+
+class PositionStatsGroupSerializer(serializers.Serializer):
+    """Сериализатор статистики по группе позиций. Поля группировки присутствуют, только если запрошены."""
+
+    trading_pair = serializers.IntegerField(required=False)
+    symbol = serializers.CharField(required=False)
+    side = serializers.ChoiceField(choices=PositionSide.choices, required=False)
+    market = serializers.ChoiceField(choices=MarketType.choices, required=False)
+    month = serializers.DateField(required=False)
+    count = serializers.IntegerField()
+    size = serializers.DecimalField(max_digits=None, decimal_places=10)
+    value = serializers.DecimalField(max_digits=None, decimal_places=10)
+
+    def to_representation(self, instance: dict) -> dict:
+        fields = self.fields
+        return {name: fields[name].to_representation(value) for name, value in instance.items()}
+
+
+class PositionStatsSerializer(serializers.Serializer):
+    """Сериализатор статистики по позициям пользователя."""
+
+    total = PositionStatsTotalSerializer()
+    groups = PositionStatsGroupSerializer(many=True)
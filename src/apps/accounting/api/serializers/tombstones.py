@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from apps.accounting.models import Tombstone
+
+
+class TombstoneQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса удаленных объектов."""
+
+    modified_since = serializers.DateTimeField(help_text='Объекты, удаленные начиная с указанного времени.')
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    """Сериализатор отметки об удалении объекта."""
+
+    id = serializers.IntegerField(source='object_id')
+
+    class Meta:
+        model = Tombstone
+        fields = [
+            'id',
+            'deleted_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,86 @@
+from typing import Any
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from apps.accounting.api.serializers.positions import PositionCreateSerializer
+from apps.accounting.models import Position
+from apps.accounting.models.finances import TradingPair
+from apps.accounting.resolvers import TradingPairKey, trading_pair_spec_cache
+from apps.core.services.interfaces import ViewSetService
+
+
+class PositionBulkCreator(ViewSetService):
+    """
+    Сервис массового создания позиций из JSON-массива или NDJSON.
+
+    Все строки валидируются одним экземпляром сериализатора, торговые пары для всех уникальных
+    символов загружаются одним запросом, недостающие в кэше торговые параметры этих пар - еще одним,
+    позиции сохраняются через `bulk_create` пачками.
+    Ошибки валидации не прерывают импорт: они возвращаются для каждой строки отдельно.
+
+    Ответ:
+        created (int): Количество созданных позиций.
+        failed (int): Количество строк с ошибками.
+        results (list[dict]): Результат по каждой строке: `index` и `id` созданной позиции или `errors`.
+    """
+
+    BATCH_SIZE = 500
+    MAX_ROWS = 5000
+
+    def get_rows(self) -> list[Any]:
+        rows = self.request.data
+        if not isinstance(rows, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of positions.']})
+        if not rows:
+            raise ValidationError({'non_field_errors': ['The list of positions is empty.']})
+        if len(rows) > self.MAX_ROWS:
+            raise ValidationError({'non_field_errors': [f'Ensure there are no more than {self.MAX_ROWS} positions.']})
+        return rows
+
+    def get_keys(self, rows: list[Any]) -> set[TradingPairKey]:
+        keys = set()
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            symbol, market, exchange = row.get('symbol'), row.get('market'), row.get('exchange')
+            if isinstance(symbol, str) and isinstance(market, str) and isinstance(exchange, str):
+                keys.add((symbol, market, exchange))
+        return keys
+
+    def act(self) -> Response:
+        rows = self.get_rows()
+        keys = self.get_keys(rows)
+        trading_pairs = TradingPair.objects.get_by_symbols(keys)
+        trading_pair_spec_cache.get_many(keys)
+        serializer = PositionCreateSerializer()
+        results: list[dict[str, Any]] = []
+        created_rows: list[tuple[dict[str, Any], Position]] = []
+        for index, row in enumerate(rows):
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as exc:
+                results.append({'index': index, 'errors': exc.detail})
+                continue
+            symbol, market, exchange = data.pop('symbol'), data.pop('market'), data.pop('exchange')
+            trading_pair = trading_pairs.get((symbol, market, exchange))
+            if trading_pair is None:
+                error = f'Trading pair with symbol {symbol} not found in {market} on {exchange}.'
+                results.append({'index': index, 'errors': {'symbol': [error]}})
+                continue
+            data['user'] = self.request.user
+            data['trading_pair'] = trading_pair
+            result = {'index': index}
+            results.append(result)
+            created_rows.append((result, Position(**data)))
+        Position.objects.bulk_create([position for _, position in created_rows], batch_size=self.BATCH_SIZE)
+        for result, position in created_rows:
+            result['id'] = position.pk
+        data = {
+            'created': len(created_rows),
+            'failed': len(rows) - len(created_rows),
+            'results': results,
+        }
+        response_status = status.HTTP_201_CREATED if created_rows else status.HTTP_400_BAD_REQUEST
+        return Response(data, status=response_status)
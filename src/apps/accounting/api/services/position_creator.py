@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from apps.accounting.api.serializers.positions import PositionReadSerializer
 from apps.accounting.models import Position
 from apps.accounting.models.finances import TradingPair
+from apps.accounting.resolvers import trading_pair_resolver
 from apps.core.services.interfaces import ViewSetService
 
 
@@ -13,7 +14,7 @@ class PositionCreator(ViewSetService):
         symbol = data.pop('symbol')
         market = data.pop('market')
         exchange = data.pop('exchange')
-        trading_pair = TradingPair.objects.get_by_symbol(
+        trading_pair = trading_pair_resolver.resolve(
             symbol=symbol,
             market=market,
             exchange=exchange,
@@ -0,0 +1,81 @@
+from typing import Any
+
+from django.db.models import Count, DateField, F, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from rest_framework.response import Response
+
+from apps.accounting.api.serializers.positions import PositionStatsQuerySerializer, PositionStatsSerializer
+from apps.accounting.managers.positions import POSITION_VALUE
+from apps.accounting.models import Position
+from apps.accounting.models.enums import PositionSide
+from apps.core.services.interfaces import ViewSetService
+
+
+class PositionStatsCollector(ViewSetService):
+    """
+    Сервис расчета статистики по позициям пользователя.
+
+    Стоимость позиций (`size * entry_price / leverage`) и все суммы считаются в базе данных,
+    поэтому ответ строится двумя агрегирующими запросами независимо от количества позиций.
+    К позициям применяются те же фильтры, что и к списку позиций (`PositionFilterSet`).
+
+    Ответ:
+        total (dict): Количество и стоимость всех, открытых, длинных и коротких позиций.
+        groups (list[dict]): Количество, суммарный размер и стоимость позиций по группам
+            из параметра `group_by` (торговая пара, направление, рынок, месяц открытия).
+    """
+
+    GROUP_BY_FIELDS: dict[str, dict[str, Any]] = {
+        'trading_pair': {'trading_pair': F('trading_pair_id'), 'symbol': F('trading_pair__symbol')},
+        'side': {'side': F('side')},
+        'market': {'market': F('trading_pair__market')},
+        'month': {'month': TruncMonth('opened_at', output_field=DateField())},
+    }
+
+    def get_queryset(self) -> QuerySet[Position]:
+        queryset = Position.objects.filter(user=self.request.user)
+        return self.viewset.filter_queryset(queryset).order_by()
+
+    def get_group_by(self) -> list[str]:
+        serializer = PositionStatsQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['group_by']
+
+    def get_total(self, queryset: QuerySet[Position]) -> dict[str, Any]:
+        long, short, is_open = Q(side=PositionSide.LONG), Q(side=PositionSide.SHORT), Q(is_closed=False)
+        return queryset.aggregate(
+            count=Count('id'),
+            open_count=Count('id', filter=is_open),
+            long_count=Count('id', filter=long),
+            short_count=Count('id', filter=short),
+            value=Coalesce(Sum(POSITION_VALUE), 0, output_field=POSITION_VALUE.output_field),
+            open_value=Coalesce(Sum(POSITION_VALUE, filter=is_open), 0, output_field=POSITION_VALUE.output_field),
+            long_value=Coalesce(Sum(POSITION_VALUE, filter=long), 0, output_field=POSITION_VALUE.output_field),
+            short_value=Coalesce(Sum(POSITION_VALUE, filter=short), 0, output_field=POSITION_VALUE.output_field),
+        )
+
+    def get_groups(self, queryset: QuerySet[Position], group_by: list[str]) -> list[dict[str, Any]]:
+        if not group_by:
+            return []
+        expressions: dict[str, Any] = {}
+        for field in group_by:
+            expressions |= {f'group_{name}': expression for name, expression in self.GROUP_BY_FIELDS[field].items()}
+        rows = (
+            queryset.values(**expressions)
+            .annotate(count=Count('id'), total_size=Sum('size'), total_value=Sum(POSITION_VALUE))
+            .order_by(*expressions)
+        )
+        return [
+            {name.removeprefix('group_'): value for name, value in row.items() if name.startswith('group_')}
+            | {'count': row['count'], 'size': row['total_size'], 'value': row['total_value']}
+            for row in rows
+        ]
+
+    def act(self) -> Response:
+        group_by = self.get_group_by()
+        queryset = self.get_queryset()
+        data = {
+            'total': self.get_total(queryset),
+            'groups': self.get_groups(queryset, group_by),
+        }
+        return Response(PositionStatsSerializer(data).data)
@@ -0,0 +1,39 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from apps.accounting.api.serializers.tombstones import TombstoneQuerySerializer, TombstoneSerializer
+from apps.accounting.models import Tombstone
+from apps.core.services.interfaces import ViewSetService
+
+
+class SyncHistoryExpired(APIException):
+    """Удаленные объекты запрошены за период, отметки за который уже удалены: нужна полная синхронизация."""
+
+    status_code = status.HTTP_410_GONE
+    default_detail = 'modified_since is older than the deletion history, a full resync is required.'
+    default_code = 'sync_history_expired'
+
+
+class TombstoneLister(ViewSetService):
+    """
+    Сервис получения ID объектов, удаленных начиная с времени из параметра `modified_since`.
+
+    Дополняет фильтр `modified_since` списка: клиент запрашивает измененные объекты и удаленные объекты
+    с одним и тем же временем и применяет оба ответа к локальной копии.
+    Модель объектов берется из набора данных представления. Отметки хранятся `TOMBSTONE_RETENTION_DAYS` дней,
+    для более раннего `modified_since` возвращается 410, и клиент должен загрузить список заново целиком.
+    """
+
+    def act(self) -> Response:
+        serializer = TombstoneQuerySerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        modified_since = serializer.validated_data['modified_since']
+        if modified_since < Tombstone.objects.get_retention_start():
+            raise SyncHistoryExpired()
+        tombstones = Tombstone.objects.deleted_since(
+            self.viewset.get_queryset().model,
+            modified_since,
+            self.request.user.pk,
+        )
+        return Response(TombstoneSerializer(tombstones, many=True).data)
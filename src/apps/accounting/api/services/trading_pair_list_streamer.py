@@ -0,0 +1,56 @@
+from typing import Any, Iterator
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from apps.accounting.api.serializers.finances import TradingPairSerializer
+from apps.core.serializers import compile_representation
+from apps.core.services.interfaces import ViewSetService
+
+
+class TradingPairListStreamer(ViewSetService):
+    """
+    Сервис потоковой выдачи списка торговых пар, сгруппированных по биржам и рынкам.
+
+    Формат ответа совпадает с обычным списком (`TradingPairListSerializer`), но словарь целиком
+    в памяти не строится: торговые пары читаются из базы данных порциями через `iterator(chunk_size=...)`
+    в порядке (биржа, рынок), и JSON пишется в ответ по мере чтения. Потребление памяти не зависит
+    от размера каталога.
+    """
+
+    CHUNK_SIZE = 500
+
+    def get_queryset(self) -> Any:
+        queryset = self.viewset.filter_queryset(self.viewset.get_queryset())
+        return queryset.order_by('exchange', 'market', 'id')
+
+    def stream(self) -> Iterator[bytes]:
+        """Возвращает JSON по частям: одна часть на `CHUNK_SIZE` торговых пар."""
+        renderer = JSONRenderer()
+        represent = compile_representation(TradingPairSerializer(context=self.viewset.get_serializer_context()))
+        exchange = market = None
+        parts = [b'{']
+        for index, pair in enumerate(self.get_queryset().iterator(chunk_size=self.CHUNK_SIZE)):
+            if pair.exchange != exchange:
+                if exchange is not None:
+                    parts.append(b']},')
+                exchange, market = pair.exchange, None
+                parts.append(renderer.render(exchange) + b':{')
+            if pair.market != market:
+                if market is not None:
+                    parts.append(b'],')
+                market = pair.market
+                parts.append(renderer.render(market) + b':[')
+            else:
+                parts.append(b',')
+            parts.append(renderer.render(represent(pair)))
+            if (index + 1) % self.CHUNK_SIZE == 0:
+                yield b''.join(parts)
+                parts = []
+        if exchange is not None:
+            parts.append(b']}')
+        parts.append(b'}')
+        yield b''.join(parts)
+
+    def act(self) -> StreamingHttpResponse:  # type: ignore[override]
+        return StreamingHttpResponse(self.stream(), content_type='application/json')
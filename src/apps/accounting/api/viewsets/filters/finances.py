@@ -1,8 +1,8 @@
 from apps.accounting.models import Position, TradingPair
-from apps.core.filtersets import FilterSet
+from apps.core.filtersets import ModifiedSinceFilterSet
 
 
-class TradingPairFilterSet(FilterSet):
+class TradingPairFilterSet(ModifiedSinceFilterSet):
     """
     Фильтр для модели TradingPair.
 
@@ -19,6 +19,7 @@ class TradingPairFilterSet(FilterSet):
         - base_asset__market: Рынок базового актива.
         - quote_asset__market: Рынок котируемого актива.
         - traded: Флаг, указывающий, торгуется ли пара.
+        - modified_since: Пары, измененные начиная с указанного времени.
     """
 
     class Meta:
@@ -34,7 +35,7 @@ class TradingPairFilterSet(FilterSet):
         }
 
 
-class PositionFilterSet(FilterSet):
+class PositionFilterSet(ModifiedSinceFilterSet):
     """
     Фильтр для модели Position.
 
@@ -46,6 +47,7 @@ class PositionFilterSet(FilterSet):
         - trading_pair__base_asset__market: Рынок базового актива.
         - trading_pair__quote_asset__market: Рынок котируемого актива.
         - traded: Флаг, указывающий, торгуется ли пара.
+        - modified_since: Позиции, измененные начиная с указанного времени.
     """
 
     class Meta:
@@ -1,18 +1,50 @@
+from typing import Any
+
+from django.http import StreamingHttpResponse
 from django.utils.decorators import method_decorator
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 
 from apps.accounting.api.schemas import TradingPairViewSetSchema
-from apps.accounting.api.serializers.finances import TradingPairSerializer
+from apps.accounting.api.serializers.finances import TradingPairListQuerySerializer, TradingPairSerializer
+from apps.accounting.api.services.tombstone_lister import TombstoneLister
+from apps.accounting.api.services.trading_pair_list_streamer import TradingPairListStreamer
 from apps.accounting.api.viewsets.filters import TradingPairFilterSet
 from apps.accounting.models import TradingPair
+from apps.core.decorators import non_atomic_reads
+from apps.core.mixins import ConditionalGetMixin, SyncWatermarkMixin
 
 
+@non_atomic_reads
 @method_decorator(name='list', decorator=TradingPairViewSetSchema.list)
 @method_decorator(name='retrieve', decorator=TradingPairViewSetSchema.retrieve)
-class TradingPairViewSet(ModelViewSet):
+@method_decorator(name='deleted', decorator=TradingPairViewSetSchema.deleted)
+class TradingPairViewSet(SyncWatermarkMixin, ConditionalGetMixin, ModelViewSet):
     serializer_class = TradingPairSerializer
     queryset = TradingPair.objects.with_select_related()
     permission_classes = [IsAuthenticated]
     filterset_class = TradingPairFilterSet
     http_method_names = ['get']
+    conditional_modified_fields = (
+        'modified_at',
+        'base_asset__modified_at',
+        'quote_asset__modified_at',
+    )
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        query_serializer = TradingPairListQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        if not query_serializer.validated_data['stream']:
+            return super().list(request, *args, **kwargs)
+        queryset = self.get_conditional_queryset()
+        return self.conditional_response(queryset, self.stream_list, request, *args, **kwargs)
+
+    def stream_list(self, request: Request, *args: Any, **kwargs: Any) -> StreamingHttpResponse:
+        return TradingPairListStreamer(request, self)()
+
+    @action(detail=False, methods=['get'], url_path='deleted', url_name='deleted')
+    def deleted(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return TombstoneLister(request, self)()
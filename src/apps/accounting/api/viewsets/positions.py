@@ -1,6 +1,9 @@
 from typing import Any
 
+from django.db.models import Q
+from rest_framework.decorators import action
 from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -11,24 +14,44 @@ from apps.accounting.api.schemas import PositionCommentViewSetSchema, PositionVi
 from apps.accounting.api.serializers.positions import (
     PositionCommentSerializer,
     PositionCreateSerializer,
+    PositionFastReadSerializer,
     PositionReadSerializer,
     PositionUpdateSerializer,
 )
+from apps.accounting.api.services.position_bulk_creator import PositionBulkCreator
 from apps.accounting.api.services.position_creator import PositionCreator
+from apps.accounting.api.services.position_stats_collector import PositionStatsCollector
 from apps.accounting.api.services.position_updater import PositionUpdater
+from apps.accounting.api.services.tombstone_lister import TombstoneLister
 from apps.accounting.api.viewsets.filters import PositionFilterSet
 from apps.accounting.models import Position, PositionComment
-from apps.core.decorators import apply_viewset_schema
+from apps.accounting.prices import mark_price_store
+from apps.core.decorators import apply_viewset_schema, non_atomic_reads
+from apps.core.mixins import ConditionalGetMixin, KeysetPaginationMixin, SyncWatermarkMixin
 from apps.core.paginators import PageNumberPagination
+from apps.core.parsers import NDJSONParser
 
 
+@non_atomic_reads
 @apply_viewset_schema(PositionViewSetSchema)
-class PositionViewSet(ModelViewSet):
+class PositionViewSet(SyncWatermarkMixin, ConditionalGetMixin, KeysetPaginationMixin, ModelViewSet):
     serializer_class = PositionReadSerializer
     queryset = Position.objects.with_select_related().with_commets()
     permission_classes = [IsAuthenticated]
     filterset_class = PositionFilterSet
     pagination_class = PageNumberPagination
+    # Навигация по ключу требует уникального ключа из полей модели без NULL, поэтому в этом режиме позиции
+    # сортируются по дате открытия, а не по дате последнего комментария, как при навигации по номеру страницы.
+    keyset_ordering = ('-opened_at', '-id')
+    conditional_modified_fields = (
+        'modified_at',
+        'trading_pair__modified_at',
+        'trading_pair__base_asset__modified_at',
+        'trading_pair__quote_asset__modified_at',
+        'comments__modified_at',
+    )
+    conditional_count_fields = ('pk', 'comments')
+    conditional_volatile_filter = Q(is_closed=False)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_serializer_class(self) -> type[Serializer]:
@@ -38,14 +61,31 @@ class PositionViewSet(ModelViewSet):
             return PositionUpdateSerializer
         if self.action == 'update':
             raise MethodNotAllowed('PUT', detail='Use PATCH instead of PUT for update.')
+        if self.action in ('list', 'retrieve'):
+            return PositionFastReadSerializer
         return PositionReadSerializer
 
+    def get_conditional_volatile_version(self) -> str | None:
+        return mark_price_store.get_version()
+
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return PositionCreator(request, self)()
 
     def partial_update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
         return PositionUpdater(request, self)()
 
+    @action(detail=False, methods=['post'], url_path='bulk', url_name='bulk', parser_classes=[JSONParser, NDJSONParser])
+    def bulk_create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return PositionBulkCreator(request, self)()
+
+    @action(detail=False, methods=['get'], url_path='stats', url_name='stats')
+    def stats(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return PositionStatsCollector(request, self)()
+
+    @action(detail=False, methods=['get'], url_path='deleted', url_name='deleted')
+    def deleted(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return TombstoneLister(request, self)()
+
 
 @apply_viewset_schema(PositionCommentViewSetSchema)
 class PositionCommentViewSet(ModelViewSet):
@@ -5,3 +5,6 @@ class AccountingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounting'
     verbose_name = 'Торговый учет'
+
+    def ready(self) -> None:
+        from apps.accounting.signals import finances, positions  # noqa: F401
@@ -0,0 +1,161 @@
+from contextlib import contextmanager
+from statistics import mean
+from time import perf_counter
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.test import Client, RequestFactory
+from django.urls import resolve, reverse
+
+from apps.accounting.management.commands.benchmark_position_serializers import Command as PositionSerializersBenchmark
+from apps.accounting.models import FinancialAsset, Position, Tombstone, TradingPair
+from apps.users.models import User
+
+BENCHMARK_USERNAME = 'benchmark_position_serializers'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает количество запросов в секунду к читающим эндпоинтам позиций и торговых пар в двух режимах: '
+        'как раньше (транзакция на весь запрос и новое соединение с базой данных на каждый запрос) и текущем '
+        '(чтение без транзакции и постоянное соединение). Запросы выполняются обработчиком WSGI в этом процессе, '
+        'без HTTP-сервера, поэтому открытие и закрытие соединений происходит так же, как в gunicorn. '
+        'Синтетические позиции создаются перед замером и удаляются после него.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--requests', type=int, default=200, help='Количество запросов к эндпоинту в режиме.')
+        parser.add_argument('--rows', type=int, default=200, help='Количество синтетических позиций.')
+        parser.add_argument('--page-size', type=int, default=20, help='Размер страницы списка позиций.')
+        parser.add_argument(
+            '--conn-max-age',
+            type=int,
+            default=settings.DATABASES[DEFAULT_DB_ALIAS]['CONN_MAX_AGE'] or 60,
+            help='Время жизни соединения в текущем режиме в секундах.',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if User.objects.filter(username=BENCHMARK_USERNAME).exists():
+            raise CommandError(f'Пользователь {BENCHMARK_USERNAME} уже существует, удалите данные прошлого замера.')
+        with transaction.atomic():
+            PositionSerializersBenchmark().create_positions(options['rows'], comments=3)
+        user = User.objects.get(username=BENCHMARK_USERNAME)
+        try:
+            self.benchmark(user, options)
+        finally:
+            self.delete_positions(user)
+
+    def benchmark(self, user: User, options: dict[str, Any]) -> None:
+        position = Position.objects.filter(user=user).first()
+        if position is None:
+            raise CommandError('Нет позиций для замера.')
+        paths = {
+            'Список позиций': f'{reverse("api:v1:accounting:position-list")}?page_size={options["page_size"]}',
+            'Позиция': reverse('api:v1:accounting:position-detail', args=[position.pk]),
+            'Статистика позиций': reverse('api:v1:accounting:position-stats'),
+            'Торговая пара': reverse('api:v1:accounting:trading-pair-detail', args=[position.trading_pair_id]),
+        }
+        client = Client()
+        client.force_login(user)
+        request_factory = RequestFactory(
+            HTTP_HOST=settings.ALLOWED_HOSTS[0],
+            HTTP_COOKIE=f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}',
+        )
+        handler = WSGIHandler()
+        modes = (
+            ('ATOMIC_REQUESTS, CONN_MAX_AGE=0', True, 0),
+            (f'без транзакции, CONN_MAX_AGE={options["conn_max_age"]}', False, options['conn_max_age']),
+        )
+        for name, path in paths.items():
+            results = []
+            for mode, atomic, conn_max_age in modes:
+                with self.mode(path, atomic, conn_max_age):
+                    results.append(self.measure(handler, request_factory, path, options['requests']))
+            self.stdout.write(name)
+            for (mode, _, _), result in zip(modes, results):
+                self.stdout.write(
+                    f'  {mode}: {result["rps"]:.0f} запросов/с, среднее {result["mean"]:.2f} мс, '
+                    f'соединений {result["connections"]}'
+                )
+            self.stdout.write(self.style.SUCCESS(f'  Ускорение: {results[1]["rps"] / results[0]["rps"]:.2f}x'))
+
+    @contextmanager
+    def mode(self, path: str, atomic: bool, conn_max_age: int) -> Iterator[None]:
+        """
+        Переключает режим обработки запросов: транзакция на весь запрос и время жизни соединения.
+
+        Транзакция включается снятием отметки `non_atomic_requests` с представления, как было
+        до `apps.core.decorators.non_atomic_reads`.
+        """
+        view = resolve(path.split('?')[0]).func
+        non_atomic_requests: set[str] = getattr(view, '_non_atomic_requests', set())
+        connection = connections[DEFAULT_DB_ALIAS]
+        saved_conn_max_age = connection.settings_dict['CONN_MAX_AGE']
+        if atomic:
+            setattr(view, '_non_atomic_requests', set())
+        connection.settings_dict['CONN_MAX_AGE'] = conn_max_age
+        connection.close()
+        try:
+            yield
+        finally:
+            setattr(view, '_non_atomic_requests', non_atomic_requests)
+            connection.settings_dict['CONN_MAX_AGE'] = saved_conn_max_age
+            connection.close()
+
+    def measure(
+        self, handler: WSGIHandler, request_factory: RequestFactory, path: str, requests: int
+    ) -> dict[str, Any]:
+        """Выполняет `requests` запросов после прогрева и возвращает запросы в секунду, время и число соединений."""
+        connection = connections[DEFAULT_DB_ALIAS]
+        path, _, query_string = path.partition('?')
+        self.request(handler, request_factory, path, query_string)
+        timings = []
+        connections_opened = 0
+        for _ in range(requests):
+            started_at = perf_counter()
+            self.request(handler, request_factory, path, query_string)
+            timings.append(perf_counter() - started_at)
+            if connection.connection is None:
+                connections_opened += 1
+        return {'rps': len(timings) / sum(timings), 'mean': mean(timings) * 1000, 'connections': connections_opened}
+
+    def request(self, handler: WSGIHandler, request_factory: RequestFactory, path: str, query_string: str) -> None:
+        status = ''
+
+        def start_response(
+            response_status: str, headers: list[tuple[str, str]], exc_info: Any = None
+        ) -> Callable[[bytes], object]:
+            nonlocal status
+            status = response_status
+            return lambda data: None
+
+        environ = request_factory.get(path, QUERY_STRING=query_string).environ
+        response = handler(environ, start_response)
+        b''.join(response)
+        response.close()
+        if not status.startswith('200'):
+            raise CommandError(f'{path}: {status}')
+
+    def delete_positions(self, user: User) -> None:
+        """Удаляет синтетические позиции, их торговые пары, активы, пользователя и отметки об удалении."""
+        with transaction.atomic():
+            positions = Position.objects.filter(user=user)
+            position_ids = list(positions.values_list('pk', flat=True))
+            trading_pairs = TradingPair.objects.filter(positions__user=user).distinct()
+            trading_pair_ids = list(trading_pairs.values_list('pk', flat=True))
+            asset_ids = set(trading_pairs.values_list('base_asset_id', flat=True))
+            asset_ids.update(trading_pairs.values_list('quote_asset_id', flat=True))
+            positions.delete()
+            TradingPair.objects.filter(pk__in=trading_pair_ids).delete()
+            FinancialAsset.objects.filter(pk__in=asset_ids).delete()
+            user.delete()
+            Tombstone.objects.filter(
+                content_type=ContentType.objects.get_for_model(Position), object_id__in=position_ids
+            ).delete()
+            Tombstone.objects.filter(
+                content_type=ContentType.objects.get_for_model(TradingPair), object_id__in=trading_pair_ids
+            ).delete()
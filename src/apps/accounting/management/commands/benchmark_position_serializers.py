@@ -0,0 +1,98 @@
+from datetime import timedelta
+from decimal import Decimal
+from statistics import mean
+from time import perf_counter
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import BaseSerializer
+
+from apps.accounting.api.serializers.positions import PositionFastReadSerializer, PositionReadSerializer
+from apps.accounting.models import FinancialAsset, Position, PositionComment, TradingPair
+from apps.accounting.models.enums import AssetType, Exchange, MarketType, PositionSide
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время сериализации страницы позиций сериализаторами PositionReadSerializer '
+        'и PositionFastReadSerializer и проверяет, что их JSON совпадает байт в байт.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--rows', type=int, default=500, help='Количество позиций на странице.')
+        parser.add_argument('--repeat', type=int, default=20, help='Количество замеров для каждого сериализатора.')
+        parser.add_argument(
+            '--comments',
+            type=int,
+            default=3,
+            help='Количество комментариев у каждой синтетической позиции.',
+        )
+        parser.add_argument(
+            '--existing',
+            action='store_true',
+            help='Использовать позиции из базы данных вместо синтетических (создаются и откатываются).',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            if not options['existing']:
+                self.create_positions(options['rows'], options['comments'])
+            page = list(Position.objects.with_select_related().with_commets()[: options['rows']])
+            if not page:
+                raise CommandError('Нет позиций для замера.')
+            reference = self.measure(PositionReadSerializer, page, options['repeat'])
+            fast = self.measure(PositionFastReadSerializer, page, options['repeat'])
+            transaction.set_rollback(True)
+
+        if reference['content'] != fast['content']:
+            raise CommandError('Вывод PositionFastReadSerializer отличается от PositionReadSerializer.')
+        self.stdout.write(f'Позиций на странице: {len(page)}, размер ответа: {len(reference["content"])} байт')
+        for name, result in (('PositionReadSerializer', reference), ('PositionFastReadSerializer', fast)):
+            self.stdout.write(f'{name}: среднее {result["mean"]:.2f} мс, минимум {result["min"]:.2f} мс')
+        self.stdout.write(self.style.SUCCESS(f'Ускорение: {reference["mean"] / fast["mean"]:.2f}x'))
+
+    def measure(self, serializer_class: type[BaseSerializer], page: list[Position], repeat: int) -> dict[str, Any]:
+        """Сериализует и рендерит страницу `repeat` раз и возвращает время в миллисекундах и последний JSON."""
+        renderer = JSONRenderer()
+        timings = []
+        content = b''
+        for _ in range(repeat):
+            started_at = perf_counter()
+            content = renderer.render(serializer_class(page, many=True).data)
+            timings.append((perf_counter() - started_at) * 1000)
+        return {'mean': mean(timings), 'min': min(timings), 'content': content}
+
+    def create_positions(self, rows: int, comments: int) -> None:
+        """Создает синтетические позиции с комментариями внутри откатываемой транзакции."""
+        user = User.objects.create_user(username='benchmark_position_serializers')
+        asset_data = {'type': AssetType.CRYPTOCURRENCY, 'market': MarketType.FUTURES, 'exchange': Exchange.BYBIT}
+        quote_asset = FinancialAsset.objects.create(ticker='BENCHUSDT', **asset_data)
+        base_assets = FinancialAsset.objects.bulk_create(
+            FinancialAsset(ticker=f'BENCH{index}', **asset_data) for index in range(10)
+        )
+        trading_pairs = TradingPair.objects.bulk_create(
+            TradingPair(base_asset=asset, quote_asset=quote_asset) for asset in base_assets
+        )
+        now = timezone.now()
+        positions = Position.objects.bulk_create(
+            Position(
+                user=user,
+                trading_pair=trading_pairs[index % len(trading_pairs)],
+                side=PositionSide.LONG if index % 2 else PositionSide.SHORT,
+                size=Decimal(index + 1),
+                entry_price=Decimal('100.25') + index,
+                leverage=Decimal(index % 10 + 1),
+                stop_loss=Decimal('90.5') if index % 3 else None,
+                opened_at=now - timedelta(hours=index),
+            )
+            for index in range(rows)
+        )
+        PositionComment.objects.bulk_create(
+            PositionComment(position=position, comment=f'Комментарий {number}', chart_link='https://example.com/chart')
+            for position in positions
+            for number in range(comments)
+        )
@@ -0,0 +1,19 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.accounting.resolvers import trading_pair_resolver
+
+
+class Command(BaseCommand):
+    help = 'Выводит счетчики попаданий и промахов кэша поиска торговых пар, накопленные всеми процессами.'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stats = trading_pair_resolver.get_stats()
+        lookups = stats[trading_pair_resolver.LOCAL_HITS] + stats[trading_pair_resolver.REDIS_HITS]
+        lookups += stats[trading_pair_resolver.MISSES]
+        for name, value in stats.items():
+            self.stdout.write(f'{name}: {value}')
+        if lookups:
+            hits = lookups - stats[trading_pair_resolver.MISSES]
+            self.stdout.write(f'hit_ratio: {hits / lookups:.2%}')
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Iterable
 
-from django.db.models import CharField, F, Manager, QuerySet
-from django.db.models.functions import Concat
+from django.db.models import Manager, QuerySet
 
 if TYPE_CHECKING:
     from apps.accounting.models.enums import Exchange, MarketType
@@ -14,28 +13,39 @@ class TradingPairQuerySet(QuerySet['TradingPair']):
     def with_select_related(self) -> TradingPairQuerySet:
         return self.select_related('base_asset', 'quote_asset')
 
-    def annotate_symbol(self) -> TradingPairQuerySet:
-        return self.annotate(
-            pair_symbol=Concat(
-                F('base_asset__ticker'),
-                F('quote_asset__ticker'),
-                output_field=CharField(),
-            )
-        )
-
     def get_by_symbol(self, symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPair | None:
-        return (
-            self.annotate_symbol()
-            .filter(
-                pair_symbol=symbol,
-                base_asset__market=market,
-                quote_asset__market=market,
-                base_asset__exchange=exchange,
-                quote_asset__exchange=exchange,
-            )
-            .with_select_related()
-            .first()
-        )
+        return self.filter(symbol=symbol, market=market, exchange=exchange).with_select_related().first()
+
+    def get_by_symbols(
+        self, keys: Iterable[tuple[str, MarketType | str, Exchange | str]]
+    ) -> dict[tuple[str, str, str], TradingPair]:
+        """
+        Возвращает торговые пары для набора ключей (символ, рынок, биржа) одним запросом.
+
+        Ключи, для которых пара не найдена, в результат не попадают.
+        """
+        keys = {(symbol, str(market), str(exchange)) for symbol, market, exchange in keys}
+        if not keys:
+            return {}
+        symbols, markets, exchanges = (set(values) for values in zip(*keys))
+        trading_pairs = self.filter(symbol__in=symbols, market__in=markets, exchange__in=exchanges)
+        result = {}
+        for trading_pair in trading_pairs.with_select_related():
+            key = (trading_pair.symbol, trading_pair.market, trading_pair.exchange)
+            if key in keys:
+                result[key] = trading_pair
+        return result
+
+    def bulk_create(self, objs: Iterable[TradingPair], *args: Any, **kwargs: Any) -> list[TradingPair]:
+        """
+        Массово создает торговые пары, предварительно заполняя денормализованные поля.
+
+        `bulk_create` не вызывает `save`, поэтому символ, рынок и биржа заполняются здесь.
+        """
+        objs = list(objs)
+        for obj in objs:
+            obj.fill_symbol()
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class TradingPairManager(Manager['TradingPair']):
@@ -45,5 +55,10 @@ class TradingPairManager(Manager['TradingPair']):
     def get_by_symbol(self, symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPair | None:
         return self.get_queryset().get_by_symbol(symbol, market, exchange)
 
+    def get_by_symbols(
+        self, keys: Iterable[tuple[str, MarketType | str, Exchange | str]]
+    ) -> dict[tuple[str, str, str], TradingPair]:
+        return self.get_queryset().get_by_symbols(keys)
+
     def with_select_related(self) -> TradingPairQuerySet:
         return self.get_queryset().with_select_related()
@@ -1,9 +1,21 @@
 from __future__ import annotations
 
+from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from django.db.models import CharField, F, Manager, QuerySet
-from django.db.models.functions import Concat
+from django.apps import apps
+from django.db.models import (
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Manager,
+    OuterRef,
+    Prefetch,
+    QuerySet,
+    Subquery,
+    Value,
+)
+from django.db.models.functions import Coalesce, NullIf
 
 from apps.accounting.models.enums import Exchange, MarketType
 
@@ -12,6 +24,13 @@ if TYPE_CHECKING:
     from apps.users.models import User
 
 
+POSITION_VALUE = ExpressionWrapper(
+    F('size') * F('entry_price') / Coalesce(NullIf(F('leverage'), Value(Decimal(0))), Value(Decimal(1))),
+    output_field=DecimalField(max_digits=40, decimal_places=10),
+)
+"""Стоимость позиции `size * entry_price / leverage`, как в `Position.position_value`, на стороне базы данных."""
+
+
 class PositionQuerySet(QuerySet['Position']):
     def with_select_related(self) -> PositionQuerySet:
         return self.select_related(
@@ -22,24 +41,15 @@ class PositionQuerySet(QuerySet['Position']):
         )
 
     def annotate_symbol(self) -> PositionQuerySet:
-        return self.annotate(
-            pair_symbol=Concat(
-                F('trading_pair__base_asset__ticker'),
-                F('trading_pair__quote_asset__ticker'),
-                output_field=CharField(),
-            )
-        )
+        return self.annotate(pair_symbol=F('trading_pair__symbol'))
 
     def get_by_symbol(self, symbol: str, market: MarketType, exchange: Exchange | str) -> Position | None:
         return (
-            self.annotate_symbol()
-            .with_select_related()
+            self.with_select_related()
             .filter(
-                pair_symbol=symbol,
-                trading_pair__base_asset__market=market,
-                trading_pair__quote_asset__market=market,
-                trading_pair__quote_asset__exchange=exchange,
-                trading_pair__base_asset__exchange=exchange,
+                trading_pair__symbol=symbol,
+                trading_pair__market=market,
+                trading_pair__exchange=exchange,
             )
             .first()
         )
@@ -47,8 +57,24 @@ class PositionQuerySet(QuerySet['Position']):
     def get_by_user(self, user: User) -> PositionQuerySet:
         return self.filter(user=user).with_select_related().annotate_symbol()
 
+    def annotate_last_commented_at(self) -> PositionQuerySet:
+        PositionComment = apps.get_model('accounting', 'PositionComment')
+        last_comment = PositionComment.objects.filter(position=OuterRef('pk')).order_by('-created_at')
+        return self.annotate(last_commented_at=Subquery(last_comment.values('created_at')[:1]))
+
     def with_commets(self) -> PositionQuerySet:
-        return self.prefetch_related('comments').order_by('-comments__created_at')
+        """
+        Загружает комментарии позиций отдельным запросом и сортирует позиции по дате последнего комментария.
+
+        Дата последнего комментария вычисляется подзапросом, поэтому каждая позиция попадает в выборку
+        один раз, а не по строке на каждый комментарий, как при сортировке через JOIN.
+        """
+        PositionComment = apps.get_model('accounting', 'PositionComment')
+        return (
+            self.prefetch_related(Prefetch('comments', queryset=PositionComment.objects.order_by('-created_at')))
+            .annotate_last_commented_at()
+            .order_by(F('last_commented_at').desc(nulls_last=True), '-opened_at', '-id')
+        )
 
 
 class PositionManager(Manager['Position']):
@@ -66,3 +92,9 @@ class PositionManager(Manager['Position']):
 
     def get_by_user(self, user: User) -> PositionQuerySet:
         return self.get_queryset().get_by_user(user)
+
+    def annotate_last_commented_at(self) -> PositionQuerySet:
+        return self.get_queryset().annotate_last_commented_at()
+
+    def with_commets(self) -> PositionQuerySet:
+        return self.get_queryset().with_commets()
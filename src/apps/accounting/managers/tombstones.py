@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Manager, Model, Q, QuerySet
+from django.utils import timezone
+
+if TYPE_CHECKING:
+    from apps.accounting.models.tombstones import Tombstone
+
+
+class TombstoneQuerySet(QuerySet['Tombstone']):
+    def for_model(self, model: type[Model]) -> TombstoneQuerySet:
+        return self.filter(content_type=ContentType.objects.get_for_model(model))
+
+    def deleted_since(self, model: type[Model], since: datetime, owner_id: int | None) -> TombstoneQuerySet:
+        """Возвращает отметки об удалении общих объектов модели и объектов владельца, начиная с указанного времени."""
+        return (
+            self.for_model(model)
+            .filter(Q(owner_id=owner_id) | Q(owner_id__isnull=True), deleted_at__gte=since)
+            .order_by('deleted_at', 'id')
+        )
+
+
+class TombstoneManager(Manager['Tombstone']):
+    def get_queryset(self) -> TombstoneQuerySet:
+        return TombstoneQuerySet(self.model, using=self._db)
+
+    def record(self, instance: Model, owner_id: int | None = None) -> Tombstone:
+        """
+        Сохраняет отметку об удалении объекта.
+
+        Аргументы:
+            instance (Model): Удаленный объект.
+            owner_id (int | None): ID пользователя-владельца объекта. None - объект общий для всех пользователей.
+        """
+        return self.create(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_id=instance.pk,
+            owner_id=owner_id,
+        )
+
+    def deleted_since(self, model: type[Model], since: datetime, owner_id: int | None) -> TombstoneQuerySet:
+        return self.get_queryset().deleted_since(model, since, owner_id)
+
+    def get_retention_start(self) -> datetime:
+        """Возвращает время, начиная с которого хранятся отметки об удалении (`TOMBSTONE_RETENTION_DAYS`)."""
+        return timezone.now() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+
+    def prune(self) -> int:
+        """
+        Удаляет отметки об удалении старше срока хранения.
+
+        Возвращает:
+            int: Количество удаленных отметок.
+        """
+        return self.filter(deleted_at__lt=self.get_retention_start()).delete()[0]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+def fill_trading_pair_symbol(apps, schema_editor):
+    TradingPair = apps.get_model('accounting', 'TradingPair')
+    pairs = list(TradingPair.objects.select_related('base_asset', 'quote_asset'))
+    for pair in pairs:
+        pair.symbol = f'{pair.base_asset.ticker}{pair.quote_asset.ticker}'
+        pair.market = pair.base_asset.market
+        pair.exchange = pair.base_asset.exchange
+    TradingPair.objects.bulk_update(pairs, ['symbol', 'market', 'exchange'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_positioncomment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tradingpair',
+            name='symbol',
+            field=models.CharField(
+                default='',
+                editable=False,
+                help_text='Комбинация тикеров базового и котируемого активов, например: BTCUSDT',
+                max_length=100,
+                verbose_name='Символ',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tradingpair',
+            name='market',
+            field=models.CharField(
+                choices=[('SP', 'Спот'), ('FU', 'Фьючерсы'), ('OP', 'Опционы'), ('MA', 'Маржинальная торговля')],
+                default='',
+                editable=False,
+                max_length=2,
+                verbose_name='Рынок',
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='tradingpair',
+            name='exchange',
+            field=models.CharField(
+                choices=[('ByBit', 'ByBit'), ('KuCoin', 'KuCoin')],
+                default='',
+                editable=False,
+                max_length=50,
+                verbose_name='Биржа',
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_trading_pair_symbol, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tradingpair',
+            index=models.Index(fields=['symbol', 'market', 'exchange'], name='trading_pair_symbol_idx'),
+        ),
+    ]
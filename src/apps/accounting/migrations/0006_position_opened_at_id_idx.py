@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_tradingpair_symbol'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['-opened_at', '-id'], name='position_opened_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_position_opened_at_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='positioncomment',
+            index=models.Index(fields=['position', '-created_at'], name='position_comment_created_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2 on 2026-10-18 13:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0007_position_comment_created_idx'),
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='ID владельца')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата и время удаления')),
+            ],
+            options={
+                'verbose_name': 'Отметка об удалении',
+                'verbose_name_plural': 'Отметки об удалении',
+                'ordering': ['deleted_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['modified_at'], name='position_modified_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tradingpair',
+            index=models.Index(fields=['modified_at'], name='trading_pair_modified_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='content_type',
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name='+',
+                to='contenttypes.contenttype',
+                verbose_name='Тип объекта',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['content_type', 'deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
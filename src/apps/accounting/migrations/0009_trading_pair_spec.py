@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 13:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0008_modified_at_idx_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradingPairSpec',
+            fields=[
+                (
+                    'trading_pair',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='spec',
+                        serialize=False,
+                        to='accounting.tradingpair',
+                        verbose_name='Торговая пара',
+                    ),
+                ),
+                ('tick_size', models.DecimalField(decimal_places=10, max_digits=22, verbose_name='Шаг цены')),
+                ('qty_step', models.DecimalField(decimal_places=10, max_digits=22, verbose_name='Шаг количества')),
+                (
+                    'min_order_qty',
+                    models.DecimalField(decimal_places=10, max_digits=22, verbose_name='Минимальное количество'),
+                ),
+                (
+                    'max_order_qty',
+                    models.DecimalField(
+                        blank=True, decimal_places=10, max_digits=22, null=True, verbose_name='Максимальное количество'
+                    ),
+                ),
+                (
+                    'max_leverage',
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name='Максимальное кредитное плечо',
+                    ),
+                ),
+                ('launched_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата и время запуска')),
+            ],
+            options={
+                'verbose_name': 'Параметры торговой пары',
+                'verbose_name_plural': 'Параметры торговых пар',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 14:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0009_trading_pair_spec'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='position',
+            name='external_id',
+            field=models.CharField(
+                blank=True,
+                help_text='Идентификатор импортированной с биржи позиции, у позиций, внесенных вручную, не заполнен',
+                max_length=128,
+                null=True,
+                verbose_name='Идентификатор на бирже',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='position',
+            constraint=models.UniqueConstraint(fields=('user', 'external_id'), name='position_user_external_id_unique'),
+        ),
+    ]
@@ -1,9 +1,12 @@
-from apps.accounting.models.finances import FinancialAsset, TradingPair
+from apps.accounting.models.finances import FinancialAsset, TradingPair, TradingPairSpec
 from apps.accounting.models.positions import Position, PositionComment
+from apps.accounting.models.tombstones import Tombstone
 
 __all__ = [
     'FinancialAsset',
     'Position',
     'PositionComment',
+    'Tombstone',
     'TradingPair',
+    'TradingPairSpec',
 ]
@@ -8,6 +8,9 @@ from apps.accounting.models.enums import AssetType, Exchange, MarketType
 from apps.accounting.validators import validate_compatible_assets
 from apps.core.models import TimestampedModel
 
+# Котируемые активы обратных контрактов: размер позиции задается в них, а расчет ведется в базовом активе.
+INVERSE_QUOTE_TICKERS = frozenset({'USD'})
+
 
 class FinancialAsset(TimestampedModel):
     """
@@ -83,14 +86,22 @@ class TradingPair(TimestampedModel):
         base_asset (ForeignKey): Базовый актив в паре.
         quote_asset (ForeignKey): Котируемый актив в паре.
         traded (bool): Флаг, указывающий, торгуется ли пара.
+        symbol (str): Символ торговой пары, комбинация тикеров базового и котируемого активов.
+        market (str): Рынок торговой пары, совпадает с рынком активов.
+        exchange (str): Биржа торговой пары, совпадает с биржей активов.
+
+    Поля `symbol`, `market` и `exchange` денормализованы из активов, чтобы поиск пары по символу
+    обслуживался индексом без соединения с таблицей активов.
 
     Методы:
         clean() -> None:
             Выполняет валидацию торговой пары, проверяя совместимость активов.
+        fill_symbol() -> None:
+            Заполняет денормализованные поля `symbol`, `market` и `exchange` по активам пары.
+        is_inverse -> bool:
+            Является ли пара обратным контрактом.
         save(*args: Any, **kwargs: Any) -> None:
             Сохраняет объект после проверки на валидность.
-        symbol() -> str:
-            Возвращает символ (текер) торговой пары, представляющий комбинацию тикеров базового и котируемого активов.
     """
 
     base_asset = models.ForeignKey(
@@ -109,6 +120,24 @@ class TradingPair(TimestampedModel):
         'Торгуется',
         default=True,
     )
+    symbol = models.CharField(
+        'Символ',
+        max_length=100,
+        editable=False,
+        help_text='Комбинация тикеров базового и котируемого активов, например: BTCUSDT',
+    )
+    market = models.CharField(
+        'Рынок',
+        max_length=2,
+        choices=MarketType.choices,
+        editable=False,
+    )
+    exchange = models.CharField(
+        'Биржа',
+        max_length=50,
+        choices=Exchange.choices,
+        editable=False,
+    )
 
     objects: TradingPairManager = TradingPairManager()
 
@@ -116,19 +145,30 @@ class TradingPair(TimestampedModel):
         """Проверяет, что базовый и котируемый активы совместимы."""
         validate_compatible_assets(self.base_asset, self.quote_asset)
 
-    def save(self, *args: Any, **kwargs: Any) -> None:
-        """Переопределяет стандартный метод save, добавляя предварительную проверку."""
-        self.clean()
-        super().save(*args, **kwargs)
-
-    @property
-    def symbol(self) -> str:
+    def fill_symbol(self) -> None:
         """
-        Возвращает символ торговой пары.
+        Заполняет денормализованные поля торговой пары.
 
         Символ составляется из тикеров базового и котируемого активов, например: 'BTCUSDT'.
+        Рынок и биржа берутся из базового актива, совместимость с котируемым активом проверяет `clean`.
         """
-        return f'{self.base_asset.ticker}{self.quote_asset.ticker}'
+        self.symbol = f'{self.base_asset.ticker}{self.quote_asset.ticker}'
+        self.market = self.base_asset.market
+        self.exchange = self.base_asset.exchange
+
+    @property
+    def is_inverse(self) -> bool:
+        """Проверяет, что пара - обратный контракт: фьючерс с котируемым активом USD."""
+        return self.market == MarketType.FUTURES and self.quote_asset.ticker in INVERSE_QUOTE_TICKERS
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """Переопределяет стандартный метод save, добавляя предварительную проверку и заполнение символа."""
+        self.clean()
+        self.fill_symbol()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'symbol', 'market', 'exchange'}
+        super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = 'Торговая пара'
@@ -142,9 +182,86 @@ class TradingPair(TimestampedModel):
                 name='unique_pair',
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['symbol', 'market', 'exchange'],
+                name='trading_pair_symbol_idx',
+            ),
+            models.Index(
+                fields=['modified_at'],
+                name='trading_pair_modified_at_idx',
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.symbol
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}({self.base_asset}, {self.quote_asset})'
+
+
+class TradingPairSpec(models.Model):
+    """
+    Торговые параметры инструмента биржи для торговой пары.
+
+    Заполняются задачей синхронизации инструментов и используются для проверки цен, размера
+    и плеча позиций без обращения к бирже.
+
+    Атрибуты:
+        trading_pair (OneToOneField): Торговая пара, она же первичный ключ.
+        tick_size (Decimal): Шаг цены.
+        qty_step (Decimal): Шаг количества.
+        min_order_qty (Decimal): Минимальное количество в ордере.
+        max_order_qty (Decimal | None): Максимальное количество в ордере.
+        max_leverage (Decimal | None): Максимальное кредитное плечо, None для инструментов без плеча.
+        launched_at (datetime | None): Дата и время запуска инструмента на бирже.
+    """
+
+    trading_pair = models.OneToOneField(
+        TradingPair,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='spec',
+        verbose_name='Торговая пара',
+    )
+    tick_size = models.DecimalField(
+        'Шаг цены',
+        max_digits=22,
+        decimal_places=10,
+    )
+    qty_step = models.DecimalField(
+        'Шаг количества',
+        max_digits=22,
+        decimal_places=10,
+    )
+    min_order_qty = models.DecimalField(
+        'Минимальное количество',
+        max_digits=22,
+        decimal_places=10,
+    )
+    max_order_qty = models.DecimalField(
+        'Максимальное количество',
+        max_digits=22,
+        decimal_places=10,
+        null=True,
+        blank=True,
+    )
+    max_leverage = models.DecimalField(
+        'Максимальное кредитное плечо',
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    launched_at = models.DateTimeField(
+        'Дата и время запуска',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Параметры торговой пары'
+        verbose_name_plural = 'Параметры торговых пар'
+
+    def __str__(self) -> str:
+        return str(self.trading_pair)
@@ -97,6 +97,13 @@ class Position(TimestampedModel):
         null=True,
         blank=True,
     )
+    external_id = models.CharField(
+        'Идентификатор на бирже',
+        max_length=128,
+        null=True,
+        blank=True,
+        help_text='Идентификатор импортированной с биржи позиции, у позиций, внесенных вручную, не заполнен',
+    )
 
     objects: PositionManager = PositionManager()
 
@@ -104,6 +111,22 @@ class Position(TimestampedModel):
         verbose_name = 'Позиция'
         verbose_name_plural = 'Позиции'
         ordering = ['-opened_at']
+        indexes = [
+            models.Index(
+                fields=['-opened_at', '-id'],
+                name='position_opened_at_id_idx',
+            ),
+            models.Index(
+                fields=['modified_at'],
+                name='position_modified_at_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'external_id'],
+                name='position_user_external_id_unique',
+            ),
+        ]
 
     def __str__(self):
         return f'Позиция {self.trading_pair} ({self.side})'
@@ -149,6 +172,12 @@ class PositionComment(TimestampedModel):
         verbose_name = 'Комментарий к позиции'
         verbose_name_plural = 'Комментарии к позициям'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['position', '-created_at'],
+                name='position_comment_created_idx',
+            )
+        ]
 
     def __str__(self):
         return f'Комментарий для {self.position} от {self.created_at:%H:%M %Y-%m-%d}'
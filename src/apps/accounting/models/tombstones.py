@@ -0,0 +1,55 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+from apps.accounting.managers.tombstones import TombstoneManager
+
+
+class Tombstone(models.Model):
+    """
+    Отметка об удалении объекта для инкрементальной синхронизации клиентов.
+
+    Клиент, получающий изменения через параметр `modified_since`, не может узнать об удаленных объектах
+    из самого списка, поэтому при удалении торговой пары или позиции сохраняется ее тип и ID.
+
+    Атрибуты:
+        content_type (ContentType): Модель удаленного объекта.
+        object_id (int): ID удаленного объекта.
+        owner_id (int | None): ID пользователя-владельца объекта или None для общих объектов.
+            Хранится без внешнего ключа, чтобы отметки не мешали каскадному удалению пользователя.
+        deleted_at (datetime): Дата и время удаления.
+    """
+
+    content_type = models.ForeignKey(
+        ContentType,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Тип объекта',
+    )
+    object_id = models.PositiveBigIntegerField(
+        'ID объекта',
+    )
+    owner_id = models.PositiveBigIntegerField(
+        'ID владельца',
+        null=True,
+        blank=True,
+    )
+    deleted_at = models.DateTimeField(
+        'Дата и время удаления',
+        auto_now_add=True,
+    )
+
+    objects: TombstoneManager = TombstoneManager()
+
+    class Meta:
+        verbose_name = 'Отметка об удалении'
+        verbose_name_plural = 'Отметки об удалении'
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(
+                fields=['content_type', 'deleted_at'],
+                name='tombstone_deleted_at_idx',
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.content_type} #{self.object_id} удален {self.deleted_at:%H:%M %Y-%m-%d}'
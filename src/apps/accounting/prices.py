@@ -0,0 +1,155 @@
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from logging import getLogger
+from time import time
+from typing import Iterable, cast
+
+from django.utils import timezone
+
+from redis import Redis, RedisError
+
+from tradi.redis import redis_client
+
+from apps.accounting.resolvers import TradingPairKey
+
+logger = getLogger('main')
+
+
+@dataclass(frozen=True)
+class MarkPrice:
+    """
+    Цена маркировки торговой пары.
+
+    Атрибуты:
+        price (Decimal): Цена.
+        updated_at (datetime): Время цены по часам биржи.
+    """
+
+    price: Decimal
+    updated_at: datetime
+
+    def is_stale(self, max_age: timedelta, now: datetime | None = None) -> bool:
+        """Проверяет, что цена старше `max_age`."""
+        return (now or timezone.now()) - self.updated_at > max_age
+
+
+class MarkPriceStore:
+    """
+    Текущие цены маркировки торговых пар в Redis.
+
+    Все цены хранятся в одном хеше: поле - символ, рынок и биржа пары, значение - цена и время цены
+    в миллисекундах Unix. Поэтому цены любого набора пар читаются одной командой `HMGET`, а цены,
+    накопленные сборщиком, записываются пачками в одном конвейере.
+
+    Цены обновляет долго работающий сборщик (`ingest_bybit_mark_prices`). Если он остановлен или пара
+    перестала торговаться, цена перестает обновляться: цены старше `max_age` считаются устаревшими
+    и не возвращаются.
+
+    Каждая запись цен обновляет номер версии - время записи. По нему кэши ответов, зависящих от цен,
+    узнают, что цены могли измениться, не читая сами цены.
+
+    Атрибуты:
+        redis (Redis): Клиент Redis.
+        max_age (timedelta): Возраст, после которого цена считается устаревшей.
+
+    Методы:
+        set_many(prices: dict[TradingPairKey, tuple[str, int]]) -> None:
+            Записывает цены и их время.
+        get_many(keys: Iterable[TradingPairKey], now: datetime | None = None) -> dict[TradingPairKey, MarkPrice]:
+            Возвращает актуальные цены пар.
+        get_version() -> str | None:
+            Возвращает номер версии цен.
+    """
+
+    KEY = 'accounting:mark_prices'
+    VERSION_KEY = 'accounting:mark_prices:version'
+    STALE_VERSION = 'stale'
+    WRITE_BATCH_SIZE = 500
+    SEPARATOR = '|'
+
+    def __init__(self, redis: Redis, max_age: timedelta = timedelta(minutes=1)) -> None:
+        self.redis = redis
+        self.max_age = max_age
+
+    def set_many(self, prices: dict[TradingPairKey, tuple[str, int]]) -> None:
+        """
+        Записывает цены пар одним конвейером команд.
+
+        Аргументы:
+            prices (dict[TradingPairKey, tuple[str, int]]): Цена и ее время в миллисекундах Unix по ключам пар.
+        """
+        items = iter(prices.items())
+        with self.redis.pipeline(transaction=False) as pipe:
+            while batch := list(islice(items, self.WRITE_BATCH_SIZE)):
+                pipe.hset(
+                    self.KEY,
+                    mapping={
+                        self.get_field(key): f'{price}{self.SEPARATOR}{timestamp}' for key, (price, timestamp) in batch
+                    },
+                )
+            pipe.set(self.VERSION_KEY, int(time() * 1000))
+            pipe.execute()
+
+    def get_many(self, keys: Iterable[TradingPairKey], now: datetime | None = None) -> dict[TradingPairKey, MarkPrice]:
+        """
+        Возвращает актуальные цены пар одной командой `HMGET`.
+
+        Аргументы:
+            keys (Iterable[TradingPairKey]): Ключи пар: символ, рынок и биржа.
+            now (datetime | None): Время, относительно которого проверяется возраст цен.
+
+        Возвращает:
+            dict[TradingPairKey, MarkPrice]: Цены по ключам пар. Пары без цены, с устаревшей ценой
+                или все пары, если Redis недоступен, отсутствуют.
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        try:
+            values = cast(list[bytes | None], self.redis.hmget(self.KEY, [self.get_field(key) for key in keys]))
+        except RedisError:
+            logger.warning('Redis недоступен, цены маркировки не получены', exc_info=True)
+            return {}
+        now = now or timezone.now()
+        prices = {}
+        for key, value in zip(keys, values):
+            mark_price = self.loads(value) if value is not None else None
+            if mark_price is not None and not mark_price.is_stale(self.max_age, now):
+                prices[key] = mark_price
+        return prices
+
+    def get_version(self) -> str | None:
+        """
+        Возвращает номер версии цен, который меняется при каждой записи цен и после устаревания последней записи.
+
+        Возвращает:
+            str | None: Время последней записи в миллисекундах Unix, `STALE_VERSION`, если она старше `max_age`,
+                '0', если цены не записывались, или None, если Redis недоступен.
+        """
+        try:
+            version = cast(bytes | None, self.redis.get(self.VERSION_KEY))
+        except RedisError:
+            logger.warning('Redis недоступен, версия цен маркировки не получена', exc_info=True)
+            return None
+        if version is None:
+            return '0'
+        if time() - int(version) / 1000 > self.max_age.total_seconds():
+            return self.STALE_VERSION
+        return version.decode()
+
+    def get_field(self, key: TradingPairKey) -> str:
+        symbol, market, exchange = key
+        return f'{exchange}:{market}:{symbol}'
+
+    def loads(self, value: bytes) -> MarkPrice | None:
+        price, _, timestamp = value.decode().partition(self.SEPARATOR)
+        try:
+            return MarkPrice(Decimal(price), datetime.fromtimestamp(int(timestamp) / 1000, UTC))
+        except (InvalidOperation, ValueError):
+            logger.warning('Некорректная цена маркировки в Redis: %s', value)
+            return None
+
+
+mark_price_store = MarkPriceStore(redis_client)
@@ -0,0 +1,382 @@
+from collections import Counter, OrderedDict
+from copy import deepcopy
+from logging import getLogger
+from threading import Lock
+from time import monotonic
+from typing import Iterable, cast
+
+from django.core import serializers
+from django.db import transaction
+
+from redis import Redis, RedisError
+
+from tradi.redis import redis_client
+
+from apps.accounting.models import FinancialAsset, TradingPair, TradingPairSpec
+from apps.accounting.models.enums import Exchange, MarketType
+
+logger = getLogger('main')
+
+TradingPairKey = tuple[str, str, str]
+
+
+class TradingPairResolver:
+    """
+    Кэширующий поиск торговой пары по символу, рынку и бирже.
+
+    Поиск идет в три уровня: локальный LRU-кэш процесса, общий для всех процессов словарь в Redis
+    и только затем база данных. Каталог торговых пар меняется редко (в основном задачей синхронизации
+    инструментов), поэтому почти все запросы обслуживаются без обращения к Postgres.
+
+    Согласованность между процессами обеспечивается номером версии в Redis: `invalidate` увеличивает его,
+    после чего локальные кэши всех процессов сбрасываются при следующем обращении, а словарь старой
+    версии перестает читаться и удаляется по истечении `MAP_TTL`. Номер версии запоминается в процессе
+    на `version_ttl` секунд, поэтому попадание в локальный кэш не обращается к Redis, а другие процессы
+    видят изменение каталога с задержкой не больше `version_ttl`. Процесс, вызвавший `invalidate`,
+    видит новую версию сразу.
+
+    Локальный кэш общий для всех потоков и запросов процесса, поэтому из него возвращаются копии пары
+    и ее активов: изменение возвращенной пары не влияет на кэш.
+
+    Если Redis недоступен, поиск выполняется напрямую в базе данных.
+
+    Атрибуты:
+        redis (Redis): Клиент Redis.
+        maxsize (int): Максимальное количество пар в локальном кэше процесса.
+        version_ttl (float): Время в секундах, на которое процесс запоминает номер версии.
+        stats (Counter): Счетчики попаданий и промахов текущего процесса.
+
+    Методы:
+        resolve(symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPair | None:
+            Возвращает торговую пару или None, если пара не найдена.
+        invalidate() -> None:
+            Сбрасывает кэши во всех процессах.
+        invalidate_on_commit() -> None:
+            Сбрасывает кэши после фиксации текущей транзакции.
+        get_stats() -> dict[str, int]:
+            Возвращает счетчики попаданий и промахов, накопленные всеми процессами.
+        get_version() -> bytes:
+            Возвращает номер версии каталога торговых пар.
+    """
+
+    VERSION_KEY = 'accounting:trading_pair_resolver:version'
+    MAP_KEY = 'accounting:trading_pair_resolver:map:{version}'
+    STATS_KEY = 'accounting:trading_pair_resolver:stats'
+    MAP_TTL = 60 * 60 * 24
+    STATS_FLUSH_EVERY = 100
+
+    LOCAL_HITS = 'local_hits'
+    REDIS_HITS = 'redis_hits'
+    MISSES = 'misses'
+    ERRORS = 'errors'
+
+    def __init__(self, redis: Redis, maxsize: int = 1024, version_ttl: float = 1) -> None:
+        self.redis = redis
+        self.maxsize = maxsize
+        self.version_ttl = version_ttl
+        self.stats: Counter[str] = Counter()
+        self._cache: OrderedDict[TradingPairKey, TradingPair] = OrderedDict()
+        self._version: bytes | None = None
+        self._remote_version: tuple[bytes, float] | None = None
+        self._unflushed_stats: Counter[str] = Counter()
+        self._lock = Lock()
+
+    def resolve(self, symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPair | None:
+        """
+        Возвращает торговую пару по символу, рынку и бирже.
+
+        Аргументы:
+            symbol (str): Символ торговой пары, например: 'BTCUSDT'.
+            market (MarketType | str): Рынок торговой пары.
+            exchange (Exchange | str): Биржа торговой пары.
+
+        Возвращает:
+            TradingPair | None: Копия торговой пары с загруженными активами или None, если пара не найдена.
+        """
+        key = (symbol, str(market), str(exchange))
+        try:
+            version = self.get_version()
+        except RedisError:
+            logger.warning('Redis недоступен, торговая пара %s ищется в базе данных', symbol, exc_info=True)
+            self.count(self.ERRORS)
+            return TradingPair.objects.get_by_symbol(*key)
+        trading_pair = self.get_local(key, version)
+        if trading_pair is not None:
+            self.count(self.LOCAL_HITS)
+            return trading_pair
+        trading_pair = self.get_remote(key, version)
+        if trading_pair is not None:
+            self.count(self.REDIS_HITS)
+            self.set_local(key, version, trading_pair)
+            return trading_pair
+        self.count(self.MISSES)
+        trading_pair = TradingPair.objects.get_by_symbol(*key)
+        if trading_pair is not None:
+            self.set_remote(key, version, trading_pair)
+            self.set_local(key, version, trading_pair)
+        return trading_pair
+
+    def get_version(self) -> bytes:
+        """
+        Возвращает номер версии каталога торговых пар, который меняется при каждом сбросе кэшей.
+
+        Номер версии читается из Redis не чаще раза в `version_ttl` секунд.
+        """
+        remote_version = self._remote_version
+        if remote_version is not None and monotonic() < remote_version[1]:
+            return remote_version[0]
+        version = cast(bytes | None, self.redis.get(self.VERSION_KEY)) or b'0'
+        self._remote_version = (version, monotonic() + self.version_ttl)
+        return version
+
+    def get_local(self, key: TradingPairKey, version: bytes) -> TradingPair | None:
+        """Возвращает копию пары из локального кэша, сбрасывая его при смене версии."""
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+                return None
+            trading_pair = self._cache.get(key)
+            if trading_pair is None:
+                return None
+            self._cache.move_to_end(key)
+        return deepcopy(trading_pair)
+
+    def set_local(self, key: TradingPairKey, version: bytes, trading_pair: TradingPair) -> None:
+        """Сохраняет копию пары в локальный кэш, вытесняя давно не используемые пары."""
+        trading_pair = deepcopy(trading_pair)
+        with self._lock:
+            if version != self._version:
+                return
+            self._cache[key] = trading_pair
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def get_remote(self, key: TradingPairKey, version: bytes) -> TradingPair | None:
+        """Возвращает пару из словаря в Redis."""
+        try:
+            raw = cast(bytes | None, self.redis.hget(self.get_map_key(version), self.get_field(key)))
+        except RedisError:
+            logger.warning('Не удалось прочитать торговую пару %s из Redis', key[0], exc_info=True)
+            self.count(self.ERRORS)
+            return None
+        if raw is None:
+            return None
+        return self.loads(raw)
+
+    def set_remote(self, key: TradingPairKey, version: bytes, trading_pair: TradingPair) -> None:
+        """Сохраняет пару в словарь в Redis."""
+        map_key = self.get_map_key(version)
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hset(map_key, self.get_field(key), self.dumps(trading_pair))
+                pipe.expire(map_key, self.MAP_TTL)
+                pipe.execute()
+        except RedisError:
+            logger.warning('Не удалось сохранить торговую пару %s в Redis', key[0], exc_info=True)
+            self.count(self.ERRORS)
+
+    def invalidate(self) -> None:
+        """Сбрасывает локальный кэш и переключает все процессы на новую версию словаря в Redis."""
+        self.clear()
+        try:
+            version = self.redis.incr(self.VERSION_KEY)
+            self._remote_version = (str(version).encode(), monotonic() + self.version_ttl)
+        except RedisError:
+            logger.warning('Не удалось сбросить кэш торговых пар в Redis', exc_info=True)
+            self.count(self.ERRORS)
+
+    def invalidate_on_commit(self) -> None:
+        """
+        Сбрасывает кэши после фиксации текущей транзакции.
+
+        Сброс до фиксации позволил бы другому процессу снова закэшировать еще не измененные данные.
+        """
+        transaction.on_commit(self.invalidate)
+
+    def clear(self) -> None:
+        """Очищает локальный кэш процесса и запомненный номер версии."""
+        with self._lock:
+            self._cache.clear()
+            self._version = None
+            self._remote_version = None
+
+    def reset_stats(self) -> None:
+        """Обнуляет счетчики текущего процесса."""
+        with self._lock:
+            self.stats.clear()
+            self._unflushed_stats.clear()
+
+    def count(self, name: str) -> None:
+        """Увеличивает счетчик и периодически отправляет накопленные значения в Redis."""
+        with self._lock:
+            self.stats[name] += 1
+            self._unflushed_stats[name] += 1
+            if self._unflushed_stats.total() < self.STATS_FLUSH_EVERY:
+                return
+        self.flush_stats()
+
+    def flush_stats(self) -> None:
+        """Отправляет накопленные счетчики процесса в общий хэш в Redis."""
+        with self._lock:
+            unflushed_stats, self._unflushed_stats = self._unflushed_stats, Counter()
+        if not unflushed_stats:
+            return
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                for name, value in unflushed_stats.items():
+                    pipe.hincrby(self.STATS_KEY, name, value)
+                pipe.execute()
+        except RedisError:
+            logger.warning('Не удалось сохранить счетчики кэша торговых пар в Redis', exc_info=True)
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Возвращает счетчики попаданий и промахов, накопленные всеми процессами.
+
+        Возвращает:
+            dict[str, int]: Количество попаданий в локальный кэш, в Redis, промахов и ошибок Redis.
+        """
+        self.flush_stats()
+        stats = dict.fromkeys((self.LOCAL_HITS, self.REDIS_HITS, self.MISSES, self.ERRORS), 0)
+        raw_stats = cast(dict[bytes, bytes], self.redis.hgetall(self.STATS_KEY))
+        stats.update({name.decode(): int(value) for name, value in raw_stats.items()})
+        return stats
+
+    def get_map_key(self, version: bytes) -> str:
+        return self.MAP_KEY.format(version=version.decode())
+
+    def get_field(self, key: TradingPairKey) -> str:
+        symbol, market, exchange = key
+        return f'{exchange}:{market}:{symbol}'
+
+    def dumps(self, trading_pair: TradingPair) -> str:
+        """Сериализует торговую пару вместе с активами."""
+        return serializers.serialize('json', [trading_pair, trading_pair.base_asset, trading_pair.quote_asset])
+
+    def loads(self, raw: bytes) -> TradingPair:
+        """Восстанавливает торговую пару вместе с активами без обращения к базе данных."""
+        objects = [deserialized.object for deserialized in serializers.deserialize('json', raw)]
+        trading_pair = next(obj for obj in objects if isinstance(obj, TradingPair))
+        assets = {obj.pk: obj for obj in objects if isinstance(obj, FinancialAsset)}
+        trading_pair.base_asset = assets[trading_pair.base_asset_id]
+        trading_pair.quote_asset = assets[trading_pair.quote_asset_id]
+        return trading_pair
+
+
+class TradingPairSpecCache:
+    """
+    Копия торговых параметров инструментов в памяти процесса.
+
+    Параметры загружаются по ключам при первом обращении (для пачки ключей - одним запросом) и хранятся
+    до смены номера версии каталога торговых пар (`TradingPairResolver.get_version`). Задача синхронизации
+    инструментов и сигналы моделей увеличивают номер версии после изменения параметров, поэтому копии
+    во всех процессах сбрасываются после синхронизации с задержкой не больше `version_ttl` поиска. Отсутствие
+    параметров тоже запоминается, поэтому проверка позиции не обращается к базе данных повторно.
+
+    Если Redis недоступен, параметры читаются из базы данных без сохранения в копию.
+
+    Атрибуты:
+        resolver (TradingPairResolver): Поиск торговых пар, номер версии каталога которого используется.
+
+    Методы:
+        get(symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPairSpec | None:
+            Возвращает параметры торговой пары по символу, рынку и бирже.
+        get_many(keys: Iterable[TradingPairKey]) -> dict[TradingPairKey, TradingPairSpec]:
+            Возвращает параметры торговых пар по ключам, загружая недостающие одним запросом.
+        get_by_trading_pair(trading_pair_id: int) -> TradingPairSpec | None:
+            Возвращает параметры торговой пары по ее ID.
+        clear() -> None:
+            Сбрасывает копию.
+    """
+
+    def __init__(self, resolver: TradingPairResolver) -> None:
+        self.resolver = resolver
+        self._by_key: dict[TradingPairKey, TradingPairSpec | None] = {}
+        self._by_trading_pair: dict[int, TradingPairSpec | None] = {}
+        self._version: bytes | None = None
+        self._lock = Lock()
+
+    def get(self, symbol: str, market: MarketType | str, exchange: Exchange | str) -> TradingPairSpec | None:
+        key = (symbol, str(market), str(exchange))
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[TradingPairKey]) -> dict[TradingPairKey, TradingPairSpec]:
+        """
+        Возвращает параметры торговых пар по ключам: символу, рынку и бирже.
+
+        Аргументы:
+            keys (Iterable[TradingPairKey]): Ключи торговых пар.
+
+        Возвращает:
+            dict[TradingPairKey, TradingPairSpec]: Параметры по ключам. Пары без параметров отсутствуют.
+        """
+        keys = {(symbol, str(market), str(exchange)) for symbol, market, exchange in keys}
+        version = self.get_version()
+        with self._lock:
+            self.check_version(version)
+            specs = {key: self._by_key[key] for key in keys if key in self._by_key}
+        missing = keys - specs.keys()
+        if missing:
+            queryset = TradingPairSpec.objects.select_related('trading_pair').filter(
+                trading_pair__symbol__in={symbol for symbol, _, _ in missing}
+            )
+            loaded = {self.get_key(spec): spec for spec in queryset}
+            specs |= {key: loaded.get(key) for key in missing}
+            self.store(version, {key: specs[key] for key in missing}, loaded.values())
+        return {key: spec for key, spec in specs.items() if spec is not None}
+
+    def get_by_trading_pair(self, trading_pair_id: int) -> TradingPairSpec | None:
+        version = self.get_version()
+        with self._lock:
+            self.check_version(version)
+            if trading_pair_id in self._by_trading_pair:
+                return self._by_trading_pair[trading_pair_id]
+        spec = TradingPairSpec.objects.select_related('trading_pair').filter(trading_pair_id=trading_pair_id).first()
+        if spec is None:
+            with self._lock:
+                if version is not None and version == self._version:
+                    self._by_trading_pair[trading_pair_id] = None
+        else:
+            self.store(version, {self.get_key(spec): spec}, [spec])
+        return spec
+
+    def get_version(self) -> bytes | None:
+        try:
+            return self.resolver.get_version()
+        except RedisError:
+            logger.warning('Redis недоступен, торговые параметры читаются из базы данных', exc_info=True)
+            return None
+
+    def check_version(self, version: bytes | None) -> None:
+        """Сбрасывает копию при смене номера версии каталога, вызывается под блокировкой."""
+        if version is None or version != self._version:
+            self._by_key, self._by_trading_pair = {}, {}
+            self._version = version
+
+    def store(
+        self,
+        version: bytes | None,
+        by_key: dict[TradingPairKey, TradingPairSpec | None],
+        specs: Iterable[TradingPairSpec],
+    ) -> None:
+        """Сохраняет загруженные параметры, если за время загрузки номер версии не изменился."""
+        with self._lock:
+            if version is None or version != self._version:
+                return
+            self._by_key |= by_key
+            self._by_trading_pair |= {spec.trading_pair_id: spec for spec in specs}
+
+    def get_key(self, spec: TradingPairSpec) -> TradingPairKey:
+        trading_pair = spec.trading_pair
+        return trading_pair.symbol, str(trading_pair.market), str(trading_pair.exchange)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_key, self._by_trading_pair = {}, {}
+            self._version = None
+
+
+trading_pair_resolver = TradingPairResolver(redis_client)
+trading_pair_spec_cache = TradingPairSpecCache(trading_pair_resolver)
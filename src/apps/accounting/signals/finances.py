@@ -1,10 +1,14 @@
 from typing import Any
 
-from django.db.models.signals import post_save
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
 
-from accounting.models.finances import FinancialAsset, TradingPair
-from accounting.validators import validate_compatible_assets
+from apps.accounting.models.finances import FinancialAsset, TradingPair, TradingPairSpec
+from apps.accounting.models.tombstones import Tombstone
+from apps.accounting.resolvers import trading_pair_resolver
+from apps.accounting.validators import validate_compatible_assets
 
 
 @receiver(post_save, sender=FinancialAsset)
@@ -25,3 +29,68 @@ def validate_related_trading_pairs(sender: FinancialAsset, instance: FinancialAs
     trading_pairs = TradingPair.objects.filter(base_asset=instance) | TradingPair.objects.filter(quote_asset=instance)
     for pair in trading_pairs:
         validate_compatible_assets(pair.base_asset, pair.quote_asset)
+
+
+@receiver(post_save, sender=FinancialAsset)
+def refresh_related_trading_pairs_symbol(sender: FinancialAsset, instance: FinancialAsset, **kwargs: Any) -> None:
+    """
+    Обновляет денормализованные поля торговых пар, связанных с финансовым активом, после его сохранения.
+
+    Аргументы:
+        sender (FinancialAsset): Класс модели, отправляющей сигнал (в данном случае FinancialAsset).
+        instance (FinancialAsset): Экземпляр финансового актива, который был сохранен.
+        kwargs (Any): Дополнительные аргументы сигнала.
+
+    Описание:
+        Символ, рынок и биржа торговой пары хранятся в ее таблице, поэтому при изменении тикера,
+        рынка или биржи актива их нужно пересчитать. Обновляются только пары, у которых значения изменились.
+        Дата изменения обновляется у всех связанных пар, так как актив входит в ответ API торговой пары
+        и клиенты получают изменения по параметру `modified_since`.
+    """
+    if kwargs.get('created'):
+        return
+    related = Q(base_asset=instance) | Q(quote_asset=instance)
+    TradingPair.objects.filter(related).update(modified_at=timezone.now())
+    trading_pairs = TradingPair.objects.with_select_related().filter(related)
+    changed_pairs = []
+    for pair in trading_pairs:
+        current = (pair.symbol, pair.market, pair.exchange)
+        pair.fill_symbol()
+        if current != (pair.symbol, pair.market, pair.exchange):
+            changed_pairs.append(pair)
+    if changed_pairs:
+        TradingPair.objects.bulk_update(changed_pairs, ['symbol', 'market', 'exchange'])
+
+
+@receiver([post_save, post_delete], sender=FinancialAsset)
+@receiver([post_save, post_delete], sender=TradingPair)
+@receiver([post_save, post_delete], sender=TradingPairSpec)
+def invalidate_trading_pair_resolver(
+    sender: type[FinancialAsset | TradingPair | TradingPairSpec], **kwargs: Any
+) -> None:
+    """
+    Сбрасывает кэши поиска торговых пар и их торговых параметров после изменения каталога.
+
+    Аргументы:
+        sender (type[FinancialAsset | TradingPair | TradingPairSpec]): Класс модели, отправляющей сигнал.
+        kwargs (Any): Дополнительные аргументы сигнала.
+
+    Описание:
+        Кэш сбрасывается после фиксации транзакции, чтобы другие процессы не закэшировали старые данные.
+        Массовые операции (`bulk_create`, `update`) сигналы не отправляют, поэтому сервисы, которые их
+        используют, сбрасывают кэш сами.
+    """
+    trading_pair_resolver.invalidate_on_commit()
+
+
+@receiver(post_delete, sender=TradingPair)
+def record_trading_pair_tombstone(sender: type[TradingPair], instance: TradingPair, **kwargs: Any) -> None:
+    """
+    Сохраняет отметку об удалении торговой пары для клиентов, синхронизирующих изменения.
+
+    Аргументы:
+        sender (type[TradingPair]): Класс модели, отправляющей сигнал.
+        instance (TradingPair): Удаленная торговая пара.
+        kwargs (Any): Дополнительные аргументы сигнала.
+    """
+    Tombstone.objects.record(instance)
@@ -0,0 +1,38 @@
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.accounting.models.positions import Position, PositionComment
+from apps.accounting.models.tombstones import Tombstone
+
+
+@receiver(post_delete, sender=Position)
+def record_position_tombstone(sender: type[Position], instance: Position, **kwargs: Any) -> None:
+    """
+    Сохраняет отметку об удалении позиции для клиентов, синхронизирующих изменения.
+
+    Аргументы:
+        sender (type[Position]): Класс модели, отправляющей сигнал.
+        instance (Position): Удаленная позиция.
+        kwargs (Any): Дополнительные аргументы сигнала.
+    """
+    Tombstone.objects.record(instance, owner_id=instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=PositionComment)
+def touch_commented_position(sender: type[PositionComment], instance: PositionComment, **kwargs: Any) -> None:
+    """
+    Обновляет дату изменения позиции после изменения ее комментариев.
+
+    Аргументы:
+        sender (type[PositionComment]): Класс модели, отправляющей сигнал.
+        instance (PositionComment): Созданный, измененный или удаленный комментарий.
+        kwargs (Any): Дополнительные аргументы сигнала.
+
+    Описание:
+        Комментарии входят в ответ API позиции, поэтому клиент, получающий изменения по параметру
+        `modified_since`, должен увидеть позицию заново.
+    """
+    Position.objects.filter(pk=instance.position_id).update(modified_at=timezone.now())
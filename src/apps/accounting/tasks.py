@@ -0,0 +1,13 @@
+from tradi.celery import celery_app
+
+from apps.accounting.models import Tombstone
+
+
+@celery_app.task
+def prune_tombstones() -> int:
+    """
+    Удаляет отметки об удалении старше `TOMBSTONE_RETENTION_DAYS` дней.
+    Запускается раз в сутки по расписанию `CELERY_BEAT_SCHEDULE`.
+    Возвращает количество удаленных отметок.
+    """
+    return Tombstone.objects.prune()
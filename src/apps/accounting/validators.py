@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
 
 from django.core.exceptions import ValidationError
 
 if TYPE_CHECKING:
-    from accounting.models.finances import FinancialAsset
+    from apps.accounting.models.finances import FinancialAsset, TradingPairSpec
+
+SPEC_PRICE_FIELDS = ('take_profit', 'stop_loss')
 
 
 def validate_compatible_assets(base_asset: FinancialAsset, quote_asset: FinancialAsset) -> None:
@@ -21,3 +24,46 @@ def validate_compatible_assets(base_asset: FinancialAsset, quote_asset: Financia
     """
     if not base_asset.is_compatible_with(quote_asset):
         raise ValidationError('Нельзя создать торговую пару с активами с разными биржами, типами или рынками.')
+
+
+def validate_position_spec(spec: TradingPairSpec, values: dict[str, Any], creating: bool = False) -> None:
+    """
+    Проверяет цены ордеров, размер и плечо позиции по торговым параметрам инструмента.
+
+    Цены тейк-профита и стоп-лосса должны быть кратны шагу цены, размер - шагу количества,
+    плечо - не больше максимального. Цена входа и цена ликвидации не проверяются: цена входа -
+    средняя цена нескольких исполнений, а цену ликвидации рассчитывает биржа. Минимальное количество
+    проверяется только при создании позиции, максимальное - не проверяется: позиция может быть набрана
+    несколькими ордерами и частично закрыта. Проверяются только переданные значения.
+
+    Аргументы:
+        spec (TradingPairSpec): Торговые параметры инструмента.
+        values (dict[str, Any]): Значения полей позиции.
+        creating (bool): Проверяются значения новой позиции.
+
+    Исключения:
+        ValidationError: Если значения не соответствуют параметрам инструмента, с ошибками по полям.
+    """
+    errors: dict[str, list[str]] = {}
+    for field in SPEC_PRICE_FIELDS:
+        value = values.get(field)
+        if value is not None and not is_multiple_of(value, spec.tick_size):
+            errors[field] = [f'Цена должна быть кратна шагу цены {spec.tick_size.normalize():f}.']
+    size = values.get('size')
+    if size is not None:
+        if not is_multiple_of(size, spec.qty_step):
+            errors['size'] = [f'Размер должен быть кратен шагу количества {spec.qty_step.normalize():f}.']
+        elif creating and size < spec.min_order_qty:
+            errors['size'] = [
+                f'Размер должен быть не меньше минимального количества {spec.min_order_qty.normalize():f}.'
+            ]
+    leverage = values.get('leverage')
+    if leverage is not None and spec.max_leverage is not None and leverage > spec.max_leverage:
+        errors['leverage'] = [f'Плечо должно быть не больше максимального {spec.max_leverage.normalize():f}.']
+    if errors:
+        raise ValidationError(errors)
+
+
+def is_multiple_of(value: Decimal, step: Decimal) -> bool:
+    """Проверяет, что значение кратно шагу. Нулевой шаг не ограничивает значение."""
+    return not step or value % step == 0
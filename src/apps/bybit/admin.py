@@ -33,6 +33,16 @@ class ByBitAccessInline(admin.StackedInline):
                 ),
             },
         ),
+        (
+            'Импорт сделок',
+            {
+                'fields': (
+                    'executions_synced_at',
+                    'closed_pnl_synced_at',
+                ),
+                'classes': ('collapse',),
+            },
+        ),
         (
             'Даты',
             {
@@ -44,6 +54,6 @@ class ByBitAccessInline(admin.StackedInline):
             },
         ),
     )
-    readonly_fields = ('created_at', 'modified_at')
+    readonly_fields = ('executions_synced_at', 'closed_pnl_synced_at', 'created_at', 'modified_at')
     verbose_name = 'Доступ к ByBit'
     verbose_name_plural = 'Доступы к ByBit'
@@ -1,4 +1,291 @@
-from bybit.constants import TESTNET
-from pybit.unified_trading import HTTP
+from collections import OrderedDict
+from contextlib import contextmanager
+from hashlib import sha256
+from logging import getLogger
+from random import uniform
+from threading import Lock, Timer
+from time import perf_counter, sleep, time
+from typing import Any, Iterator
+from urllib.parse import urlsplit
 
-public_bybit = HTTP(testnet=TESTNET)
+from pybit.exceptions import FailedRequestError, InvalidRequestError
+from pybit.unified_trading import HTTP, WebSocket
+from requests.adapters import HTTPAdapter
+
+from tradi.redis import redis_client
+
+from apps.bybit.constants import (
+    ENDPOINT,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_CODES,
+    RATE_LIMIT_KEY,
+    RATE_LIMIT_PER_SECOND,
+    RATE_LIMIT_STATUS_CODES,
+    TESTNET,
+)
+from apps.core.metrics import metrics_registry
+from apps.core.ratelimiters import RedisTokenBucket
+
+logger = getLogger('main')
+
+# Коды, которые pybit повторяет сам. Превышение лимита (10006) повторяет `BybitHTTP` с экспоненциальной задержкой.
+PYBIT_RETRY_CODES = {10002, 30034, 30035, 130035, 130150}
+
+bybit_rate_limiter = RedisTokenBucket(
+    redis_client,
+    RATE_LIMIT_KEY,
+    rate=RATE_LIMIT_PER_SECOND,
+    capacity=RATE_LIMIT_BURST,
+)
+
+bybit_request_duration = metrics_registry.histogram(
+    'bybit_request_duration_seconds',
+    'Время запросов к API Bybit, включая повторы pybit.',
+    ('path',),
+)
+bybit_request_errors = metrics_registry.counter(
+    'bybit_request_errors_total',
+    'Ошибки запросов к API Bybit: код ошибки Bybit, код HTTP или класс исключения.',
+    ('path', 'code'),
+)
+
+
+class BybitHTTP(HTTP):
+    """
+    HTTP-клиент Bybit с общим ограничением частоты запросов и повтором при превышении лимита.
+
+    Перед каждой попыткой запроса берется токен из общего для всех процессов ведра `bybit_rate_limiter`.
+    Если биржа все же ответила превышением лимита (код 10006, HTTP 429 или 403), запрос повторяется
+    с экспоненциально растущей задержкой со случайным разбросом, но не раньше времени сброса лимита
+    из заголовка `X-Bapi-Limit-Reset-Timestamp`.
+
+    Время каждой попытки записывается в метрику `bybit_request_duration_seconds`, ошибки - в метрику
+    `bybit_request_errors_total` с кодом ошибки.
+
+    Соединения переиспользуются: сессия `requests` держит пул keep-alive соединений размером `pool_size`,
+    которого хватает потокам синхронизации, работающим с одним клиентом. Адрес API можно заменить через `endpoint`,
+    например на локальный сервер-заменитель Bybit (`apps.bybit.standin`).
+
+    Атрибуты:
+        rate_limiter (RedisTokenBucket | None): Ограничитель частоты или None без ограничения.
+        backoff_retries (int): Количество повторов при превышении лимита.
+        backoff_base (float): Задержка перед первым повтором в секундах.
+        backoff_max (float): Максимальная задержка в секундах.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: RedisTokenBucket | None = None,
+        backoff_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30,
+        pool_size: int = 10,
+        endpoint: str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        kwargs.setdefault('retry_codes', PYBIT_RETRY_CODES)
+        super().__init__(**kwargs)
+        if endpoint:
+            self.endpoint = endpoint.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.backoff_retries = backoff_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.client.mount('https://', adapter)
+        self.client.mount('http://', adapter)
+
+    def _submit_request(self, method: Any = None, path: Any = None, query: Any = None, auth: bool = False) -> Any:
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            started_at = perf_counter()
+            metric_path = urlsplit(path).path
+            try:
+                response = super()._submit_request(method=method, path=path, query=query, auth=auth)
+            except Exception as error:
+                bybit_request_duration.observe(perf_counter() - started_at, path=metric_path)
+                code = getattr(error, 'status_code', None) or type(error).__name__
+                bybit_request_errors.inc(path=metric_path, code=code)
+                if not isinstance(error, (FailedRequestError, InvalidRequestError)):
+                    raise
+                if not self.is_rate_limited(error) or attempt >= self.backoff_retries:
+                    raise
+                delay = self.get_backoff(attempt, error)
+                logger.warning(
+                    'Превышен лимит запросов Bybit (%s) для %s, повтор через %.2f с', error.status_code, path, delay
+                )
+                sleep(delay)
+                attempt += 1
+            else:
+                bybit_request_duration.observe(perf_counter() - started_at, path=metric_path)
+                return response
+
+    def is_rate_limited(self, error: FailedRequestError | InvalidRequestError) -> bool:
+        """Проверяет, что ошибка означает превышение лимита запросов."""
+        if isinstance(error, InvalidRequestError):
+            return error.status_code in RATE_LIMIT_CODES
+        return error.status_code in RATE_LIMIT_STATUS_CODES
+
+    def get_backoff(self, attempt: int, error: FailedRequestError | InvalidRequestError) -> float:
+        """
+        Возвращает задержку перед повтором в секундах.
+
+        Задержка растет экспоненциально с номером попытки, ограничена `backoff_max` и имеет случайный разброс,
+        чтобы процессы, одновременно получившие отказ, не повторяли запросы одновременно. Если биржа сообщила
+        время сброса лимита, задержка не меньше времени до него.
+        """
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt) * uniform(0.5, 1)
+        reset_timestamp = (error.resp_headers or {}).get('X-Bapi-Limit-Reset-Timestamp')
+        if reset_timestamp:
+            delay = max(delay, min(self.backoff_max, int(reset_timestamp) / 1000 - time()))
+        return delay
+
+
+class BybitClientPool:
+    """
+    Клиенты Bybit, общие для процесса.
+
+    Клиенты создаются при первом обращении и переиспользуются, поэтому keep-alive соединения не открываются
+    заново для каждого запроса. Клиент определяется ключом API, хешем секрета и сетью, поэтому после смены
+    секрета создается новый клиент. Хранится не больше `maxsize` клиентов, давно не используемые удаляются
+    из пула, но не закрываются: клиент может выполнять запрос в другом потоке, его сессия закроется
+    при сборке мусора.
+    Все клиенты делят одно ограничение частоты запросов: лимит Bybit считается по IP.
+
+    Атрибуты:
+        rate_limiter (RedisTokenBucket | None): Ограничитель частоты запросов клиентов.
+        endpoint (str | None): Адрес API вместо адреса Bybit, например локального сервера-заменителя.
+        maxsize (int): Максимальное количество клиентов.
+
+    Методы:
+        get(api_key: str | None = None, api_secret: str | None = None, testnet: bool = TESTNET) -> BybitHTTP:
+            Возвращает клиент для ключа API.
+        override(endpoint: str | None, rate_limiter: RedisTokenBucket | None) -> Iterator[None]:
+            Временно направляет новые клиенты на другой адрес API.
+    """
+
+    def __init__(self, rate_limiter: RedisTokenBucket | None, endpoint: str | None = None, maxsize: int = 128) -> None:
+        self.rate_limiter = rate_limiter
+        self.endpoint = endpoint
+        self.maxsize = maxsize
+        self._clients: OrderedDict[tuple[str | None, str | None, bool], BybitHTTP] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, api_key: str | None = None, api_secret: str | None = None, testnet: bool = TESTNET) -> BybitHTTP:
+        """
+        Возвращает клиент Bybit для ключа API.
+
+        Аргументы:
+            api_key (str | None): Ключ API для приватных запросов или None для публичного клиента.
+            api_secret (str | None): Секрет ключа API.
+            testnet (bool): Использовать тестовую сеть.
+
+        Возвращает:
+            BybitHTTP: Клиент Bybit.
+        """
+        secret_hash = sha256(api_secret.encode()).hexdigest() if api_secret else None
+        key = (api_key, secret_hash, testnet)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client = BybitHTTP(
+                rate_limiter=self.rate_limiter,
+                endpoint=self.endpoint,
+                testnet=testnet,
+                api_key=api_key,
+                api_secret=api_secret,
+            )
+            self._clients[key] = client
+            while len(self._clients) > self.maxsize:
+                self._clients.popitem(last=False)
+            return client
+
+    @contextmanager
+    def override(self, endpoint: str | None, rate_limiter: RedisTokenBucket | None) -> Iterator[None]:
+        """
+        Временно направляет клиенты на другой адрес API с другим ограничителем частоты.
+
+        Внутри блока создаются новые клиенты, после выхода они закрываются и возвращаются прежние.
+
+        Аргументы:
+            endpoint (str | None): Адрес API, например адрес локального сервера-заменителя Bybit.
+            rate_limiter (RedisTokenBucket | None): Ограничитель частоты или None без ограничения.
+        """
+        with self._lock:
+            saved = self._clients, self.endpoint, self.rate_limiter
+            self._clients, self.endpoint, self.rate_limiter = OrderedDict(), endpoint, rate_limiter
+        try:
+            yield
+        finally:
+            with self._lock:
+                for client in self._clients.values():
+                    client.client.close()
+                self._clients, self.endpoint, self.rate_limiter = saved
+
+
+bybit_clients = BybitClientPool(bybit_rate_limiter, endpoint=ENDPOINT)
+
+
+def get_bybit_client(api_key: str | None = None, api_secret: str | None = None, testnet: bool = TESTNET) -> BybitHTTP:
+    """Возвращает общий для процесса клиент Bybit, см. `BybitClientPool.get`."""
+    return bybit_clients.get(api_key, api_secret, testnet)
+
+
+public_bybit = get_bybit_client()
+
+
+class BybitWebSocket(WebSocket):
+    """
+    Публичный WebSocket Bybit с заменяемым адресом.
+
+    Адрес `endpoint` задается так же, как у `BybitHTTP`, - адресом API, например локального сервера-заменителя
+    Bybit (`apps.bybit.standin`): схема http заменяется на ws, путь канала сохраняется. Адрес используется
+    и при переподключении после обрыва соединения.
+
+    pybit запоминает запрос подписки только после его отправки, поэтому ответ быстрого сервера может прийти
+    раньше и не найтись: ответы на подписку не сопоставляются с запросами, отказ записывается в лог.
+    Первый ping отправляется таймером в фоновом потоке, который не задерживает завершение процесса.
+
+    Атрибуты:
+        ws_endpoint (str | None): Адрес WebSocket вместо адреса Bybit.
+    """
+
+    def __init__(self, channel_type: str, endpoint: str | None = None, **kwargs: Any) -> None:
+        self.ws_endpoint = endpoint.rstrip('/').replace('http', 'ws', 1) if endpoint else None
+        super().__init__(channel_type, **kwargs)
+
+    def _connect(self, url: str) -> None:
+        if self.ws_endpoint:
+            url = f'{self.ws_endpoint}{urlsplit(url).path}'
+        super()._connect(url)
+
+    def _process_subscription_message(self, message: dict[str, Any]) -> None:
+        if message.get('success') is False:
+            logger.error('Bybit отклонил подписку WebSocket: %s', message.get('ret_msg'))
+
+    def _send_initial_ping(self) -> None:
+        timer = Timer(self.ping_interval, self._send_custom_ping)
+        timer.daemon = True
+        timer.start()
+
+    def _send_custom_ping(self) -> None:
+        if self.is_connected():
+            super()._send_custom_ping()
+
+
+def get_bybit_websocket(channel_type: str, testnet: bool = TESTNET) -> BybitWebSocket:
+    """
+    Открывает публичный WebSocket Bybit по адресу API общих клиентов, см. `BybitClientPool.override`.
+
+    Аргументы:
+        channel_type (str): Канал: spot, linear, inverse или option.
+        testnet (bool): Использовать тестовую сеть.
+
+    Возвращает:
+        BybitWebSocket: Подключенный WebSocket.
+    """
+    return BybitWebSocket(channel_type, endpoint=bybit_clients.endpoint, testnet=testnet)
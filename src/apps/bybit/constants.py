@@ -1,14 +1,114 @@
+from dataclasses import dataclass
+from datetime import timedelta
 from os import getenv
+from typing import Any
 
-from accounting.models.finances import AssetType, Exchange, MarketType
+from apps.accounting.models.finances import AssetType, Exchange, MarketType
 
 USDT = 'USDT'
+USDC = 'USDC'
+USD = 'USD'
+SPOT = 'spot'
 LINEAR = 'linear'
+INVERSE = 'inverse'
+OPTION = 'option'
+INSTRUMENTS_PAGE_LIMIT = 1000
+# Интервал проверки остановки синхронизации потоком загрузки, ожидающим места в очереди страниц, в секундах.
+INSTRUMENTS_QUEUE_PUT_TIMEOUT = 1
 
 TESTNET = bool(int(getenv('NOT_TESTNET', 1)))
+# Адрес API вместо адреса Bybit, например локального сервера-заменителя: http://127.0.0.1:8765
+ENDPOINT = getenv('BYBIT_ENDPOINT') or None
 
-FUTURES_BYBIT_DATA = {
+# Лимит Bybit для HTTP-запросов с одного IP - 600 запросов за 5 секунд.
+# Ведро с такой скоростью и емкостью не превышает его при любом распределении запросов.
+RATE_LIMIT_KEY = 'bybit:rate_limit:ip'
+RATE_LIMIT_PER_SECOND = float(getenv('BYBIT_RATE_LIMIT_PER_SECOND', 100))
+RATE_LIMIT_BURST = float(getenv('BYBIT_RATE_LIMIT_BURST', 100))
+RATE_LIMIT_CODES = frozenset({10006})
+RATE_LIMIT_STATUS_CODES = frozenset({403, 429})
+
+# Импорт сделок пользователя: линейные контракты, расчет в USDT и USDC.
+TRADES_CATEGORY = LINEAR
+TRADES_SETTLE_COINS = (USDT, USDC)
+TRADES_PAGE_LIMIT = 100
+POSITIONS_PAGE_LIMIT = 200
+# Bybit отдает исполнения и закрытые позиции за период не длиннее 7 дней.
+TRADES_WINDOW = timedelta(days=7)
+# Глубина истории при первом импорте.
+TRADES_HISTORY = timedelta(days=int(getenv('BYBIT_TRADES_HISTORY_DAYS', 30)))
+# Запись появляется в API с небольшой задержкой, поэтому последние секунды загружаются следующим импортом.
+TRADES_SYNC_LAG = timedelta(seconds=10)
+# Записи, появившиеся в API позже курсора, загружаются повторной загрузкой последних минут перед курсором.
+TRADES_SYNC_OVERLAP = timedelta(minutes=10)
+# Импорт сделок всех пользователей: число одновременно выполняемых задач-шардов и блокировка доступа.
+# Блокировка доступа продлевается, пока идет импорт, и истекает через срок после падения процесса.
+TRADES_SYNC_CONCURRENCY = int(getenv('BYBIT_TRADES_SYNC_CONCURRENCY', 8))
+TRADES_LOCK_KEY = 'bybit:trades_import:lock:{name}'
+TRADES_LOCK_TIMEOUT = 15 * 60
+# Блокировка запуска импорта сделок всех пользователей: захватывается при запуске и освобождается задачей
+# сводки итогов. Срок - верхняя граница длительности запуска на случай, если сводка не выполнится.
+TRADES_SYNC_LOCK_KEY = 'bybit:trades_sync:lock:{name}'
+TRADES_SYNC_LOCK_NAME = 'dispatch'
+TRADES_SYNC_LOCK_TIMEOUT = 60 * 60
+
+FUTURES_BYBIT_DATA: dict[str, Any] = {
     'type': AssetType.CRYPTOCURRENCY.value,
     'market': MarketType.FUTURES.value,
     'exchange': Exchange.BYBIT.value,
 }
+
+
+@dataclass(frozen=True)
+class InstrumentCategory:
+    """
+    Категория инструментов Bybit и ее отображение на модели учета.
+
+    Атрибуты:
+        name (str): Категория в API Bybit: spot, linear, inverse или option.
+        market (MarketType): Рынок, на котором создаются активы и торговые пары категории.
+        quote_coins (frozenset[str] | None): Котируемые монеты категории или None для любых.
+            Линейные и обратные контракты попадают на один рынок, поэтому их пары разделяются котируемой монетой.
+        exact_symbol (bool): Брать только инструменты, символ которых совпадает с тикерами базовой
+            и котируемой монет. Так отсекаются срочные контракты, символ которых не совпадает с символом пары.
+        base_coins (tuple[str, ...] | None): Базовые монеты, инструменты которых запрашиваются отдельно,
+            или None, чтобы запросить всю категорию без `baseCoin`.
+    """
+
+    name: str
+    market: MarketType
+    quote_coins: frozenset[str] | None = None
+    exact_symbol: bool = True
+    base_coins: tuple[str, ...] | None = None
+
+    @property
+    def asset_data(self) -> dict[str, Any]:
+        """Возвращает поля активов категории, кроме тикера."""
+        return {'type': AssetType.CRYPTOCURRENCY.value, 'market': str(self.market), 'exchange': Exchange.BYBIT.value}
+
+
+LINEAR_USDT_CATEGORY = InstrumentCategory(LINEAR, MarketType.FUTURES, frozenset({USDT}))
+
+# Без `baseCoin` Bybit отдает только опционы на BTC, поэтому опционы запрашиваются по каждой базовой монете.
+OPTION_BASE_COINS = tuple(getenv('BYBIT_OPTION_BASE_COINS', 'BTC,ETH,SOL,XRP,DOGE,MNT').split(','))
+
+# Опционы приводятся к паре базового актива: все страйки и даты экспирации одного актива дают одну пару.
+# Бессрочные контракты с расчетом в USDC называются `BTCPERP`, а не по тикерам пары, поэтому линейные
+# контракты синхронизируются только с расчетом в USDT.
+BYBIT_INSTRUMENT_CATEGORIES = (
+    InstrumentCategory(SPOT, MarketType.SPOT),
+    LINEAR_USDT_CATEGORY,
+    InstrumentCategory(INVERSE, MarketType.FUTURES, frozenset({USD})),
+    InstrumentCategory(OPTION, MarketType.OPTIONS, exact_symbol=False, base_coins=OPTION_BASE_COINS),
+)
+
+# Сбор цен маркировки из публичного потока тикеров. У спота нет цены маркировки, берется цена последней сделки.
+MARK_PRICE_CATEGORIES = tuple(category for category in BYBIT_INSTRUMENT_CATEGORIES if category.name != OPTION)
+MARK_PRICE_FIELDS = {SPOT: 'lastPrice'}
+MARK_PRICE_FIELD = 'markPrice'
+# Bybit принимает не больше 10 тем в одном запросе подписки на спот.
+MARK_PRICE_SUBSCRIBE_BATCH_SIZE = 10
+# Цены накапливаются в памяти и записываются в Redis раз в интервал: по каждой паре - только последняя цена.
+MARK_PRICE_FLUSH_INTERVAL = float(getenv('BYBIT_MARK_PRICE_FLUSH_INTERVAL', 0.5))
+# Интервал проверки изменений каталога торговых пар в секундах.
+MARK_PRICE_REFRESH_INTERVAL = float(getenv('BYBIT_MARK_PRICE_REFRESH_INTERVAL', 30))
@@ -0,0 +1,130 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import Any, ClassVar, Iterator
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from apps.bybit.connections import bybit_clients, bybit_rate_limiter
+from apps.bybit.constants import BYBIT_INSTRUMENT_CATEGORIES, LINEAR_USDT_CATEGORY
+from apps.bybit.management.commands.run_bybit_standin import add_standin_arguments, get_standin_config
+from apps.bybit.services.celery.instruments_getter import (
+    CategoryInstrumentsGetter,
+    InstrumentPair,
+    InstrumentsGetter,
+    InstrumentSpec,
+)
+from apps.bybit.standin import StandInHTTPServer
+
+PIPELINES = {
+    'instruments': BYBIT_INSTRUMENT_CATEGORIES,
+    'linear-usdt': (LINEAR_USDT_CATEGORY,),
+}
+STAGES = ('fetch', 'process', 'save', 'deactivate')
+
+
+class StageTimings:
+    """Суммарное время и количество вызовов этапов конвейера, собираемые из нескольких потоков."""
+
+    def __init__(self) -> None:
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+        self.calls: Counter[str] = Counter()
+        self._lock = Lock()
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - started_at
+            with self._lock:
+                self.seconds[stage] += elapsed
+                self.calls[stage] += 1
+
+
+@dataclass
+class TimedCategoryInstrumentsGetter(CategoryInstrumentsGetter):
+    """Сервис синхронизации категории, замеряющий время загрузки, обработки и сохранения страниц."""
+
+    timings: ClassVar[StageTimings] = StageTimings()
+
+    def fetch_data(self, cursor: str | None = None, base_coin: str | None = None) -> dict:
+        with self.timings.measure('fetch'):
+            return super().fetch_data(cursor, base_coin)
+
+    def process_data(self, data: dict) -> dict[InstrumentPair, InstrumentSpec | None]:
+        with self.timings.measure('process'):
+            return super().process_data(data)
+
+    def save_to_database(self, pairs: dict[InstrumentPair, InstrumentSpec | None]) -> None:
+        with self.timings.measure('save'):
+            super().save_to_database(pairs)
+
+    def deactivate_missing_trading_pairs(self) -> None:
+        with self.timings.measure('deactivate'):
+            super().deactivate_missing_trading_pairs()
+
+
+@dataclass
+class TimedInstrumentsGetter(InstrumentsGetter):
+    category_getter_class: ClassVar[type[CategoryInstrumentsGetter]] = TimedCategoryInstrumentsGetter
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает синхронизацию инструментов против локального сервера-заменителя Bybit и выводит время '
+        'загрузки, обработки и сохранения страниц. Изменения в базе данных откатываются, если не указан --commit.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--pipeline', choices=tuple(PIPELINES), default='instruments', help='Конвейер синхронизации.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=2,
+            help='Количество запусков: первый создает пары, следующие сверяют уже существующие.',
+        )
+        parser.add_argument(
+            '--rate-limit',
+            action='store_true',
+            help='Ограничивать частоту запросов общим ведром в Redis, как в рабочем окружении.',
+        )
+        parser.add_argument('--commit', action='store_true', help='Сохранить созданные активы и торговые пары.')
+        add_standin_arguments(parser)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        config = get_standin_config(options)
+        rate_limiter = bybit_rate_limiter if options['rate_limit'] else None
+        getter = TimedInstrumentsGetter(categories=PIPELINES[options['pipeline']])
+        with StandInHTTPServer(config) as server, bybit_clients.override(server.url, rate_limiter):
+            self.stdout.write(
+                f'Сервер-заменитель: {server.url}, инструментов в категории: {config.instruments}, '
+                f'страница: {config.page_size}, задержка: {config.latency * 1000:.0f} мс, '
+                f'доля ошибок: {config.error_rate:.0%}'
+            )
+            with transaction.atomic():
+                for run in range(1, options['repeat'] + 1):
+                    self.run(getter, run)
+                if not options['commit']:
+                    transaction.set_rollback(True)
+
+    def run(self, getter: TimedInstrumentsGetter, run: int) -> None:
+        """Выполняет один запуск синхронизации и выводит время по этапам."""
+        timings = TimedCategoryInstrumentsGetter.timings = StageTimings()
+        started_at = perf_counter()
+        result = getter()
+        elapsed = perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(f'Запуск {run}: {elapsed * 1000:.0f} мс'))
+        for stage in STAGES:
+            calls = timings.calls[stage]
+            seconds = timings.seconds[stage]
+            mean = seconds / calls * 1000 if calls else 0
+            self.stdout.write(f'  {stage:<10} {seconds * 1000:>9.1f} мс, вызовов: {calls:>4}, среднее: {mean:.1f} мс')
+        for category, counts in result.items():
+            self.stdout.write(f'  {category}: ' + ', '.join(f'{name} {value}' for name, value in counts.items()))
@@ -0,0 +1,66 @@
+from contextlib import ExitStack
+from signal import SIGTERM, signal
+from threading import Event, Timer
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.bybit.connections import bybit_clients
+from apps.bybit.constants import MARK_PRICE_FLUSH_INTERVAL, MARK_PRICE_REFRESH_INTERVAL
+from apps.bybit.management.commands.run_bybit_standin import add_standin_arguments, get_standin_config
+from apps.bybit.services.streams import MarkPriceIngestor
+from apps.bybit.standin import StandInHTTPServer
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает цены маркировки торгуемых пар из публичного потока тикеров Bybit в Redis. '
+        'Работает до остановки (Ctrl+C или SIGTERM).'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--flush-interval',
+            type=float,
+            default=MARK_PRICE_FLUSH_INTERVAL,
+            help='Интервал записи цен в Redis в секундах.',
+        )
+        parser.add_argument(
+            '--refresh-interval',
+            type=float,
+            default=MARK_PRICE_REFRESH_INTERVAL,
+            help='Интервал проверки изменений каталога торговых пар в секундах.',
+        )
+        parser.add_argument('--duration', type=float, help='Остановиться через указанное количество секунд.')
+        parser.add_argument(
+            '--standin',
+            action='store_true',
+            help='Подключиться к локальному серверу-заменителю Bybit, запущенному командой.',
+        )
+        add_standin_arguments(parser)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        stop = Event()
+        signal(SIGTERM, lambda *_: stop.set())
+        ingestor = MarkPriceIngestor(
+            flush_interval=options['flush_interval'],
+            refresh_interval=options['refresh_interval'],
+        )
+        with ExitStack() as stack:
+            if options['standin']:
+                server = stack.enter_context(StandInHTTPServer(get_standin_config(options)))
+                stack.enter_context(bybit_clients.override(server.url, None))
+                self.stdout.write(f'Сервер-заменитель Bybit: {server.url}')
+            self.stdout.write(self.style.SUCCESS('Сбор цен маркировки Bybit запущен'))
+            if options['duration']:
+                timer = Timer(options['duration'], stop.set)
+                timer.daemon = True
+                timer.start()
+            try:
+                ingestor.run(stop)
+            except KeyboardInterrupt:
+                pass
+        stats = ingestor.stats
+        self.stdout.write(
+            f'Получено тикеров: {stats["received"]}, записано цен: {stats["written"]}, записей: {stats["flushes"]}'
+        )
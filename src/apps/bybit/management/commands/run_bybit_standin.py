@@ -0,0 +1,63 @@
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.bybit.standin import StandInConfig, StandInHTTPServer
+
+
+def add_standin_arguments(parser: CommandParser) -> None:
+    """Добавляет параметры сервера-заменителя Bybit."""
+    parser.add_argument('--instruments', type=int, default=2000, help='Количество инструментов в каждой категории.')
+    parser.add_argument('--page-size', type=int, default=1000, help='Максимальный размер страницы инструментов.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Задержка ответа в секундах.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Случайная добавка к задержке в секундах.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов с ошибкой превышения лимита.')
+    parser.add_argument(
+        '--error-code',
+        type=int,
+        default=10006,
+        help='Ошибка превышения лимита: 429 - HTTP 429, иначе код ошибки Bybit в теле ответа.',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Начальное значение генератора случайных чисел.')
+    parser.add_argument(
+        '--payloads',
+        type=Path,
+        help='Каталог с записанными ответами instruments-info: spot.json, linear.json, inverse.json, option.json.',
+    )
+
+
+def get_standin_config(options: dict[str, Any]) -> StandInConfig:
+    """Собирает настройки сервера-заменителя из параметров команды."""
+    return StandInConfig(
+        instruments=options['instruments'],
+        page_size=options['page_size'],
+        latency=options['latency'],
+        jitter=options['jitter'],
+        error_rate=options['error_rate'],
+        error_code=options['error_code'],
+        seed=options['seed'],
+        payloads=StandInConfig.load_payloads(options['payloads']) if options['payloads'] else {},
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает локальный сервер-заменитель публичного API Bybit. '
+        'Чтобы направить на него приложение, укажите его адрес в переменной окружения BYBIT_ENDPOINT.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--host', default='127.0.0.1', help='Адрес сервера.')
+        parser.add_argument('--port', type=int, default=8765, help='Порт сервера.')
+        add_standin_arguments(parser)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        server = StandInHTTPServer(get_standin_config(options), options['host'], options['port'])
+        self.stdout.write(self.style.SUCCESS(f'Сервер-заменитель Bybit запущен: {server.url}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 14:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bybit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bybitaccess',
+            name='closed_pnl_synced_at',
+            field=models.DateTimeField(
+                blank=True,
+                help_text='Время, до которого загружены закрытые позиции. Следующий импорт начинается с него',
+                null=True,
+                verbose_name='Закрытые позиции загружены до',
+            ),
+        ),
+        migrations.AddField(
+            model_name='bybitaccess',
+            name='executions_synced_at',
+            field=models.DateTimeField(
+                blank=True,
+                help_text='Время, до которого загружены исполнения ордеров. Следующий импорт начинается с него',
+                null=True,
+                verbose_name='Исполнения загружены до',
+            ),
+        ),
+    ]
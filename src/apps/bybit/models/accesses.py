@@ -11,6 +11,18 @@ class ByBitAccess(TimestampedModel, KeySecretFieldModel):
         related_name='bybit_access',
         verbose_name='Пользователь',
     )
+    executions_synced_at = models.DateTimeField(
+        'Исполнения загружены до',
+        null=True,
+        blank=True,
+        help_text='Время, до которого загружены исполнения ордеров. Следующий импорт начинается с него',
+    )
+    closed_pnl_synced_at = models.DateTimeField(
+        'Закрытые позиции загружены до',
+        null=True,
+        blank=True,
+        help_text='Время, до которого загружены закрытые позиции. Следующий импорт начинается с него',
+    )
 
     class Meta:
         verbose_name = 'Доступ к ByBit'
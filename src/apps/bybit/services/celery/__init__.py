@@ -1,5 +1,20 @@
-from bybit.services.celery.current_usdt_linear_instruments_getter import LinearUSDTGetter
+from apps.bybit.services.celery.current_usdt_linear_instruments_getter import LinearUSDTGetter
+from apps.bybit.services.celery.instruments_getter import CategoryInstrumentsGetter, InstrumentsGetter
+from apps.bybit.services.celery.trades_importer import TradesImporter
+from apps.bybit.services.celery.trades_sync import (
+    TradesShardImporter,
+    get_access_shards,
+    summarize_trades_sync,
+    trades_sync_lock,
+)
 
 __all__ = [
+    'CategoryInstrumentsGetter',
+    'InstrumentsGetter',
     'LinearUSDTGetter',
+    'TradesImporter',
+    'TradesShardImporter',
+    'get_access_shards',
+    'summarize_trades_sync',
+    'trades_sync_lock',
 ]
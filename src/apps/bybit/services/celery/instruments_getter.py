@@ -0,0 +1,450 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from logging import getLogger
+from queue import Full, Queue
+from threading import Event
+from typing import Any, ClassVar, Iterator
+
+from django.db.models import QuerySet
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from apps.accounting.models import FinancialAsset, TradingPair, TradingPairSpec
+from apps.accounting.models.enums import Exchange
+from apps.accounting.resolvers import trading_pair_resolver
+from apps.bybit.connections import get_bybit_client
+from apps.bybit.constants import (
+    BYBIT_INSTRUMENT_CATEGORIES,
+    INSTRUMENTS_PAGE_LIMIT,
+    INSTRUMENTS_QUEUE_PUT_TIMEOUT,
+    InstrumentCategory,
+)
+from apps.core.services.base import BaseService
+from apps.core.services.interfaces import DataPipelineService
+
+logger = getLogger('main')
+
+InstrumentPair = tuple[str, str]
+InstrumentSpec = dict[str, Any]
+SPEC_FIELDS = ('tick_size', 'qty_step', 'min_order_qty', 'max_order_qty', 'max_leverage', 'launched_at')
+
+
+@dataclass
+class CategorySyncResult:
+    """
+    Итог синхронизации одной категории.
+
+    Атрибуты:
+        listed (int): Количество торговых пар категории на бирже.
+        added (int): Количество созданных торговых пар.
+        reactivated (int): Количество пар, снова появившихся на бирже после снятия с торгов.
+        delisted (int): Количество пар, снятых с торгов.
+    """
+
+    listed: int = 0
+    added: int = 0
+    reactivated: int = 0
+    delisted: int = 0
+
+
+@dataclass
+class CategoryPage:
+    """
+    Обработанная страница инструментов одной категории, передаваемая из потока загрузки.
+
+    Атрибуты:
+        getter (CategoryInstrumentsGetter): Сервис категории, который сохраняет страницу.
+        pairs (dict[InstrumentPair, InstrumentSpec | None] | None): Торговые параметры по парам
+            (базовая монета, котируемая монета) страницы или None, если страниц категории больше нет.
+        error (Exception | None): Ошибка загрузки, после которой страниц категории больше не будет.
+    """
+
+    getter: 'CategoryInstrumentsGetter'
+    pairs: dict[InstrumentPair, InstrumentSpec | None] | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class CategoryInstrumentsGetter(DataPipelineService):
+    """
+    Сервис синхронизации инструментов одной категории Bybit с торговыми парами.
+
+    Страницы списка инструментов запрашиваются по `nextPageCursor`, каждая страница сохраняется
+    в отдельной короткой транзакции. Пары категории, которых нет ни на одной странице, снимаются
+    с торгов только после загрузки всех страниц.
+
+    Атрибуты:
+        category (InstrumentCategory): Категория инструментов и ее рынок.
+        symbols (set[str]): Символы пар, встреченные на сохраненных страницах.
+        result (CategorySyncResult): Счетчики созданных, возвращенных в торговлю и снятых с торгов пар.
+
+    Методы:
+        fetch_data(cursor: str | None = None, base_coin: str | None = None) -> dict:
+            Выполняет HTTP-запрос к Bybit API для получения одной страницы инструментов категории.
+        fetch_pages() -> Iterator[dict]:
+            Запрашивает все страницы списка инструментов, следуя `nextPageCursor`, по каждой базовой монете.
+        process_data(data: dict) -> dict[InstrumentPair, InstrumentSpec | None]:
+            Отбирает инструменты категории и возвращает их торговые параметры по парам тикеров.
+        get_spec(instrument: dict) -> InstrumentSpec | None:
+            Извлекает торговые параметры инструмента.
+        fetch(pages: Queue[CategoryPage], stop: Event) -> None:
+            Загружает и обрабатывает страницы, передавая их в очередь, пока не установлено `stop`.
+            Выполняется в потоке.
+        save_to_database(pairs: dict[InstrumentPair, InstrumentSpec | None]) -> None:
+            Сверяет активы, торговые пары и их параметры одной страницы с базой данных.
+        deactivate_missing_trading_pairs() -> None:
+            Снимает с торгов пары категории, которых нет ни на одной странице.
+        act() -> CategorySyncResult:
+            Последовательно синхронизирует категорию и возвращает итог синхронизации.
+    """
+
+    category: InstrumentCategory
+    symbols: set[str] = field(default_factory=set)
+    result: CategorySyncResult = field(default_factory=CategorySyncResult)
+
+    def act(self) -> CategorySyncResult:
+        """
+        Синхронизирует категорию постранично в текущем потоке.
+
+        Возвращает:
+            CategorySyncResult: Итог синхронизации категории.
+        """
+        for data in self.fetch_pages():
+            self.save_to_database(self.process_data(data))
+        self.deactivate_missing_trading_pairs()
+        return self.result
+
+    def fetch_data(self, cursor: str | None = None, base_coin: str | None = None) -> dict:
+        """
+        Выполняет запрос к API Bybit для получения одной страницы инструментов категории.
+
+        Аргументы:
+            cursor (str | None): Курсор страницы из `nextPageCursor` предыдущего ответа.
+            base_coin (str | None): Базовая монета инструментов или None для всей категории.
+
+        Возвращает:
+            dict: Данные о доступных торговых инструментах.
+        """
+        params: dict[str, Any] = {'category': self.category.name, 'limit': INSTRUMENTS_PAGE_LIMIT}
+        if base_coin:
+            params['baseCoin'] = base_coin
+        if cursor:
+            params['cursor'] = cursor
+        return get_bybit_client().get_instruments_info(**params)
+
+    def fetch_pages(self) -> Iterator[dict]:
+        """
+        Последовательно запрашивает страницы списка инструментов, следуя `nextPageCursor`.
+
+        Если у категории заданы базовые монеты, страницы запрашиваются по каждой монете отдельно.
+
+        Возвращает:
+            Iterator[dict]: Ответы API по одному на страницу.
+        """
+        for base_coin in self.category.base_coins or (None,):
+            cursor = None
+            while True:
+                page = self.fetch_data(cursor, base_coin)
+                yield page
+                cursor = page['result'].get('nextPageCursor')
+                if not cursor:
+                    break
+
+    def process_data(self, data: dict) -> dict[InstrumentPair, InstrumentSpec | None]:
+        """
+        Отбирает инструменты категории.
+
+        Пропускаются инструменты в предлистинге, с котируемой монетой вне категории и, если категория
+        требует, инструменты, символ которых не совпадает с символом пары (например, срочные контракты).
+        Повторяющиеся пары (опционы одного базового актива) возвращаются один раз
+        с параметрами первого инструмента.
+
+        Аргументы:
+            data (dict): Данные с информацией о торговых инструментах.
+
+        Возвращает:
+            dict[InstrumentPair, InstrumentSpec | None]: Торговые параметры по парам тикеров базовой
+                и котируемой монет.
+        """
+        pairs: dict[InstrumentPair, InstrumentSpec | None] = {}
+        for instrument in data['result']['list']:
+            base_coin, quote_coin = instrument['baseCoin'], instrument['quoteCoin']
+            if instrument.get('isPreListing'):
+                continue
+            if self.category.quote_coins is not None and quote_coin not in self.category.quote_coins:
+                continue
+            if self.category.exact_symbol and instrument['symbol'] != f'{base_coin}{quote_coin}':
+                continue
+            if (base_coin, quote_coin) not in pairs:
+                pairs[(base_coin, quote_coin)] = self.get_spec(instrument)
+        return pairs
+
+    def get_spec(self, instrument: dict) -> InstrumentSpec | None:
+        """
+        Извлекает торговые параметры инструмента.
+
+        У спотовых инструментов шаг количества называется `basePrecision`, а плеча и даты запуска нет.
+
+        Аргументы:
+            instrument (dict): Инструмент из ответа API.
+
+        Возвращает:
+            InstrumentSpec | None: Значения полей `TradingPairSpec` или None, если в ответе нет шага цены,
+                шага количества или минимального количества.
+        """
+        price_filter = instrument.get('priceFilter') or {}
+        lot_size_filter = instrument.get('lotSizeFilter') or {}
+        leverage_filter = instrument.get('leverageFilter') or {}
+        launch_time = instrument.get('launchTime')
+        spec = {
+            'tick_size': to_decimal(price_filter.get('tickSize')),
+            'qty_step': to_decimal(lot_size_filter.get('qtyStep') or lot_size_filter.get('basePrecision')),
+            'min_order_qty': to_decimal(lot_size_filter.get('minOrderQty')),
+            'max_order_qty': to_decimal(lot_size_filter.get('maxOrderQty')),
+            'max_leverage': to_decimal(leverage_filter.get('maxLeverage')),
+            'launched_at': (
+                datetime.fromtimestamp(int(launch_time) / 1000, tz=dt_timezone.utc) if launch_time else None
+            ),
+        }
+        if spec['tick_size'] is None or spec['qty_step'] is None or spec['min_order_qty'] is None:
+            return None
+        return spec
+
+    def fetch(self, pages: 'Queue[CategoryPage]', stop: Event) -> None:
+        """
+        Загружает и обрабатывает страницы категории, передавая их в очередь для сохранения.
+
+        Выполняется в потоке пула и не обращается к базе данных. Очередь ограничена, поэтому загрузка
+        не уходит вперед сохранения больше чем на размер очереди. Последним в очередь передается признак
+        завершения категории с ошибкой загрузки, если она произошла. Если установлено событие `stop`
+        (сохранение завершилось ошибкой), загрузка прекращается, не дожидаясь места в очереди.
+
+        Аргументы:
+            pages (Queue[CategoryPage]): Очередь страниц, которую разбирает основной поток.
+            stop (Event): Событие остановки синхронизации.
+        """
+        try:
+            for data in self.fetch_pages():
+                if not self.put_page(pages, CategoryPage(self, pairs=self.process_data(data)), stop):
+                    return
+        except Exception as error:
+            self.put_page(pages, CategoryPage(self, error=error), stop)
+        else:
+            self.put_page(pages, CategoryPage(self), stop)
+
+    def put_page(self, pages: 'Queue[CategoryPage]', page: CategoryPage, stop: Event) -> bool:
+        """Ждет места в очереди и передает страницу. Возвращает False, если синхронизация остановлена."""
+        while not stop.is_set():
+            try:
+                pages.put(page, timeout=INSTRUMENTS_QUEUE_PUT_TIMEOUT)
+            except Full:
+                continue
+            return True
+        return False
+
+    def get_assets(self, tickers: set[str]) -> dict[str, FinancialAsset]:
+        """
+        Возвращает активы категории по тикерам одним запросом, создавая недостающие.
+
+        Используется `INSERT ... ON CONFLICT DO UPDATE`, который возвращает идентификаторы и новых,
+        и существующих активов. Обновляется только тип актива (тем же значением), поэтому дата изменения
+        существующих активов не меняется и не сбрасывает ETag списков торговых пар.
+
+        Аргументы:
+            tickers (set[str]): Тикеры базовых и котируемых монет страницы.
+
+        Возвращает:
+            dict[str, FinancialAsset]: Активы по тикерам.
+        """
+        asset_data = self.category.asset_data
+        assets = FinancialAsset.objects.bulk_create(
+            [FinancialAsset(ticker=ticker, **asset_data) for ticker in sorted(tickers)],
+            update_conflicts=True,
+            unique_fields=['ticker', 'type', 'market', 'exchange'],
+            update_fields=['type'],
+        )
+        return {asset.ticker: asset for asset in assets}
+
+    def get_trading_pairs(self) -> QuerySet[TradingPair]:
+        """
+        Возвращает торговые пары рынка и биржи категории.
+
+        Пара однозначно определяется символом, рынком и биржей, а символы страниц уже содержат котируемые
+        монеты категории, поэтому запросы по символам не соединяются с таблицей активов.
+        """
+        return TradingPair.objects.filter(market=self.category.market, exchange=Exchange.BYBIT)
+
+    @atomic
+    def save_to_database(self, pairs: dict[InstrumentPair, InstrumentSpec | None]) -> None:
+        """
+        Сверяет торговые пары и их параметры одной страницы с базой данных в отдельной транзакции.
+
+        Число запросов не зависит от количества инструментов и изменений на странице:
+        - активы создаются одним `INSERT ... ON CONFLICT` (`get_assets`);
+        - состояние существующих пар страницы читается одним запросом;
+        - недостающие пары создаются одним `INSERT ... ON CONFLICT`, который не падает,
+          если пару одновременно создал другой процесс;
+        - пары, снятые с торгов ранее и снова появившиеся на бирже, возвращаются в торговлю одним `UPDATE`;
+        - торговые параметры пар создаются или обновляются одним `INSERT ... ON CONFLICT`.
+
+        Аргументы:
+            pairs (dict[InstrumentPair, InstrumentSpec | None]): Торговые параметры по парам тикеров
+                базовой и котируемой монет страницы.
+        """
+        if not pairs:
+            return
+        symbols = {f'{base}{quote}': (base, quote) for base, quote in pairs}
+        self.symbols.update(symbols)
+        self.result.listed += len(symbols)
+        trading_pairs = list(self.get_trading_pairs().filter(symbol__in=symbols).values_list('symbol', 'pk', 'traded'))
+        trading_pair_ids = {symbol: pk for symbol, pk, _ in trading_pairs}
+        traded = {symbol: is_traded for symbol, _, is_traded in trading_pairs}
+        new_symbols = symbols.keys() - traded.keys()
+        if new_symbols:
+            assets = self.get_assets({ticker for symbol in new_symbols for ticker in symbols[symbol]})
+            new_trading_pairs = TradingPair.objects.bulk_create(
+                [
+                    TradingPair(base_asset=assets[symbols[symbol][0]], quote_asset=assets[symbols[symbol][1]])
+                    for symbol in sorted(new_symbols)
+                ],
+                update_conflicts=True,
+                unique_fields=['base_asset', 'quote_asset'],
+                update_fields=['symbol', 'market', 'exchange'],
+            )
+            trading_pair_ids.update((trading_pair.symbol, trading_pair.pk) for trading_pair in new_trading_pairs)
+            self.result.added += len(new_symbols)
+        relisted_symbols = [symbol for symbol, is_traded in traded.items() if not is_traded]
+        if relisted_symbols:
+            self.result.reactivated += (
+                self.get_trading_pairs()
+                .filter(traded=False, symbol__in=relisted_symbols)
+                .update(traded=True, modified_at=timezone.now())
+            )
+        specs = [
+            TradingPairSpec(trading_pair_id=trading_pair_ids[f'{base}{quote}'], **spec)
+            for (base, quote), spec in pairs.items()
+            if spec is not None
+        ]
+        if specs:
+            TradingPairSpec.objects.bulk_create(
+                specs,
+                update_conflicts=True,
+                unique_fields=['trading_pair'],
+                update_fields=SPEC_FIELDS,
+            )
+
+    @atomic
+    def deactivate_missing_trading_pairs(self) -> None:
+        """
+        Снимает с торгов пары категории, которых нет ни на одной странице, одним `UPDATE`.
+
+        Пары других котируемых монет того же рынка не затрагиваются. Котируемые активы категории читаются
+        отдельным запросом, а не соединением: на только что заполненных таблицах с устаревшей статистикой
+        Postgres выбирает для соединения вложенный цикл по всем активам для каждой пары.
+        """
+        trading_pairs = self.get_trading_pairs().filter(traded=True).exclude(symbol__in=self.symbols)
+        if self.category.quote_coins is not None:
+            quote_assets = FinancialAsset.objects.filter(
+                ticker__in=self.category.quote_coins, market=self.category.market, exchange=Exchange.BYBIT
+            )
+            trading_pairs = trading_pairs.filter(quote_asset_id__in=list(quote_assets.values_list('pk', flat=True)))
+        self.result.delisted += trading_pairs.update(traded=False, modified_at=timezone.now())
+
+
+@dataclass
+class InstrumentsGetter(BaseService):
+    """
+    Сервис синхронизации каталога инструментов Bybit по всем категориям.
+
+    Страницы всех категорий загружаются одновременно в пуле потоков, а сохраняются в основном потоке
+    по мере поступления, каждая в своей короткой транзакции: потоки пула не открывают соединений с базой.
+    Очередь страниц вмещает по одной странице на категорию, поэтому в памяти одновременно не больше
+    двух страниц каждой категории: в очереди и загружаемая. Если сохранение завершилось ошибкой,
+    потоки загрузки останавливаются.
+    Пары категории снимаются с торгов после загрузки всех ее страниц. Ошибка загрузки одной категории
+    не мешает синхронизации остальных: ее пары не снимаются с торгов, а ошибка пробрасывается
+    после обработки всех категорий.
+
+    Атрибуты:
+        categories (tuple[InstrumentCategory, ...]): Синхронизируемые категории.
+        category_getter_class (type[CategoryInstrumentsGetter]): Сервис синхронизации одной категории.
+
+    Методы:
+        act() -> dict[str, dict[str, int]]:
+            Синхронизирует категории и возвращает итог синхронизации каждой.
+        save_pages(pages: Queue[CategoryPage], pending: int) -> list[Exception]:
+            Сохраняет страницы из очереди и возвращает ошибки загрузки категорий.
+    """
+
+    categories: tuple[InstrumentCategory, ...] = BYBIT_INSTRUMENT_CATEGORIES
+    category_getter_class: ClassVar[type[CategoryInstrumentsGetter]] = CategoryInstrumentsGetter
+
+    def act(self) -> dict[str, dict[str, int]]:
+        """
+        Синхронизирует категории и сбрасывает кэши поиска торговых пар и их торговых параметров.
+
+        Массовые операции не отправляют сигналы моделей, поэтому кэши сбрасываются явно сменой номера
+        версии каталога, в том числе если синхронизация какой-либо категории завершилась ошибкой.
+
+        Возвращает:
+            dict[str, dict[str, int]]: Итоги синхронизации по категориям: количество пар на бирже,
+                созданных, возвращенных в торговлю и снятых с торгов.
+        """
+        getters = [self.category_getter_class(category) for category in self.categories]
+        pages: Queue[CategoryPage] = Queue(maxsize=len(getters))
+        stop = Event()
+        try:
+            with ThreadPoolExecutor(max_workers=len(getters), thread_name_prefix='bybit-instruments') as executor:
+                for getter in getters:
+                    executor.submit(getter.fetch, pages, stop)
+                try:
+                    errors = self.save_pages(pages, len(getters))
+                finally:
+                    stop.set()
+        finally:
+            trading_pair_resolver.invalidate_on_commit()
+        if errors:
+            raise errors[0]
+        return {getter.category.name: asdict(getter.result) for getter in getters}
+
+    def save_pages(self, pages: Queue[CategoryPage], pending: int) -> list[Exception]:
+        """
+        Сохраняет страницы из очереди, пока не завершатся все категории.
+
+        Аргументы:
+            pages (Queue[CategoryPage]): Очередь страниц потоков загрузки.
+            pending (int): Количество категорий.
+
+        Возвращает:
+            list[Exception]: Ошибки загрузки категорий.
+        """
+        errors: list[Exception] = []
+        while pending:
+            page = pages.get()
+            if page.pairs is not None:
+                page.getter.save_to_database(page.pairs)
+                continue
+            pending -= 1
+            if page.error is None:
+                page.getter.deactivate_missing_trading_pairs()
+                logger.info(
+                    'Инструменты Bybit категории %s синхронизированы: %s',
+                    page.getter.category.name,
+                    page.getter.result,
+                )
+                continue
+            logger.error(
+                'Не удалось загрузить инструменты Bybit категории %s',
+                page.getter.category.name,
+                exc_info=page.error,
+            )
+            errors.append(page.error)
+        return errors
+
+
+def to_decimal(value: str | None) -> Decimal | None:
+    """Преобразует число из ответа API в Decimal, пустые значения - в None."""
+    return Decimal(value) if value else None
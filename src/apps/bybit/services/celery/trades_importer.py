@@ -0,0 +1,551 @@
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from logging import getLogger
+from typing import Any, Callable, ClassVar, Iterator
+
+from django.db.models import Q
+from django.db.transaction import atomic
+from django.utils import timezone
+
+from apps.accounting.models import Position, TradingPair
+from apps.accounting.models.enums import Exchange, MarketType, PositionSide, TralingStopType
+from apps.bybit.connections import BybitHTTP, get_bybit_client
+from apps.bybit.constants import (
+    POSITIONS_PAGE_LIMIT,
+    TRADES_CATEGORY,
+    TRADES_HISTORY,
+    TRADES_PAGE_LIMIT,
+    TRADES_SETTLE_COINS,
+    TRADES_SYNC_LAG,
+    TRADES_SYNC_OVERLAP,
+    TRADES_WINDOW,
+)
+from apps.bybit.models import ByBitAccess
+from apps.core.services.interfaces import DataPipelineService
+
+logger = getLogger('main')
+
+PositionData = dict[str, Any]
+OPEN_POSITION_PREFIX = 'position:'
+CLOSED_PNL_PREFIX = 'closed-pnl:'
+POSITION_FIELDS = (
+    'is_closed',
+    'side',
+    'size',
+    'entry_price',
+    'leverage',
+    'liq_price',
+    'take_profit',
+    'stop_loss',
+    'trailing_stop',
+    'type_trailing_stop',
+    'opened_at',
+    'closed_at',
+)
+ONE_MS = timedelta(milliseconds=1)
+
+
+@dataclass
+class TradesImportResult:
+    """
+    Итог импорта сделок пользователя.
+
+    Атрибуты:
+        created (int): Количество созданных позиций.
+        updated (int): Количество обновленных позиций.
+        closed (int): Количество открытых ранее позиций, закрытых по закрытым позициям биржи.
+        skipped (int): Количество записей с символами, для которых нет торговой пары.
+    """
+
+    created: int = 0
+    updated: int = 0
+    closed: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class TradesData:
+    """
+    Ответы API, загруженные за один импорт.
+
+    Атрибуты:
+        executions (list[dict]): Исполнения ордеров после курсора.
+        closed_pnl (list[dict]): Закрытые позиции после курсора.
+        positions (list[dict] | None): Открытые позиции или None, если изменений не было и они не загружались.
+        synced_until (datetime): Время, до которого загружены исполнения и закрытые позиции.
+    """
+
+    executions: list[dict]
+    closed_pnl: list[dict]
+    positions: list[dict] | None
+    synced_until: datetime
+
+
+@dataclass
+class TradesBatch:
+    """
+    Позиции, подготовленные к сохранению, по идентификаторам на бирже.
+
+    Атрибуты:
+        open_positions (dict[str, PositionData] | None): Открытые позиции или None, если они не загружались.
+        closed_positions (dict[str, PositionData]): Закрытые позиции в порядке закрытия.
+        synced_until (datetime): Новое значение курсоров доступа.
+    """
+
+    open_positions: dict[str, PositionData] | None
+    closed_positions: dict[str, PositionData]
+    synced_until: datetime
+
+
+@dataclass
+class TradesImporter(DataPipelineService):
+    """
+    Сервис инкрементального импорта сделок пользователя с линейных контрактов Bybit в позиции.
+
+    Ключ API берется из `ByBitAccess`. Исполнения ордеров и закрытые позиции загружаются после курсоров
+    доступа (`executions_synced_at`, `closed_pnl_synced_at`) окнами по 7 дней, как требует API. Записи могут
+    появиться в API позже своего времени, поэтому каждый импорт повторно загружает `TRADES_SYNC_OVERLAP`
+    перед курсором. Повторно загруженные закрытые позиции, уже учтенные в позициях пользователя, отбрасываются.
+    Исполнения служат лентой изменений: список открытых позиций запрашивается, только если после прошлого
+    импорта были исполнения или новые закрытия, поэтому повторный импорт без сделок стоит два запроса к бирже
+    и один к базе.
+
+    Позиции сопоставляются по идентификатору на бирже (`Position.external_id`) и сохраняются пачками
+    через `INSERT ... ON CONFLICT`, поэтому повторная загрузка тех же записей их не дублирует.
+    Открытая позиция, исчезнувшая с биржи, закрывается по ее закрытым позициям: запись в дневнике
+    и комментарии к ней сохраняются. Пока закрытых позиций для нее нет, курсор закрытых позиций
+    не сдвигается дальше времени ее открытия, а открытые позиции запрашиваются каждым импортом.
+    Остальные закрытые позиции (частичные закрытия, история до первого импорта) создаются отдельными
+    позициями, время открытия для них берется из открывающих исполнений.
+
+    Атрибуты:
+        access (ByBitAccess): Доступ пользователя к Bybit.
+        now (datetime): Время импорта.
+        result (TradesImportResult): Счетчики созданных, обновленных, закрытых и пропущенных позиций.
+
+    Методы:
+        fetch_data() -> TradesData:
+            Загружает исполнения и закрытые позиции после курсоров и, если были изменения, открытые позиции.
+        process_data(data: TradesData) -> TradesBatch:
+            Преобразует записи биржи в поля позиций.
+        save_to_database(batch: TradesBatch) -> None:
+            Сохраняет позиции и сдвигает курсоры доступа.
+        act() -> dict[str, int]:
+            Выполняет импорт и возвращает его итог.
+    """
+
+    access: ByBitAccess
+    now: datetime = field(default_factory=timezone.now)
+    result: TradesImportResult = field(default_factory=TradesImportResult)
+
+    BATCH_SIZE: ClassVar[int] = 500
+
+    def act(self) -> dict[str, int]:
+        """
+        Импортирует новые сделки пользователя.
+
+        Возвращает:
+            dict[str, int]: Количество созданных, обновленных, закрытых и пропущенных позиций.
+        """
+        self.save_to_database(self.process_data(self.fetch_data()))
+        return asdict(self.result)
+
+    def get_client(self) -> BybitHTTP:
+        """Возвращает клиент Bybit с ключом API пользователя."""
+        return get_bybit_client(self.access.key, self.access.secret)
+
+    def fetch_data(self) -> TradesData:
+        """
+        Загружает исполнения и закрытые позиции после курсоров доступа и открытые позиции, если они могли измениться.
+
+        Возвращает:
+            TradesData: Ответы API.
+        """
+        client = self.get_client()
+        synced_until = self.now - TRADES_SYNC_LAG
+        # Исполнения всегда загружаются до конца периода, поэтому их курсор - время окончания прошлого импорта.
+        previous_until = self.access.executions_synced_at
+        executions = [
+            execution
+            for execution in self.fetch_history(client.get_executions, previous_until, synced_until)
+            if execution.get('execType') == 'Trade'
+        ]
+        closed_pnl = list(self.fetch_history(client.get_closed_pnl, self.access.closed_pnl_synced_at, synced_until))
+        if previous_until is not None:
+            closed_pnl = self.drop_imported_closed_pnl(closed_pnl, previous_until)
+        positions = None
+        if (
+            previous_until is None
+            or any(from_ms(execution['execTime']) > previous_until for execution in executions)
+            or closed_pnl
+            or self.access.closed_pnl_synced_at != previous_until
+        ):
+            positions = [
+                position
+                for settle_coin in TRADES_SETTLE_COINS
+                for position in self.fetch_pages(client.get_positions, POSITIONS_PAGE_LIMIT, settleCoin=settle_coin)
+            ]
+        return TradesData(executions, closed_pnl, positions, synced_until)
+
+    def fetch_history(self, method: Callable[..., dict], synced_at: datetime | None, until: datetime) -> Iterator[dict]:
+        """
+        Загружает записи после курсора окнами не длиннее `TRADES_WINDOW`.
+
+        Аргументы:
+            method (Callable[..., dict]): Метод клиента Bybit.
+            synced_at (datetime | None): Курсор: время, до которого записи уже загружены, или None
+                для первого импорта на глубину `TRADES_HISTORY`. Записи загружаются с `TRADES_SYNC_OVERLAP`
+                перед курсором.
+            until (datetime): Время, до которого загружаются записи.
+
+        Возвращает:
+            Iterator[dict]: Записи всех окон.
+        """
+        start = synced_at - TRADES_SYNC_OVERLAP + ONE_MS if synced_at else until - TRADES_HISTORY
+        while start <= until:
+            end = min(start + TRADES_WINDOW, until)
+            yield from self.fetch_pages(method, TRADES_PAGE_LIMIT, startTime=to_ms(start), endTime=to_ms(end))
+            start = end + ONE_MS
+
+    def drop_imported_closed_pnl(self, records: list[dict], previous_until: datetime) -> list[dict]:
+        """
+        Отбрасывает повторно загруженные закрытые позиции, уже учтенные в позициях пользователя.
+
+        Закрытая позиция до конца прошлого импорта учтена, если позиция с ее идентификатором сохранена
+        или если она закрыла импортированную позицию той же пары и стороны: ее время закрытия лежит между
+        открытием и закрытием сохраненной позиции. Так не создаются заново частичные закрытия, по которым
+        была закрыта исчезнувшая с биржи позиция. Учтенные позиции читаются одним запросом.
+
+        Аргументы:
+            records (list[dict]): Закрытые позиции из API.
+            previous_until (datetime): Время окончания прошлого импорта.
+
+        Возвращает:
+            list[dict]: Новые закрытые позиции.
+        """
+        candidates = {
+            f'{CLOSED_PNL_PREFIX}{record["orderId"]}': self.get_closed_position(record)
+            for record in records
+            if from_ms(record['updatedTime']) <= previous_until
+        }
+        if not candidates:
+            return records
+        closed_times = [position['closed_at'] for position in candidates.values()]
+        stored = Position.objects.filter(
+            user_id=self.access.user_id,
+            is_closed=True,
+            external_id__startswith=CLOSED_PNL_PREFIX,
+            trading_pair__symbol__in={position['symbol'] for position in candidates.values()},
+            trading_pair__market=MarketType.FUTURES,
+            trading_pair__exchange=Exchange.BYBIT,
+            opened_at__lte=max(closed_times),
+            closed_at__gte=min(closed_times),
+        ).values_list('external_id', 'trading_pair__symbol', 'side', 'opened_at', 'closed_at')
+        intervals: defaultdict[tuple[str, str], list[tuple[datetime, datetime]]] = defaultdict(list)
+        imported = set()
+        for external_id, symbol, side, opened_at, closed_at in stored:
+            imported.add(external_id)
+            if closed_at is not None:
+                intervals[(symbol, side)].append((opened_at, closed_at))
+        for external_id, position in candidates.items():
+            if any(
+                opened_at <= position['closed_at'] <= closed_at
+                for opened_at, closed_at in intervals[(position['symbol'], position['side'])]
+            ):
+                imported.add(external_id)
+        return [record for record in records if f'{CLOSED_PNL_PREFIX}{record["orderId"]}' not in imported]
+
+    def fetch_pages(self, method: Callable[..., dict], limit: int, **params: Any) -> Iterator[dict]:
+        """Запрашивает все страницы списка, следуя `nextPageCursor`."""
+        cursor = None
+        while True:
+            page_params = {'category': TRADES_CATEGORY, 'limit': limit, **params}
+            if cursor:
+                page_params['cursor'] = cursor
+            result = method(**page_params)['result']
+            yield from result['list']
+            cursor = result.get('nextPageCursor')
+            if not cursor:
+                return
+
+    def process_data(self, data: TradesData) -> TradesBatch:
+        """
+        Преобразует записи биржи в поля позиций.
+
+        Аргументы:
+            data (TradesData): Ответы API.
+
+        Возвращает:
+            TradesBatch: Открытые и закрытые позиции по идентификаторам на бирже.
+        """
+        open_positions = None
+        if data.positions is not None:
+            open_positions = {
+                get_open_position_id(position): self.get_open_position(position)
+                for position in data.positions
+                if to_decimal(position['size'])
+            }
+        openings: defaultdict[str, list[datetime]] = defaultdict(list)
+        for execution in data.executions:
+            if not to_decimal(execution.get('closedSize')):
+                openings[execution['symbol']].append(from_ms(execution['execTime']))
+        for times in openings.values():
+            times.sort()
+        closed_positions = {}
+        previous_closes: dict[str, datetime] = {}
+        for record in sorted(data.closed_pnl, key=lambda record: int(record['updatedTime'])):
+            symbol = record['symbol']
+            position = self.get_closed_position(record)
+            position['opened_at'] = get_opened_at(openings[symbol], previous_closes.get(symbol), position['opened_at'])
+            previous_closes[symbol] = position['closed_at']
+            closed_positions[f'{CLOSED_PNL_PREFIX}{record["orderId"]}'] = position
+        return TradesBatch(open_positions, closed_positions, data.synced_until)
+
+    def get_open_position(self, position: dict) -> PositionData:
+        """Возвращает поля открытой позиции из записи списка позиций."""
+        trailing_stop = to_price(position.get('trailingStop'))
+        return {
+            'symbol': position['symbol'],
+            'is_closed': False,
+            'side': PositionSide.LONG if position['side'] == 'Buy' else PositionSide.SHORT,
+            'size': Decimal(position['size']),
+            'entry_price': Decimal(position['avgPrice']),
+            'leverage': Decimal(position.get('leverage') or 1),
+            'liq_price': to_price(position.get('liqPrice')),
+            'take_profit': to_price(position.get('takeProfit')),
+            'stop_loss': to_price(position.get('stopLoss')),
+            'trailing_stop': trailing_stop,
+            'type_trailing_stop': TralingStopType.FIXED if trailing_stop else None,
+            'opened_at': from_ms(position['createdTime']),
+            'closed_at': None,
+        }
+
+    def get_closed_position(self, record: dict) -> PositionData:
+        """
+        Возвращает поля закрытой позиции из записи закрытых позиций.
+
+        Сторона записи - сторона закрывающего ордера, поэтому покупка закрывает короткую позицию.
+        Время открытия до сопоставления с исполнениями - время создания закрывающего ордера.
+        """
+        return {
+            'symbol': record['symbol'],
+            'is_closed': True,
+            'side': PositionSide.SHORT if record['side'] == 'Buy' else PositionSide.LONG,
+            'size': Decimal(record['closedSize']),
+            'entry_price': Decimal(record['avgEntryPrice']),
+            'leverage': Decimal(record.get('leverage') or 1),
+            'liq_price': None,
+            'take_profit': None,
+            'stop_loss': None,
+            'trailing_stop': None,
+            'type_trailing_stop': None,
+            'opened_at': from_ms(record['createdTime']),
+            'closed_at': from_ms(record['updatedTime']),
+        }
+
+    @atomic
+    def save_to_database(self, batch: TradesBatch) -> None:
+        """
+        Сохраняет позиции пользователя и сдвигает курсоры доступа.
+
+        Число запросов не зависит от количества записей (пачками по `BATCH_SIZE`):
+        - торговые пары всех символов читаются одним запросом;
+        - импортированные ранее позиции этих записей и открытые позиции пользователя читаются одним запросом;
+        - открытые позиции, исчезнувшие с биржи, закрываются одним `UPDATE`;
+        - остальные позиции создаются или обновляются одним `INSERT ... ON CONFLICT`;
+        - курсоры доступа сдвигаются одним `UPDATE`.
+
+        Курсор закрытых позиций не сдвигается дальше времени открытия исчезнувшей позиции, которую
+        еще нечем закрыть (`get_closed_pnl_synced_at`).
+
+        Аргументы:
+            batch (TradesBatch): Позиции, подготовленные к сохранению.
+        """
+        open_positions = batch.open_positions or {}
+        closed_positions = dict(batch.closed_positions)
+        unmatched_opened_at = None
+        if batch.open_positions is not None or closed_positions:
+            trading_pairs = TradingPair.objects.get_by_symbols(
+                (position['symbol'], MarketType.FUTURES, Exchange.BYBIT)
+                for position in [*open_positions.values(), *closed_positions.values()]
+            )
+            external_ids = [*open_positions, *closed_positions]
+            stored = list(
+                Position.objects.filter(user_id=self.access.user_id)
+                .filter(
+                    Q(external_id__in=external_ids) | Q(is_closed=False, external_id__startswith=OPEN_POSITION_PREFIX)
+                )
+                .only('pk', 'external_id', 'trading_pair_id', 'is_closed', 'opened_at')
+            )
+            existing = {position.external_id for position in stored}
+            if batch.open_positions is not None:
+                unmatched_opened_at = self.close_missing_positions(
+                    stored, open_positions, closed_positions, existing, trading_pairs
+                )
+            self.upsert_positions({**open_positions, **closed_positions}, existing, trading_pairs)
+        closed_pnl_synced_at = self.get_closed_pnl_synced_at(batch.synced_until, unmatched_opened_at)
+        ByBitAccess.objects.filter(pk=self.access.pk).update(
+            executions_synced_at=batch.synced_until, closed_pnl_synced_at=closed_pnl_synced_at
+        )
+        self.access.executions_synced_at = batch.synced_until
+        self.access.closed_pnl_synced_at = closed_pnl_synced_at
+
+    def get_closed_pnl_synced_at(self, synced_until: datetime, unmatched_opened_at: datetime | None) -> datetime:
+        """
+        Возвращает новый курсор закрытых позиций.
+
+        Если есть исчезнувшая с биржи позиция без закрытых позиций, курсор не сдвигается дальше времени ее
+        открытия (и не отодвигается назад), чтобы ее закрытие загрузилось, даже если появится в API позже
+        `TRADES_SYNC_OVERLAP`. Курсор не отстает от времени импорта больше чем на `TRADES_HISTORY`.
+
+        Аргументы:
+            synced_until (datetime): Время, до которого загружены записи.
+            unmatched_opened_at (datetime | None): Время открытия самой ранней исчезнувшей позиции без закрытых
+                позиций или None.
+        """
+        if unmatched_opened_at is None:
+            return synced_until
+        synced_at = unmatched_opened_at - ONE_MS
+        if self.access.closed_pnl_synced_at is not None:
+            synced_at = max(synced_at, self.access.closed_pnl_synced_at)
+        return min(max(synced_at, synced_until - TRADES_HISTORY), synced_until)
+
+    def close_missing_positions(
+        self,
+        stored: list[Position],
+        open_positions: dict[str, PositionData],
+        closed_positions: dict[str, PositionData],
+        existing: set[str | None],
+        trading_pairs: dict[tuple[str, str, str], TradingPair],
+    ) -> datetime | None:
+        """
+        Закрывает импортированные открытые позиции, которых больше нет на бирже.
+
+        Позиция закрывается по новым закрытым позициям той же пары, закрытым после ее открытия:
+        размер - сумма закрытых размеров, время закрытия и идентификатор - последней из них.
+        Эти закрытые позиции не создаются отдельно. Если закрытых позиций еще нет в API, позиция
+        остается открытой до следующего импорта.
+
+        Возвращает:
+            datetime | None: Время открытия самой ранней позиции, оставшейся открытой, или None.
+        """
+        unmatched_opened_at = None
+        closes_by_pair: defaultdict[int, list[str]] = defaultdict(list)
+        for external_id, data in closed_positions.items():
+            trading_pair = trading_pairs.get(get_trading_pair_key(data))
+            if trading_pair is not None and external_id not in existing:
+                closes_by_pair[trading_pair.pk].append(external_id)
+        closed = []
+        for position in stored:
+            if position.is_closed or not str(position.external_id).startswith(OPEN_POSITION_PREFIX):
+                continue
+            if position.external_id in open_positions:
+                continue
+            external_ids = [
+                external_id
+                for external_id in closes_by_pair[position.trading_pair_id]
+                if external_id in closed_positions and closed_positions[external_id]['closed_at'] >= position.opened_at
+            ]
+            if not external_ids:
+                if unmatched_opened_at is None or position.opened_at < unmatched_opened_at:
+                    unmatched_opened_at = position.opened_at
+                continue
+            records = [closed_positions.pop(external_id) for external_id in external_ids]
+            position.is_closed = True
+            position.size = sum((record['size'] for record in records), Decimal(0))
+            position.closed_at = records[-1]['closed_at']
+            position.external_id = external_ids[-1]
+            position.modified_at = self.now
+            closed.append(position)
+        if closed:
+            Position.objects.bulk_update(
+                closed, ['is_closed', 'size', 'closed_at', 'external_id', 'modified_at'], batch_size=self.BATCH_SIZE
+            )
+        self.result.closed += len(closed)
+        return unmatched_opened_at
+
+    def upsert_positions(
+        self,
+        positions: dict[str, PositionData],
+        existing: set[str | None],
+        trading_pairs: dict[tuple[str, str, str], TradingPair],
+    ) -> None:
+        """Создает или обновляет позиции пачками одним `INSERT ... ON CONFLICT` на пачку."""
+        objs = []
+        unknown_symbols = set()
+        for external_id, data in positions.items():
+            trading_pair = trading_pairs.get(get_trading_pair_key(data))
+            if trading_pair is None:
+                unknown_symbols.add(data['symbol'])
+                self.result.skipped += 1
+                continue
+            fields = {name: data[name] for name in POSITION_FIELDS}
+            objs.append(
+                Position(user_id=self.access.user_id, trading_pair=trading_pair, external_id=external_id, **fields)
+            )
+            if external_id in existing:
+                self.result.updated += 1
+            else:
+                self.result.created += 1
+        if unknown_symbols:
+            logger.warning(
+                'Импорт сделок Bybit пользователя %s: нет торговых пар для символов %s',
+                self.access.user_id,
+                ', '.join(sorted(unknown_symbols)),
+            )
+        if objs:
+            Position.objects.bulk_create(
+                objs,
+                batch_size=self.BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['user', 'external_id'],
+                update_fields=[*POSITION_FIELDS, 'modified_at'],
+            )
+
+
+def get_open_position_id(position: dict) -> str:
+    """
+    Возвращает идентификатор открытой позиции.
+
+    Время создания позиции меняется при ее повторном открытии, поэтому каждое открытие - отдельная позиция.
+    """
+    return f'{OPEN_POSITION_PREFIX}{position["symbol"]}:{position.get("positionIdx", 0)}:{position["createdTime"]}'
+
+
+def get_opened_at(openings: list[datetime], previous_close: datetime | None, default: datetime) -> datetime:
+    """
+    Возвращает время первого открывающего исполнения между предыдущим закрытием символа и закрытием позиции.
+
+    Если такого исполнения среди загруженных нет, возвращается `default`.
+    """
+    index = bisect_right(openings, previous_close) if previous_close else 0
+    if index < len(openings) and openings[index] <= default:
+        return openings[index]
+    return default
+
+
+def get_trading_pair_key(position: PositionData) -> tuple[str, str, str]:
+    return position['symbol'], MarketType.FUTURES.value, Exchange.BYBIT.value
+
+
+def to_decimal(value: str | None) -> Decimal:
+    """Преобразует число из ответа API в Decimal, пустые значения - в 0."""
+    return Decimal(value) if value else Decimal(0)
+
+
+def to_price(value: str | None) -> Decimal | None:
+    """Преобразует цену из ответа API в Decimal, пустые и нулевые цены - в None."""
+    price = to_decimal(value)
+    return price or None
+
+
+def to_ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+def from_ms(value: str | int) -> datetime:
+    return datetime.fromtimestamp(int(value) / 1000, tz=dt_timezone.utc)
@@ -0,0 +1,163 @@
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from logging import getLogger
+from time import perf_counter, time
+from typing import Any
+
+from tradi.redis import redis_client
+
+from apps.bybit.constants import TRADES_LOCK_KEY, TRADES_LOCK_TIMEOUT, TRADES_SYNC_LOCK_KEY, TRADES_SYNC_LOCK_TIMEOUT
+from apps.bybit.models import ByBitAccess
+from apps.bybit.services.celery.trades_importer import TradesImporter
+from apps.core.locks import RedisLock
+from apps.core.services.base import BaseService
+
+logger = getLogger('main')
+
+SYNCED = 'synced'
+LOCKED = 'locked'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+SUMMARY_FAILURES_LIMIT = 20
+
+trades_import_lock = RedisLock(redis_client, TRADES_LOCK_KEY, TRADES_LOCK_TIMEOUT)
+trades_sync_lock = RedisLock(redis_client, TRADES_SYNC_LOCK_KEY, TRADES_SYNC_LOCK_TIMEOUT)
+
+
+@dataclass
+class AccountSyncOutcome:
+    """
+    Итог импорта сделок одного доступа.
+
+    Атрибуты:
+        access_id (int): Идентификатор доступа.
+        status (str): synced - импортирован, locked - импортируется другой задачей, skipped - доступ
+            отключен или удален, failed - ошибка импорта.
+        duration (float): Длительность импорта в секундах.
+        result (dict[str, int]): Итог импорта `TradesImporter`.
+        error (str | None): Ошибка импорта.
+    """
+
+    access_id: int
+    status: str
+    duration: float = 0
+    result: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+
+def get_access_shards(count: int) -> list[list[int]]:
+    """
+    Делит активные доступы к Bybit на не более чем `count` шардов примерно равного размера.
+
+    Аргументы:
+        count (int): Максимальное количество шардов - задач, выполняемых одновременно.
+
+    Возвращает:
+        list[list[int]]: Идентификаторы доступов по шардам, пустой список, если активных доступов нет.
+    """
+    access_ids = list(ByBitAccess.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True))
+    count = max(1, min(count, len(access_ids)))
+    return [shard for shard in (access_ids[index::count] for index in range(count)) if shard]
+
+
+@dataclass
+class TradesShardImporter(BaseService):
+    """
+    Сервис импорта сделок шарда доступов, выполняемый одной задачей.
+
+    Доступы импортируются последовательно, каждый под блокировкой в Redis, которая продлевается,
+    пока идет импорт: если другая задача еще импортирует доступ, он пропускается. Ошибка импорта
+    одного доступа не прерывает остальные.
+
+    Атрибуты:
+        access_ids (list[int]): Идентификаторы доступов шарда.
+
+    Методы:
+        import_access(access_id: int) -> AccountSyncOutcome:
+            Импортирует сделки одного доступа под блокировкой, ошибки импорта пробрасываются.
+        act() -> list[dict[str, Any]]:
+            Импортирует сделки всех доступов шарда и возвращает итоги по доступам.
+    """
+
+    access_ids: list[int]
+
+    def act(self) -> list[dict[str, Any]]:
+        """
+        Импортирует сделки доступов шарда.
+
+        Возвращает:
+            list[dict[str, Any]]: Итоги импорта по доступам (`AccountSyncOutcome`).
+        """
+        outcomes = []
+        for access_id in self.access_ids:
+            started_at = perf_counter()
+            try:
+                outcome = self.import_access(access_id)
+            except Exception as error:
+                logger.error('Не удалось импортировать сделки Bybit доступа %s', access_id, exc_info=error)
+                outcome = AccountSyncOutcome(
+                    access_id, FAILED, perf_counter() - started_at, error=f'{type(error).__name__}: {error}'
+                )
+            outcomes.append(asdict(outcome))
+        return outcomes
+
+    def import_access(self, access_id: int) -> AccountSyncOutcome:
+        """
+        Импортирует сделки одного доступа под блокировкой.
+
+        Аргументы:
+            access_id (int): Идентификатор доступа.
+
+        Возвращает:
+            AccountSyncOutcome: Итог импорта.
+        """
+        started_at = perf_counter()
+        with trades_import_lock.hold(str(access_id), renew=True) as acquired:
+            if not acquired:
+                return AccountSyncOutcome(access_id, LOCKED)
+            access = ByBitAccess.objects.filter(pk=access_id, is_active=True).first()
+            if access is None:
+                return AccountSyncOutcome(access_id, SKIPPED)
+            result = TradesImporter(access)()
+        return AccountSyncOutcome(access_id, SYNCED, perf_counter() - started_at, result)
+
+
+def summarize_trades_sync(shards: list[list[dict[str, Any]]], started_at: float) -> dict[str, Any]:
+    """
+    Сводит итоги шардов одного запуска импорта сделок и записывает их в лог.
+
+    Аргументы:
+        shards (list[list[dict[str, Any]]]): Итоги импорта доступов по шардам.
+        started_at (float): Время запуска в секундах Unix.
+
+    Возвращает:
+        dict[str, Any]: Длительность запуска, количество доступов по статусам, суммарная, средняя
+            и максимальная длительность импорта доступа, сумма итогов импорта и первые ошибки.
+    """
+    outcomes = [AccountSyncOutcome(**outcome) for shard in shards for outcome in shard]
+    statuses = Counter(outcome.status for outcome in outcomes)
+    synced = [outcome for outcome in outcomes if outcome.status == SYNCED]
+    slowest = max(synced, key=lambda outcome: outcome.duration, default=None)
+    totals: Counter[str] = Counter()
+    for outcome in synced:
+        totals.update(outcome.result)
+    failures = [outcome for outcome in outcomes if outcome.status == FAILED]
+    summary = {
+        'duration': round(time() - started_at, 3),
+        'shards': len(shards),
+        'accounts': len(outcomes),
+        **{status: statuses[status] for status in (SYNCED, LOCKED, SKIPPED, FAILED)},
+        'import_duration': {
+            'total': round(sum(outcome.duration for outcome in synced), 3),
+            'mean': round(sum(outcome.duration for outcome in synced) / len(synced), 3) if synced else 0,
+            'max': round(slowest.duration, 3) if slowest else 0,
+            'slowest_access_id': slowest.access_id if slowest else None,
+        },
+        'positions': dict(totals),
+        'failures': [
+            {'access_id': outcome.access_id, 'error': outcome.error} for outcome in failures[:SUMMARY_FAILURES_LIMIT]
+        ],
+    }
+    log = logger.warning if failures else logger.info
+    log('Импорт сделок Bybit завершен: %s', summary)
+    return summary
@@ -0,0 +1,5 @@
+from apps.bybit.services.streams.mark_prices import MarkPriceIngestor
+
+__all__ = [
+    'MarkPriceIngestor',
+]
@@ -0,0 +1,214 @@
+from collections import Counter
+from functools import partial
+from logging import getLogger
+from threading import Event, Lock
+from time import monotonic, time
+from typing import Any, Callable
+
+from django.db import close_old_connections
+
+from redis import RedisError
+
+from apps.accounting.models import TradingPair
+from apps.accounting.models.enums import Exchange
+from apps.accounting.prices import MarkPriceStore, mark_price_store
+from apps.accounting.resolvers import TradingPairKey, trading_pair_resolver
+from apps.bybit.connections import BybitWebSocket, get_bybit_websocket
+from apps.bybit.constants import (
+    MARK_PRICE_CATEGORIES,
+    MARK_PRICE_FIELD,
+    MARK_PRICE_FIELDS,
+    MARK_PRICE_FLUSH_INTERVAL,
+    MARK_PRICE_REFRESH_INTERVAL,
+    MARK_PRICE_SUBSCRIBE_BATCH_SIZE,
+    InstrumentCategory,
+)
+
+logger = getLogger('main')
+
+
+class MarkPriceIngestor:
+    """
+    Сборщик цен маркировки торгуемых пар Bybit из публичного потока тикеров в Redis.
+
+    На каждую категорию открывается одно соединение WebSocket с подпиской на тикеры всех торгуемых пар.
+    Тикеры приходят до 10 раз в секунду на пару, поэтому цены не пишутся в Redis по одной: обработчик
+    потока только запоминает последнюю цену пары, а `flush` раз в `flush_interval` записывает
+    накопленные цены одним конвейером команд.
+
+    Раз в `refresh_interval` сборщик сверяет номер версии каталога торговых пар (`trading_pair_resolver`)
+    и при его изменении сверяет подписки с каталогом: на новые пары подписывается в открытом соединении,
+    а если пары перестали торговаться - переподключает категорию, потому что pybit не поддерживает отписку.
+
+    Атрибуты:
+        store (MarkPriceStore): Хранилище цен.
+        ws_factory (Callable[[str], BybitWebSocket]): Открывает WebSocket канала категории.
+        flush_interval (float): Интервал записи цен в секундах.
+        refresh_interval (float): Интервал проверки изменений каталога в секундах.
+        categories (tuple[InstrumentCategory, ...]): Категории инструментов.
+        stats (Counter[str]): Количество полученных тикеров (received), записанных цен (written)
+            и записей в Redis (flushes).
+
+    Методы:
+        run(stop: Event) -> None:
+            Собирает цены до установки события `stop`.
+        refresh(force: bool = False) -> bool:
+            Сверяет подписки с каталогом торговых пар, если он изменился.
+        flush() -> int:
+            Записывает накопленные цены в Redis.
+        close() -> None:
+            Закрывает соединения.
+    """
+
+    def __init__(
+        self,
+        store: MarkPriceStore = mark_price_store,
+        ws_factory: Callable[[str], BybitWebSocket] = get_bybit_websocket,
+        flush_interval: float = MARK_PRICE_FLUSH_INTERVAL,
+        refresh_interval: float = MARK_PRICE_REFRESH_INTERVAL,
+        categories: tuple[InstrumentCategory, ...] = MARK_PRICE_CATEGORIES,
+    ) -> None:
+        self.store = store
+        self.ws_factory = ws_factory
+        self.flush_interval = flush_interval
+        self.refresh_interval = refresh_interval
+        self.categories = categories
+        self.stats: Counter[str] = Counter()
+        self._pending: dict[TradingPairKey, tuple[str, int]] = {}
+        self._sockets: dict[str, BybitWebSocket] = {}
+        self._symbols: dict[str, set[str]] = {}
+        self._version: bytes | None = None
+        self._lock = Lock()
+
+    def run(self, stop: Event) -> None:
+        """
+        Собирает цены, пока не установлено событие `stop`, затем закрывает соединения и записывает остаток цен.
+
+        Ошибки проверки каталога записываются в лог и не останавливают сбор цен. Перед проверкой закрываются
+        устаревшие и разорванные соединения с базой данных, как в начале обработки запроса.
+
+        Аргументы:
+            stop (Event): Событие остановки.
+        """
+        next_refresh = monotonic()
+        try:
+            while not stop.is_set():
+                if monotonic() >= next_refresh:
+                    close_old_connections()
+                    try:
+                        self.refresh()
+                    except Exception as error:
+                        logger.error('Не удалось обновить подписки на цены Bybit', exc_info=error)
+                    next_refresh = monotonic() + self.refresh_interval
+                self.flush()
+                stop.wait(self.flush_interval)
+        finally:
+            self.close()
+            self.flush()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Сверяет подписки с каталогом торгуемых пар, если номер версии каталога изменился.
+
+        Аргументы:
+            force (bool): Сверить подписки независимо от номера версии.
+
+        Возвращает:
+            bool: True, если подписки сверялись.
+        """
+        try:
+            version: bytes | None = trading_pair_resolver.get_version()
+        except RedisError:
+            logger.warning('Redis недоступен, подписки на цены Bybit сверяются с каталогом', exc_info=True)
+            version = None
+        if version is not None and version == self._version and not force:
+            return False
+        for category in self.categories:
+            self.subscribe(category, self.get_symbols(category))
+        self._version = version
+        return True
+
+    def get_symbols(self, category: InstrumentCategory) -> set[str]:
+        """Возвращает символы торгуемых пар категории."""
+        trading_pairs = TradingPair.objects.filter(traded=True, market=category.market, exchange=Exchange.BYBIT)
+        if category.quote_coins is not None:
+            trading_pairs = trading_pairs.filter(quote_asset__ticker__in=category.quote_coins)
+        return set(trading_pairs.values_list('symbol', flat=True))
+
+    def subscribe(self, category: InstrumentCategory, symbols: set[str]) -> None:
+        """
+        Подписывает соединение категории на тикеры символов.
+
+        Аргументы:
+            category (InstrumentCategory): Категория инструментов.
+            symbols (set[str]): Символы торгуемых пар категории.
+        """
+        subscribed = self._symbols.get(category.name, set())
+        removed = subscribed - symbols
+        if removed:
+            self.close_socket(category.name)
+            subscribed = set()
+        added = sorted(symbols - subscribed)
+        if not added:
+            return
+        websocket = self._sockets.get(category.name)
+        if websocket is None:
+            websocket = self._sockets[category.name] = self.ws_factory(category.name)
+        callback = partial(self.on_ticker, category)
+        for index in range(0, len(added), MARK_PRICE_SUBSCRIBE_BATCH_SIZE):
+            websocket.ticker_stream(symbol=added[index : index + MARK_PRICE_SUBSCRIBE_BATCH_SIZE], callback=callback)
+        self._symbols[category.name] = symbols
+        logger.info(
+            'Подписки на цены Bybit %s: добавлено %s, удалено %s, всего %s',
+            category.name,
+            len(added),
+            len(removed),
+            len(symbols),
+        )
+
+    def on_ticker(self, category: InstrumentCategory, message: dict[str, Any]) -> None:
+        """Запоминает последнюю цену пары из сообщения потока тикеров, вызывается в потоке WebSocket."""
+        data = message.get('data') or {}
+        price = data.get(MARK_PRICE_FIELDS.get(category.name, MARK_PRICE_FIELD))
+        if not price:
+            return
+        key = (data['symbol'], str(category.market), str(Exchange.BYBIT))
+        with self._lock:
+            self._pending[key] = (price, int(message.get('ts') or time() * 1000))
+            self.stats['received'] += 1
+
+    def flush(self) -> int:
+        """
+        Записывает накопленные цены в Redis.
+
+        Если Redis недоступен, цены возвращаются в накопитель, если за время записи не пришли более новые.
+
+        Возвращает:
+            int: Количество записанных цен.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self.store.set_many(pending)
+        except RedisError:
+            logger.warning('Redis недоступен, цены Bybit будут записаны позже', exc_info=True)
+            with self._lock:
+                self._pending = pending | self._pending
+            return 0
+        with self._lock:
+            self.stats['written'] += len(pending)
+            self.stats['flushes'] += 1
+        return len(pending)
+
+    def close_socket(self, name: str) -> None:
+        websocket = self._sockets.pop(name, None)
+        self._symbols.pop(name, None)
+        if websocket is not None:
+            websocket.exit()
+
+    def close(self) -> None:
+        """Закрывает соединения всех категорий."""
+        for name in list(self._sockets):
+            self.close_socket(name)
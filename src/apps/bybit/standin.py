@@ -0,0 +1,452 @@
+import json
+from base64 import b64encode
+from dataclasses import dataclass, field
+from hashlib import sha1
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import sin
+from pathlib import Path
+from random import Random
+from socket import socket
+from threading import Event, Lock, Thread
+from time import monotonic, sleep, time
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from apps.bybit.constants import INVERSE, LINEAR, OPTION, OPTION_BASE_COINS, SPOT, USD, USDC, USDT
+
+KLINE_INTERVALS = {
+    '1': 60,
+    '3': 180,
+    '5': 300,
+    '15': 900,
+    '30': 1800,
+    '60': 3600,
+    '120': 7200,
+    '240': 14400,
+    '360': 21600,
+    '720': 43200,
+    'D': 86400,
+    'W': 604800,
+}
+
+WEBSOCKET_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+OPCODE_TEXT = 0x1
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+@dataclass
+class StandInConfig:
+    """
+    Настройки сервера-заменителя Bybit.
+
+    Атрибуты:
+        instruments (int): Количество генерируемых инструментов в каждой категории.
+        page_size (int): Максимальный размер страницы списка инструментов, меньший `limit` запроса ограничивает его.
+        latency (float): Задержка ответа в секундах.
+        jitter (float): Случайная добавка к задержке, от 0 до `jitter` секунд.
+        error_rate (float): Доля запросов, на которые возвращается ошибка превышения лимита.
+        error_code (int): 429 - ответ HTTP 429, иначе код ошибки Bybit в теле ответа, например 10006.
+        seed (int): Начальное значение генератора случайных чисел для повторяемых данных.
+        ticker_interval (float): Интервал рассылки обновлений тикеров по WebSocket в секундах.
+        payloads (dict[str, list[dict]]): Записанные инструменты по категориям вместо генерируемых.
+    """
+
+    instruments: int = 500
+    page_size: int = 1000
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_code: int = 10006
+    seed: int = 0
+    ticker_interval: float = 0.1
+    payloads: dict[str, list[dict]] = field(default_factory=dict)
+
+    @classmethod
+    def load_payloads(cls, directory: Path) -> dict[str, list[dict]]:
+        """
+        Загружает записанные инструменты из файлов `<категория>.json` каталога.
+
+        Файл может содержать ответ `instruments-info` целиком или только список инструментов.
+        """
+        payloads = {}
+        for category in (SPOT, LINEAR, INVERSE, OPTION):
+            path = directory / f'{category}.json'
+            if not path.exists():
+                continue
+            data = json.loads(path.read_text())
+            payloads[category] = data['result']['list'] if isinstance(data, dict) else data
+        return payloads
+
+
+class StandInData:
+    """
+    Ответы сервера-заменителя: инструменты, тикеры и свечи.
+
+    Инструменты генерируются один раз на категорию, цены - детерминированно по символу,
+    поэтому повторные запуски с одним `seed` получают одинаковые данные. Опционы генерируются
+    по базовым монетам `OPTION_BASE_COINS` и, как у Bybit, без `baseCoin` отдаются только опционы на BTC.
+    """
+
+    QUOTE_COINS = {SPOT: USDT, LINEAR: USDT, INVERSE: USD, OPTION: USDC}
+    DEFAULT_BASE_COINS = {OPTION: 'BTC'}
+
+    def __init__(self, config: StandInConfig) -> None:
+        self.config = config
+        self._instruments: dict[str, list[dict]] = {}
+        self._lock = Lock()
+
+    def get_instruments(self, category: str) -> list[dict]:
+        with self._lock:
+            if category not in self._instruments:
+                self._instruments[category] = self.config.payloads.get(category) or self.generate_instruments(category)
+            return self._instruments[category]
+
+    def generate_instruments(self, category: str) -> list[dict]:
+        quote_coin = self.QUOTE_COINS.get(category, USDT)
+        instruments = []
+        for index in range(self.config.instruments):
+            base_coin = f'C{index:05d}'
+            symbol = f'{base_coin}{quote_coin}'
+            if category == OPTION:
+                base_coin = OPTION_BASE_COINS[index % len(OPTION_BASE_COINS)]
+                symbol = f'{base_coin}-26DEC25-{1000 + index}-C'
+            instrument: dict[str, Any] = {
+                'symbol': symbol,
+                'baseCoin': base_coin,
+                'quoteCoin': quote_coin,
+                'status': 'Trading',
+                'launchTime': str(1_600_000_000_000 + index * 86_400_000),
+                'priceFilter': {'minPrice': '0.0001', 'maxPrice': '199999.98', 'tickSize': '0.0001'},
+                'lotSizeFilter': {'maxOrderQty': '1000000', 'minOrderQty': '0.1', 'qtyStep': '0.1'},
+            }
+            if category == SPOT:
+                instrument['lotSizeFilter'] = {
+                    'basePrecision': '0.01',
+                    'minOrderQty': '0.01',
+                    'maxOrderQty': '1000000',
+                }
+                del instrument['launchTime']
+            if category in (LINEAR, INVERSE):
+                instrument['contractType'] = 'LinearPerpetual' if category == LINEAR else 'InversePerpetual'
+                instrument['isPreListing'] = False
+                instrument['leverageFilter'] = {'minLeverage': '1', 'maxLeverage': '50.00', 'leverageStep': '0.01'}
+            instruments.append(instrument)
+        return instruments
+
+    def get_price(self, symbol: str, timestamp: float) -> float:
+        """Возвращает цену символа в момент времени: синусоида со случайными для символа уровнем и фазой."""
+        random = Random(f'{self.config.seed}:{symbol}')
+        level, phase = random.uniform(1, 1000), random.uniform(0, 6.28)
+        return level * (1 + 0.05 * sin(timestamp / 3600 + phase))
+
+    def instruments_info(self, params: dict[str, str]) -> dict[str, Any]:
+        category = params.get('category', LINEAR)
+        instruments = self.get_instruments(category)
+        base_coin = params.get('baseCoin') or self.DEFAULT_BASE_COINS.get(category)
+        if base_coin:
+            instruments = [instrument for instrument in instruments if instrument['baseCoin'] == base_coin]
+        if 'symbol' in params:
+            instruments = [instrument for instrument in instruments if instrument['symbol'] == params['symbol']]
+        limit = min(int(params.get('limit') or 500), self.config.page_size)
+        offset = int(params.get('cursor') or 0)
+        page = instruments[offset : offset + limit]
+        next_offset = offset + limit
+        next_page_cursor = str(next_offset) if next_offset < len(instruments) else ''
+        return {'category': category, 'list': page, 'nextPageCursor': next_page_cursor}
+
+    def get_ticker(self, symbol: str, now: float) -> dict[str, str]:
+        """Возвращает тикер символа в момент времени."""
+        price = self.get_price(symbol, now)
+        return {
+            'symbol': symbol,
+            'lastPrice': f'{price:.4f}',
+            'markPrice': f'{price * 1.0001:.4f}',
+            'indexPrice': f'{price * 0.9999:.4f}',
+            'prevPrice24h': f'{self.get_price(symbol, now - 86400):.4f}',
+            'volume24h': '1000000',
+            'turnover24h': f'{price * 1_000_000:.2f}',
+        }
+
+    def tickers(self, params: dict[str, str]) -> dict[str, Any]:
+        category = params.get('category', LINEAR)
+        instruments = self.get_instruments(category)
+        base_coin = params.get('baseCoin') or self.DEFAULT_BASE_COINS.get(category)
+        if base_coin:
+            instruments = [instrument for instrument in instruments if instrument['baseCoin'] == base_coin]
+        if 'symbol' in params:
+            instruments = [instrument for instrument in instruments if instrument['symbol'] == params['symbol']]
+        now = time()
+        return {
+            'category': category,
+            'list': [self.get_ticker(instrument['symbol'], now) for instrument in instruments],
+        }
+
+    def kline(self, params: dict[str, str]) -> dict[str, Any]:
+        category = params.get('category', LINEAR)
+        symbol = params.get('symbol', '')
+        step = KLINE_INTERVALS.get(params.get('interval', '1'), 60)
+        limit = min(int(params.get('limit') or 200), 1000)
+        end = int(params.get('end') or time() * 1000) // 1000 // step * step
+        candles = []
+        for index in range(limit):
+            start = end - index * step
+            open_price, close_price = self.get_price(symbol, start), self.get_price(symbol, start + step)
+            candles.append(
+                [
+                    str(start * 1000),
+                    f'{open_price:.4f}',
+                    f'{max(open_price, close_price) * 1.001:.4f}',
+                    f'{min(open_price, close_price) * 0.999:.4f}',
+                    f'{close_price:.4f}',
+                    '1000',
+                    f'{close_price * 1000:.4f}',
+                ]
+            )
+        return {'category': category, 'symbol': symbol, 'list': candles}
+
+    def server_time(self, params: dict[str, str]) -> dict[str, Any]:
+        now = time()
+        return {'timeSecond': str(int(now)), 'timeNano': str(int(now * 1_000_000_000))}
+
+
+class StandInWebSocket:
+    """
+    Серверная сторона соединения WebSocket (RFC 6455) поверх сокета HTTP-соединения.
+
+    Поддерживаются только нефрагментированные сообщения, этого достаточно для публичных потоков Bybit.
+    """
+
+    def __init__(self, connection: socket) -> None:
+        self.connection = connection
+        self.buffer = b''
+
+    def send(self, payload: bytes, opcode: int = OPCODE_TEXT) -> None:
+        length = len(payload)
+        header = bytes([0x80 | opcode])
+        if length < 126:
+            header += bytes([length])
+        elif length < 65536:
+            header += bytes([126]) + length.to_bytes(2, 'big')
+        else:
+            header += bytes([127]) + length.to_bytes(8, 'big')
+        self.connection.sendall(header + payload)
+
+    def send_json(self, message: dict[str, Any]) -> None:
+        self.send(json.dumps(message, separators=(',', ':')).encode())
+
+    def receive(self, timeout: float) -> list[tuple[int, bytes]]:
+        """
+        Ждет данные не дольше `timeout` секунд и возвращает полученные целиком кадры: код операции и данные.
+
+        Исключения:
+            ConnectionError: Если клиент закрыл соединение.
+        """
+        self.connection.settimeout(max(timeout, 0.001))
+        try:
+            chunk = self.connection.recv(65536)
+        except TimeoutError:
+            chunk = None
+        if chunk == b'':
+            raise ConnectionError('Соединение закрыто клиентом')
+        self.buffer += chunk or b''
+        frames = []
+        while (frame := self.read_frame()) is not None:
+            frames.append(frame)
+        return frames
+
+    def read_frame(self) -> tuple[int, bytes] | None:
+        buffer = self.buffer
+        if len(buffer) < 2:
+            return None
+        opcode, masked, length, offset = buffer[0] & 0x0F, buffer[1] & 0x80, buffer[1] & 0x7F, 2
+        if length >= 126:
+            size = 2 if length == 126 else 8
+            if len(buffer) < offset + size:
+                return None
+            length, offset = int.from_bytes(buffer[offset : offset + size], 'big'), offset + size
+        mask = buffer[offset : offset + 4] if masked else b''
+        offset += len(mask)
+        if len(buffer) < offset + length:
+            return None
+        payload, self.buffer = buffer[offset : offset + length], buffer[offset + length :]
+        if mask:
+            payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+        return opcode, payload
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов сервера-заменителя: публичные методы рынка API Bybit v5 и публичный поток тикеров
+    по WebSocket (`/v5/public/<категория>`).
+    """
+
+    server: 'StandInHTTPServer'
+    protocol_version = 'HTTP/1.1'
+
+    ROUTES = {
+        '/v5/market/instruments-info': StandInData.instruments_info,
+        '/v5/market/tickers': StandInData.tickers,
+        '/v5/market/kline': StandInData.kline,
+        '/v5/market/time': StandInData.server_time,
+    }
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith('/v5/public/') and self.headers.get('Upgrade', '').lower() == 'websocket':
+            self.handle_websocket(url.path.rsplit('/', 1)[-1])
+            return
+        route = self.ROUTES.get(url.path)
+        if route is None:
+            self.send_json({'retCode': 10404, 'retMsg': 'Not found', 'result': {}}, HTTPStatus.NOT_FOUND)
+            return
+        config = self.server.config
+        delay = config.latency + (self.server.random.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            sleep(delay)
+        if config.error_rate and self.server.random.random() < config.error_rate:
+            self.send_rate_limit_error()
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        result = route(self.server.data, params)
+        self.send_json({'retCode': 0, 'retMsg': 'OK', 'result': result, 'retExtInfo': {}, 'time': int(time() * 1000)})
+
+    def handle_websocket(self, category: str) -> None:
+        """
+        Обслуживает соединение WebSocket: подписки на тикеры и их рассылку.
+
+        После подписки на `tickers.<символ>` клиент получает снимок тикера, затем каждые `ticker_interval`
+        секунд - изменения цен (тип delta), как публичный поток Bybit. Тикеры генерируются для любого символа.
+        """
+        accept = b64encode(sha1(f'{self.headers["Sec-WebSocket-Key"]}{WEBSOCKET_GUID}'.encode()).digest()).decode()
+        self.send_response(HTTPStatus.SWITCHING_PROTOCOLS)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', accept)
+        self.end_headers()
+        self.close_connection = True
+        websocket = StandInWebSocket(self.connection)
+        symbols: dict[str, None] = {}
+        interval = self.server.config.ticker_interval
+        next_push = monotonic() + interval
+        try:
+            while not self.server.stopped.is_set():
+                for opcode, payload in websocket.receive(next_push - monotonic()):
+                    if opcode == OPCODE_CLOSE:
+                        websocket.send(payload, OPCODE_CLOSE)
+                        return
+                    if opcode == OPCODE_PING:
+                        websocket.send(payload, OPCODE_PONG)
+                    elif opcode == OPCODE_TEXT:
+                        self.handle_websocket_message(websocket, json.loads(payload), symbols)
+                if monotonic() >= next_push:
+                    now = time()
+                    for symbol in symbols:
+                        ticker = self.server.data.get_ticker(symbol, now)
+                        data = {name: ticker[name] for name in ('symbol', 'lastPrice', 'markPrice', 'indexPrice')}
+                        websocket.send_json(self.get_ticker_message(symbol, 'delta', data, now))
+                    next_push = monotonic() + interval
+        except OSError:
+            return
+
+    def handle_websocket_message(
+        self, websocket: StandInWebSocket, message: dict[str, Any], symbols: dict[str, None]
+    ) -> None:
+        """Отвечает на ping, подписку и отписку клиента и отправляет снимки тикеров новых подписок."""
+        op = message.get('op')
+        if op == 'ping':
+            websocket.send_json({'success': True, 'ret_msg': 'pong', 'conn_id': 'standin', 'op': 'ping'})
+            return
+        if op not in ('subscribe', 'unsubscribe'):
+            return
+        topics = [topic.removeprefix('tickers.') for topic in message.get('args', []) if topic.startswith('tickers.')]
+        websocket.send_json(
+            {'success': True, 'ret_msg': '', 'conn_id': 'standin', 'req_id': message.get('req_id', ''), 'op': op}
+        )
+        now = time()
+        for symbol in topics:
+            if op == 'unsubscribe':
+                symbols.pop(symbol, None)
+            elif symbol not in symbols:
+                symbols[symbol] = None
+                websocket.send_json(
+                    self.get_ticker_message(symbol, 'snapshot', self.server.data.get_ticker(symbol, now), now)
+                )
+
+    def get_ticker_message(self, symbol: str, type: str, data: dict[str, str], now: float) -> dict[str, Any]:
+        return {'topic': f'tickers.{symbol}', 'type': type, 'data': data, 'cs': 1, 'ts': int(now * 1000)}
+
+    def send_rate_limit_error(self) -> None:
+        reset_timestamp = str(int(time() * 1000) + 100)
+        if self.server.config.error_code == HTTPStatus.TOO_MANY_REQUESTS:
+            self.send_json({}, HTTPStatus.TOO_MANY_REQUESTS, {'X-Bapi-Limit-Reset-Timestamp': reset_timestamp})
+            return
+        body = {'retCode': self.server.config.error_code, 'retMsg': 'Too many visits!', 'result': {}}
+        self.send_json(body, headers={'X-Bapi-Limit-Reset-Timestamp': reset_timestamp})
+
+    def send_json(
+        self, body: dict[str, Any], status: HTTPStatus = HTTPStatus.OK, headers: dict[str, str] | None = None
+    ) -> None:
+        content = json.dumps(body, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    """
+    Локальный HTTP-сервер, заменяющий публичное API Bybit для нагрузочных тестов без обращения к бирже.
+
+    Отдает сгенерированные или записанные инструменты (с постраничной выдачей по курсору), тикеры и свечи
+    с настраиваемой задержкой, размером страницы и долей ошибок превышения лимита (см. `StandInConfig`).
+    Соединения keep-alive поддерживаются, как и у Bybit. По тому же адресу доступен публичный поток тикеров
+    по WebSocket (см. `BybitWebSocket`).
+
+    Пример:
+        with StandInHTTPServer(StandInConfig(latency=0.05)) as server, bybit_clients.override(server.url, None):
+            InstrumentsGetter()()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, config: StandInConfig | None = None, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.config = config or StandInConfig()
+        self.data = StandInData(self.config)
+        self.random = Random(self.config.seed)
+        self.stopped = Event()
+        super().__init__((host, port), StandInRequestHandler)
+        self._thread: Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host!s}:{port}'
+
+    def start(self) -> None:
+        """Запускает сервер в фоновом потоке."""
+        self._thread = Thread(target=self.serve_forever, name='bybit-standin', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Останавливает сервер, закрывает сокет и соединения WebSocket."""
+        self.stopped.set()
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'StandInHTTPServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
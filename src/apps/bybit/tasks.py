@@ -1,7 +1,34 @@
-from bybit.services.celery import LinearUSDTGetter
+from logging import getLogger
+from time import time
+from typing import Any
+
+from celery import chord
 
 from tradi.celery import celery_app
 
+from apps.bybit.constants import TRADES_SYNC_CONCURRENCY, TRADES_SYNC_LOCK_NAME
+from apps.bybit.services.celery import (
+    InstrumentsGetter,
+    LinearUSDTGetter,
+    TradesShardImporter,
+    get_access_shards,
+    summarize_trades_sync,
+    trades_sync_lock,
+)
+
+logger = getLogger('main')
+
+
+@celery_app.task
+def get_current_instruments() -> dict[str, dict[str, int]]:
+    """
+    Синхронизирует каталог инструментов Bybit по всем категориям: спот, линейные и обратные контракты, опционы.
+    Создает недостающие активы и торговые пары, возвращает в торговлю снова появившиеся пары
+    и снимает с торгов пары, которых больше нет на бирже.
+    Возвращает количество созданных, возвращенных в торговлю и снятых с торгов пар по категориям.
+    """
+    return InstrumentsGetter()()
+
 
 @celery_app.task
 def get_current_usdt_linear_instruments() -> None:
@@ -11,3 +38,62 @@ def get_current_usdt_linear_instruments() -> None:
     Если какие фьючерсы перестают обслуживаться, то удаляет из базы.
     """
     LinearUSDTGetter()()
+
+
+@celery_app.task
+def import_bybit_trades(access_id: int) -> dict[str, int]:
+    """
+    Импортирует новые сделки пользователя с Bybit в позиции по его ключу API.
+    Загружает только исполнения и закрытые позиции после прошлого импорта, открытые позиции - если были сделки.
+    Возвращает количество созданных, обновленных, закрытых и пропущенных позиций,
+    для отключенного или удаленного доступа и доступа, который уже импортируется, - пустой словарь.
+    """
+    return TradesShardImporter([access_id]).import_access(access_id).result
+
+
+@celery_app.task
+def sync_bybit_trades() -> dict[str, int]:
+    """
+    Запускает импорт сделок всех активных доступов к Bybit.
+    Доступы делятся на шарды по числу одновременно выполняемых задач (`BYBIT_TRADES_SYNC_CONCURRENCY`),
+    каждый шард импортируется отдельной задачей, итоги сводит задача `summarize_bybit_trades_sync`.
+    Запуск выполняется под блокировкой в Redis, которую освобождает задача сводки: если предыдущий запуск
+    еще выполняется, новый не запускается. Доступ, который еще импортируется другой задачей, пропускается.
+    Возвращает количество доступов и шардов.
+    """
+    token = trades_sync_lock.acquire(TRADES_SYNC_LOCK_NAME)
+    if token is None:
+        logger.info('Предыдущий запуск импорта сделок Bybit еще выполняется')
+        return {'accounts': 0, 'shards': 0}
+    shards = get_access_shards(TRADES_SYNC_CONCURRENCY)
+    if not shards:
+        trades_sync_lock.release(TRADES_SYNC_LOCK_NAME, token)
+        return {'accounts': 0, 'shards': 0}
+    header = [import_bybit_trades_shard.s(shard) for shard in shards]
+    chord(header)(summarize_bybit_trades_sync.s(started_at=time(), lock_token=token))
+    return {'accounts': sum(len(shard) for shard in shards), 'shards': len(shards)}
+
+
+@celery_app.task
+def import_bybit_trades_shard(access_ids: list[int]) -> list[dict[str, Any]]:
+    """
+    Последовательно импортирует сделки доступов шарда, каждый под блокировкой в Redis.
+    Возвращает итоги по доступам: статус, длительность, итог импорта и ошибку.
+    """
+    return TradesShardImporter(access_ids)()
+
+
+@celery_app.task
+def summarize_bybit_trades_sync(
+    shards: list[list[dict[str, Any]]], started_at: float, lock_token: str | None = None
+) -> dict[str, Any]:
+    """
+    Сводит итоги шардов запуска импорта сделок: длительность, количество импортированных, пропущенных
+    и неудачных доступов, длительность импорта доступа и первые ошибки. Пишет сводку в лог.
+    Освобождает блокировку запуска по токену `lock_token`.
+    """
+    try:
+        return summarize_trades_sync(shards, started_at)
+    finally:
+        if lock_token is not None:
+            trades_sync_lock.release(TRADES_SYNC_LOCK_NAME, lock_token)
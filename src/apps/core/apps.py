@@ -5,3 +5,6 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     verbose_name = 'Ядро приложения'
+
+    def ready(self) -> None:
+        from apps.core.signals import tasks  # noqa: F401
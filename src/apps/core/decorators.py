@@ -1,6 +1,10 @@
+from functools import wraps
 from typing import Any, Callable, Optional, Type, TypeVar
 
+from django.db import transaction
+from django.http import HttpRequest
 from django.utils.decorators import method_decorator
+from rest_framework.permissions import SAFE_METHODS
 
 T = TypeVar('T', bound=type)
 
@@ -22,6 +26,39 @@ def apply_viewset_schema(schema_cls: Type[Any]) -> Callable[[T], T]:
                 original: Callable[..., Any] = getattr(view_cls, method_name)
                 decorated = method_decorator(schema_method)(original)
                 setattr(view_cls, method_name, decorated)
+        for extra_action in getattr(view_cls, 'get_extra_actions', list)():
+            schema_method = getattr(schema_cls, extra_action.__name__, None)
+            if schema_method:
+                setattr(view_cls, extra_action.__name__, schema_method(extra_action))
         return view_cls
 
     return decorator
+
+
+def non_atomic_reads(view_cls: T) -> T:
+    """
+    Выполняет читающие запросы к набору представлений без транзакции, несмотря на `ATOMIC_REQUESTS`.
+
+    `ATOMIC_REQUESTS` оборачивает в транзакцию весь вызов представления, а маршрутизатор DRF создает одно
+    представление на список и создание (и одно на чтение, изменение и удаление объекта), поэтому транзакцию
+    нельзя отключить только для GET. Декоратор отключает транзакцию запроса для всего набора представлений
+    и оборачивает в транзакцию `dispatch` запросов с методами, кроме GET, HEAD и OPTIONS, поэтому изменяющие
+    действия, в том числе откат при ошибке в обработчике исключений DRF, работают как раньше. Читающие
+    действия выполняют запросы в режиме автокоммита и не держат транзакцию открытой во время сериализации.
+    """
+    as_view = getattr(view_cls, 'as_view').__func__
+    dispatch = getattr(view_cls, 'dispatch')
+
+    def non_atomic_as_view(cls: type, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        return transaction.non_atomic_requests(as_view(cls, *args, **kwargs))
+
+    @wraps(dispatch)
+    def atomic_write_dispatch(self: Any, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        if request.method in SAFE_METHODS:
+            return dispatch(self, request, *args, **kwargs)
+        with transaction.atomic():
+            return dispatch(self, request, *args, **kwargs)
+
+    setattr(view_cls, 'as_view', classmethod(non_atomic_as_view))
+    setattr(view_cls, 'dispatch', atomic_write_dispatch)
+    return view_cls
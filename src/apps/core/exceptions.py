@@ -3,3 +3,10 @@ class NotImplementedMethodError(NotImplementedError):
         self.class_name = class_name
         self.method_name = method_name
         super().__init__(f'Метод {method_name} класса {class_name} не реализован')
+
+
+class RateLimitTimeoutError(Exception):
+    def __init__(self, key: str, wait: float) -> None:
+        self.key = key
+        self.wait = wait
+        super().__init__(f'Ожидание токена ограничителя {key} превысило бы допустимое: {wait:.2f} с')
@@ -25,5 +25,20 @@ class FilterSet(filters.FilterSet):
                     serializer_field_class = serializers.FloatField
                 elif isinstance(django_field, filters.DateFilter.field_class):
                     serializer_field_class = serializers.DateField
+                elif isinstance(django_field, filters.DateTimeFilter.field_class):
+                    serializer_field_class = serializers.DateTimeField
             fields[name] = serializer_field_class(required=False)
         return type(f'{cls.__name__}SwaggerSerializer', (serializers.Serializer,), fields)
+
+
+class ModifiedSinceFilterSet(FilterSet):
+    """
+    Фильтр с параметром `modified_since` для инкрементальной синхронизации.
+
+    Возвращает объекты, измененные начиная с указанного времени (включительно), по полю `modified_at`.
+    """
+
+    modified_since = filters.IsoDateTimeFilter(field_name='modified_at', lookup_expr='gte')
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from logging import getLogger
+from threading import Event, Thread
+from typing import Any, Callable, Iterator, cast
+from uuid import uuid4
+
+from redis import Redis, RedisError, WatchError
+from redis.client import Pipeline
+
+logger = getLogger('main')
+
+
+class RedisLock:
+    """
+    Неблокирующие блокировки по ключу, общие для всех процессов через Redis.
+
+    Блокировка захватывается командой `SET NX` со сроком жизни, поэтому блокировка упавшего процесса
+    освобождается сама через `timeout` секунд. Значение ключа - случайный токен владельца: освобождение
+    оптимистичной транзакцией (WATCH/MULTI) удаляет ключ, только если он все еще принадлежит владельцу,
+    и не снимает блокировку, захваченную другим процессом после истечения срока. Блокировку долгой операции
+    можно продлевать из фонового потока, чтобы она не истекла, пока владелец жив.
+
+    Атрибуты:
+        redis (Redis): Клиент Redis.
+        key (str): Шаблон ключа блокировки с полем `{name}`.
+        timeout (int): Срок жизни блокировки в секундах.
+
+    Методы:
+        acquire(name: str) -> str | None:
+            Захватывает блокировку и возвращает токен владельца или None, если она занята.
+        release(name: str, token: str) -> bool:
+            Освобождает блокировку, если она принадлежит владельцу токена.
+        extend(name: str, token: str) -> bool:
+            Продлевает блокировку на `timeout` секунд, если она принадлежит владельцу токена.
+        hold(name: str, renew: bool = False) -> Iterator[bool]:
+            Удерживает блокировку на время блока, если ее удалось захватить.
+    """
+
+    def __init__(self, redis: Redis, key: str, timeout: int) -> None:
+        self.redis = redis
+        self.key = key
+        self.timeout = timeout
+
+    def get_key(self, name: str) -> str:
+        return self.key.format(name=name)
+
+    def acquire(self, name: str) -> str | None:
+        """
+        Захватывает блокировку без ожидания.
+
+        Аргументы:
+            name (str): Имя блокировки, например идентификатор объекта.
+
+        Возвращает:
+            str | None: Токен владельца или None, если блокировка занята.
+        """
+        token = uuid4().hex
+        if self.redis.set(self.get_key(name), token, nx=True, ex=self.timeout):
+            return token
+        return None
+
+    def release(self, name: str, token: str) -> bool:
+        """
+        Освобождает блокировку, если она принадлежит владельцу токена.
+
+        Аргументы:
+            name (str): Имя блокировки.
+            token (str): Токен, полученный при захвате.
+
+        Возвращает:
+            bool: True, если блокировка освобождена, False, если она истекла или принадлежит другому владельцу.
+        """
+        return self.execute_if_owner(name, token, lambda pipe, key: pipe.delete(key))
+
+    def extend(self, name: str, token: str) -> bool:
+        """
+        Продлевает блокировку на `timeout` секунд, если она принадлежит владельцу токена.
+
+        Аргументы:
+            name (str): Имя блокировки.
+            token (str): Токен, полученный при захвате.
+
+        Возвращает:
+            bool: True, если блокировка продлена, False, если она истекла или принадлежит другому владельцу.
+        """
+        return self.execute_if_owner(name, token, lambda pipe, key: pipe.expire(key, self.timeout))
+
+    def execute_if_owner(self, name: str, token: str, command: Callable[[Pipeline, str], Any]) -> bool:
+        """Выполняет команду над ключом блокировки в транзакции, если блокировка принадлежит владельцу токена."""
+        key = self.get_key(name)
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    value = cast(bytes | None, pipe.get(key))
+                    if value is None or value.decode() != token:
+                        pipe.unwatch()
+                        return False
+                    pipe.multi()
+                    command(pipe, key)
+                    pipe.execute()
+                    return True
+                except WatchError:
+                    continue
+
+    def renew(self, name: str, token: str, stop: Event) -> None:
+        """Продлевает блокировку каждую треть срока, пока не установлено `stop` или блокировка не потеряна."""
+        while not stop.wait(self.timeout / 3):
+            try:
+                if not self.extend(name, token):
+                    logger.warning('Блокировка %s истекла до окончания операции', self.get_key(name))
+                    return
+            except RedisError:
+                logger.warning('Не удалось продлить блокировку %s', self.get_key(name), exc_info=True)
+
+    @contextmanager
+    def hold(self, name: str, renew: bool = False) -> Iterator[bool]:
+        """
+        Захватывает блокировку на время блока.
+
+        Если `renew`, блокировка продлевается фоновым потоком, пока выполняется блок, поэтому операция
+        может длиться дольше `timeout`, а блокировка упавшего процесса все равно истекает через `timeout`.
+
+        Пример:
+            with lock.hold(str(access_id)) as acquired:
+                if not acquired:
+                    return
+
+        Аргументы:
+            name (str): Имя блокировки.
+            renew (bool): Продлевать блокировку, пока выполняется блок.
+
+        Возвращает:
+            Iterator[bool]: True, если блокировка захвачена, False, если она занята.
+        """
+        token = self.acquire(name)
+        stop = Event()
+        if token is not None and renew:
+            Thread(target=self.renew, args=(name, token, stop), name='redis-lock-renew', daemon=True).start()
+        try:
+            yield token is not None
+        finally:
+            stop.set()
+            if token is not None:
+                self.release(name, token)
@@ -0,0 +1,254 @@
+import json
+from logging import getLogger
+from math import inf
+from os import getpid, register_at_fork
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, TypeVar, cast
+
+from django.conf import settings
+
+from redis import Redis, RedisError
+
+from tradi.redis import redis_client
+
+logger = getLogger('main')
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Суффиксы имен значений метрик в порядке вывода.
+SAMPLE_SUFFIXES = ('_bucket', '_sum', '_count', '')
+
+
+class Metric:
+    """
+    Метрика с именованными метками.
+
+    Атрибуты:
+        registry (MetricsRegistry): Реестр, в который записываются значения.
+        name (str): Имя метрики.
+        documentation (str): Описание метрики.
+        labelnames (tuple[str, ...]): Имена меток.
+    """
+
+    TYPE: str
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, documentation: str, labelnames: tuple[str, ...]) -> None:
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def get_label_values(self, labels: dict[str, Any]) -> list[str]:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f'Метрика {self.name} ожидает метки {self.labelnames}, получены {tuple(labels)}')
+        return [str(labels[name]) for name in self.labelnames]
+
+
+class Counter(Metric):
+    """Счетчик, значение которого только растет. Имя счетчика по соглашению Prometheus оканчивается на `_total`."""
+
+    TYPE = 'counter'
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        """Увеличивает счетчик с метками `labels` на `amount`."""
+        self.registry.add(self, ('', *self.get_label_values(labels)), amount)
+
+
+class Histogram(Metric):
+    """
+    Гистограмма: количество наблюдений не больше каждой границы, сумма и количество наблюдений.
+
+    Атрибуты:
+        buckets (tuple[float, ...]): Границы корзин по возрастанию, корзина `+Inf` добавляется всегда.
+    """
+
+    TYPE = 'histogram'
+
+    def __init__(
+        self,
+        registry: 'MetricsRegistry',
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Добавляет наблюдение `value` с метками `labels`."""
+        label_values = self.get_label_values(labels)
+        for bound in self.buckets:
+            if value <= bound:
+                self.registry.add(self, ('_bucket', *label_values, format_value(bound)), 1)
+        self.registry.add(self, ('_bucket', *label_values, '+Inf'), 1)
+        self.registry.add(self, ('_sum', *label_values), value)
+        self.registry.add(self, ('_count', *label_values), 1)
+
+
+def format_value(value: float) -> str:
+    if value == inf:
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+MetricT = TypeVar('MetricT', bound=Metric)
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик, общий для всех процессов через Redis.
+
+    Значения метрик копятся в памяти процесса и раз в `flush_interval` прибавляются к значениям в Redis одним
+    конвейером команд `HINCRBYFLOAT` из фонового потока, поэтому запись значения не обращается к Redis,
+    а значения всех процессов gunicorn и Celery складываются. Поток запускается при первой записи в каждом
+    процессе, в том числе в процессах, созданных fork. Каждая метрика хранится в отдельном хеше: поле - тип
+    значения и метки, значение - сумма. Описания метрик хранятся в хеше `META_KEY`, поэтому `collect`
+    отдает метрики всех процессов, даже если модули, которые их записывают, в текущем процессе не загружены.
+
+    Если Redis недоступен, значения остаются в памяти до следующей записи.
+
+    Атрибуты:
+        redis (Redis): Клиент Redis.
+        flush_interval (float): Интервал записи значений в Redis в секундах.
+        enabled (bool): Записываются ли значения метрик.
+
+    Методы:
+        counter(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+            Создает счетчик.
+        histogram(
+            name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS
+        ) -> Histogram:
+            Создает гистограмму.
+        flush() -> int:
+            Записывает накопленные значения в Redis.
+        collect() -> str:
+            Возвращает значения метрик в текстовом формате Prometheus.
+    """
+
+    KEY = 'core:metrics:{name}'
+    META_KEY = 'core:metrics'
+
+    def __init__(self, redis: Redis, flush_interval: float = 5, enabled: bool = True) -> None:
+        self.redis = redis
+        self.flush_interval = flush_interval
+        self.enabled = enabled
+        self.metrics: dict[str, Metric] = {}
+        self._pending: dict[tuple[str, tuple[str, ...]], float] = {}
+        self._lock = Lock()
+        self._pid: int | None = None
+        register_at_fork(after_in_child=self.reset)
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def register(self, metric: MetricT) -> MetricT:
+        if metric.name in self.metrics:
+            raise ValueError(f'Метрика {metric.name} уже зарегистрирована')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add(self, metric: Metric, field: tuple[str, ...], amount: float) -> None:
+        """Прибавляет `amount` к значению поля метрики в памяти процесса."""
+        if not self.enabled:
+            return
+        if self._pid != getpid():
+            self.start()
+        key = (metric.name, field)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+
+    def start(self) -> None:
+        """Запускает фоновую запись значений в текущем процессе."""
+        with self._lock:
+            if self._pid == getpid():
+                return
+            self._pid = getpid()
+        Thread(target=self.run, name='metrics-flush', daemon=True).start()
+
+    def reset(self) -> None:
+        """Сбрасывает состояние процесса после fork: значения родителя записывает родитель, поток не копируется."""
+        self._lock = Lock()
+        self._pending = {}
+        self._pid = None
+
+    def run(self) -> None:
+        while True:
+            sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Прибавляет накопленные значения к значениям в Redis.
+
+        Возвращает:
+            int: Количество записанных значений.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            with self.redis.pipeline(transaction=False) as pipe:
+                for name in {name for name, _ in pending}:
+                    metric = self.metrics[name]
+                    meta = {'type': metric.TYPE, 'help': metric.documentation, 'labels': metric.labelnames}
+                    pipe.hset(self.META_KEY, name, json.dumps(meta, ensure_ascii=False))
+                for (name, field), amount in pending.items():
+                    pipe.hincrbyfloat(self.KEY.format(name=name), json.dumps(field, ensure_ascii=False), amount)
+                pipe.execute()
+        except RedisError:
+            logger.warning('Redis недоступен, метрики будут записаны позже', exc_info=True)
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            return 0
+        return len(pending)
+
+    def collect(self) -> str:
+        """Возвращает значения метрик всех процессов в текстовом формате Prometheus."""
+        meta = cast(dict[bytes, bytes], self.redis.hgetall(self.META_KEY))
+        names = sorted(name.decode() for name in meta)
+        with self.redis.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.hgetall(self.KEY.format(name=name))
+            values = cast(list[dict[bytes, bytes]], pipe.execute())
+        lines = []
+        for name, metric_values in zip(names, values):
+            metric_meta = json.loads(meta[name.encode()])
+            labelnames = metric_meta['labels']
+            lines.append(f'# HELP {name} {metric_meta["help"]}')
+            lines.append(f'# TYPE {name} {metric_meta["type"]}')
+            samples = []
+            for field, value in metric_values.items():
+                suffix, *label_values = json.loads(field)
+                bucket = suffix == '_bucket'
+                labels = ','.join(
+                    f'{label}="{escape_label_value(label_value)}"'
+                    for label, label_value in zip([*labelnames, 'le'] if bucket else labelnames, label_values)
+                )
+                order = (
+                    label_values[: len(labelnames)],
+                    SAMPLE_SUFFIXES.index(suffix),
+                    float(label_values[-1]) if bucket else 0,
+                )
+                sample_name = f'{name}{suffix}{{{labels}}}' if labels else f'{name}{suffix}'
+                samples.append((order, f'{sample_name} {format_value(float(value))}'))
+            lines.extend(sample for _, sample in sorted(samples))
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry(redis_client, settings.METRICS_FLUSH_INTERVAL, bool(settings.METRICS))
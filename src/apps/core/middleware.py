@@ -0,0 +1,226 @@
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from logging import getLogger
+from time import perf_counter
+from traceback import extract_stack
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from rest_framework import serializers
+
+from apps.core.metrics import metrics_registry
+
+logger = getLogger('main')
+
+UNKNOWN_CALL_SITE = 'неизвестно'
+UNMATCHED_ROUTE = '<unmatched>'
+
+http_request_duration = metrics_registry.histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запросов.',
+    ('method', 'route', 'status'),
+)
+
+
+@dataclass
+class RequestProfile:
+    """
+    Затраты на обработку одного запроса.
+
+    Атрибуты:
+        repeated_threshold (int): Количество одинаковых SQL-запросов, после которого они считаются вероятным N+1.
+        started_at (float): Время начала обработки по `perf_counter`.
+        total_time (float): Время обработки запроса в секундах.
+        view_started_at (float | None): Время вызова представления или None, если представление не вызывалось.
+        view_time (float | None): Время от вызова представления до возврата ответа, включая рендеринг, в секундах.
+        serializer_time (float): Время получения данных сериализаторов в секундах.
+        queries (int): Количество SQL-запросов.
+        db_time (float): Время выполнения SQL-запросов в секундах.
+        shapes (Counter[str]): Количество SQL-запросов каждого вида (текста запроса без параметров).
+        call_sites (dict[str, str]): Место в коде, где вид запроса повторился `repeated_threshold` раз.
+        serializing (bool): Выполняется учитываемое получение данных сериализатора.
+
+    Методы:
+        execute(execute, sql, params, many, context) -> Any:
+            Обертка выполнения SQL-запроса (`connection.execute_wrapper`).
+        get_repeated_queries() -> dict[str, int]:
+            Возвращает виды SQL-запросов, повторившиеся не меньше `repeated_threshold` раз.
+        get_server_timing() -> str:
+            Возвращает значение заголовка `Server-Timing`.
+    """
+
+    repeated_threshold: int
+    started_at: float = field(default_factory=perf_counter)
+    total_time: float = 0
+    view_started_at: float | None = None
+    view_time: float | None = None
+    serializer_time: float = 0
+    queries: int = 0
+    db_time: float = 0
+    shapes: Counter[str] = field(default_factory=Counter)
+    call_sites: dict[str, str] = field(default_factory=dict)
+    serializing: bool = False
+
+    def execute(self, execute: Callable[..., Any], sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:
+        started_at = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started_at
+            self.queries += 1
+            self.shapes[sql] += 1
+            if self.shapes[sql] == self.repeated_threshold:
+                self.call_sites[sql] = get_call_site()
+
+    def finish(self) -> None:
+        finished_at = perf_counter()
+        self.total_time = finished_at - self.started_at
+        if self.view_started_at is not None:
+            self.view_time = finished_at - self.view_started_at
+
+    def get_repeated_queries(self) -> dict[str, int]:
+        return {sql: self.shapes[sql] for sql in self.call_sites}
+
+    def get_server_timing(self) -> str:
+        metrics = [
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'serializer;dur={self.serializer_time * 1000:.1f}',
+        ]
+        if self.view_time is not None:
+            metrics.append(f'view;dur={self.view_time * 1000:.1f}')
+        metrics.append(f'total;dur={self.total_time * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar('current_profile', default=None)
+
+
+def get_call_site() -> str:
+    """Возвращает ближайший к вызову кадр стека в коде проекта, кроме этого модуля."""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(extract_stack()):
+        if frame.filename.startswith(base_dir) and frame.filename != __file__:
+            return f'{frame.filename.removeprefix(base_dir).lstrip("/")}:{frame.lineno} in {frame.name}'
+    return UNKNOWN_CALL_SITE
+
+
+def profile_serializer_data(get_data: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    """Добавляет учет времени в получение данных сериализатора, вложенные получения не учитываются повторно."""
+
+    @wraps(get_data)
+    def get_profiled_data(serializer: Any) -> Any:
+        profile = current_profile.get()
+        if profile is None or profile.serializing:
+            return get_data(serializer)
+        profile.serializing = True
+        started_at = perf_counter()
+        try:
+            return get_data(serializer)
+        finally:
+            profile.serializer_time += perf_counter() - started_at
+            profile.serializing = False
+
+    get_profiled_data.profiled = True  # type: ignore[attr-defined]
+    return get_profiled_data
+
+
+def instrument_serializers() -> None:
+    """Добавляет учет времени сериализации в свойство `data` сериализаторов DRF, если он еще не добавлен."""
+    for serializer_class in (serializers.Serializer, serializers.ListSerializer):
+        data = serializer_class.__dict__['data']
+        if not getattr(data.fget, 'profiled', False):
+            setattr(serializer_class, 'data', property(profile_serializer_data(data.fget)))
+
+
+class RequestProfilingMiddleware:
+    """
+    Профилирование запросов: количество и время SQL-запросов, время сериализации и представления.
+
+    Затраты запроса возвращаются в заголовке `Server-Timing`. Запросы дольше `slow_ms`, с количеством
+    SQL-запросов больше `max_queries` или с SQL-запросами одного вида, повторенными не меньше
+    `repeated_threshold` раз (вероятный N+1), записываются в лог с местом в коде, где запрос повторился.
+
+    Включается настройкой `REQUEST_PROFILING`. Если она выключена, Django исключает middleware из цепочки
+    обработки при загрузке, поэтому профилирование ничего не стоит. Middleware должен быть первым
+    в `MIDDLEWARE`, чтобы учитывать SQL-запросы остальных middleware.
+
+    Атрибуты:
+        slow_ms (float): Время обработки запроса в миллисекундах, после которого запрос записывается в лог.
+        max_queries (int): Количество SQL-запросов, после которого запрос записывается в лог.
+        repeated_threshold (int): Количество одинаковых SQL-запросов, после которого они считаются вероятным N+1.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms: float = settings.REQUEST_PROFILING_SLOW_MS
+        self.max_queries: int = settings.REQUEST_PROFILING_MAX_QUERIES
+        self.repeated_threshold: int = settings.REQUEST_PROFILING_REPEATED_QUERIES
+        instrument_serializers()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        profile = RequestProfile(self.repeated_threshold)
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute))
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+        profile.finish()
+        response['Server-Timing'] = profile.get_server_timing()
+        self.log(request, profile)
+        return response
+
+    def process_view(self, request: HttpRequest, *args: Any) -> None:
+        profile = current_profile.get()
+        if profile is not None:
+            profile.view_started_at = perf_counter()
+
+    def log(self, request: HttpRequest, profile: RequestProfile) -> None:
+        """Записывает в лог затраты медленного запроса или запроса с вероятным N+1."""
+        repeated_queries = profile.get_repeated_queries()
+        if profile.total_time * 1000 < self.slow_ms and profile.queries <= self.max_queries and not repeated_queries:
+            return
+        lines = [
+            f'Запрос {request.method} {request.get_full_path()}: {profile.total_time * 1000:.1f} мс, '
+            f'SQL-запросов {profile.queries} ({profile.db_time * 1000:.1f} мс), '
+            f'сериализация {profile.serializer_time * 1000:.1f} мс'
+        ]
+        for sql, count in repeated_queries.items():
+            lines.append(f'Вероятно N+1, повторов {count}, {profile.call_sites[sql]}: {sql}')
+        logger.warning('\n'.join(lines))
+
+
+class MetricsMiddleware:
+    """
+    Время обработки и количество запросов по маршрутам в метрике `http_request_duration_seconds`.
+
+    Маршрут - имя представления (`api:v1:accounting:position-list`), поэтому метки не зависят от параметров пути.
+    Если метрики выключены настройкой `METRICS`, Django исключает middleware из цепочки обработки.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        if not metrics_registry.enabled:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        started_at = perf_counter()
+        response = self.get_response(request)
+        resolver_match = getattr(request, 'resolver_match', None)
+        http_request_duration.observe(
+            perf_counter() - started_at,
+            method=request.method,
+            route=resolver_match.view_name if resolver_match is not None else UNMATCHED_ROUTE,
+            status=response.status_code,
+        )
+        return response
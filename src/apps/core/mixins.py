@@ -0,0 +1,213 @@
+from datetime import datetime, timedelta
+from hashlib import md5
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Count, Max, Q, QuerySet
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.core.paginators import KeysetPagination
+
+
+class KeysetPaginationMixin:
+    """
+    Позволяет клиенту переключить список на постраничную навигацию по ключу.
+
+    По умолчанию используется `pagination_class` представления (навигация по номеру страницы).
+    Навигация по ключу включается параметром `?pagination=cursor` для первой страницы,
+    ссылки `next` и `previous` содержат параметр курсора и остаются в этом режиме.
+    В этом режиме сортировка набора данных заменяется на `keyset_ordering`.
+
+    Атрибуты:
+        keyset_pagination_class (type[KeysetPagination]): Класс пагинатора для навигации по ключу.
+        keyset_ordering (tuple[str, ...]): Поля сортировки для навигации по ключу.
+    """
+
+    keyset_pagination_class: type[KeysetPagination] = KeysetPagination
+    keyset_ordering: tuple[str, ...] = ('-id',)
+    pagination_mode_query_param = 'pagination'
+    keyset_pagination_mode = 'cursor'
+
+    request: Any
+    pagination_class: type[BasePagination] | None
+
+    def use_keyset_pagination(self) -> bool:
+        query_params = getattr(self.request, 'query_params', {})
+        if query_params.get(self.pagination_mode_query_param) == self.keyset_pagination_mode:
+            return True
+        return self.keyset_pagination_class.cursor_query_param in query_params
+
+    @property
+    def paginator(self) -> BasePagination | None:
+        if not hasattr(self, '_paginator'):
+            if self.request is not None and self.use_keyset_pagination():
+                self._paginator: BasePagination | None = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+
+class ConditionalGetMixin:
+    """
+    Поддержка условных GET-запросов (ETag / Last-Modified) для `list` и `retrieve`.
+
+    Перед выполнением действия считается валидатор: максимальные даты изменения и количество строк
+    отфильтрованного набора данных, а также параметры запроса, действие и пользователь. Даты и количества
+    считаются одним агрегирующим запросом, но с соединением таблиц `conditional_modified_fields`,
+    поэтому для наборов со связанными объектами он не бесплатен. Если клиент прислал совпадающий
+    `If-None-Match` или `If-Modified-Since`, возвращается 304 Not Modified без выборки объектов и без сериализации.
+
+    Last-Modified отдается только для действий `conditional_last_modified_actions` (по умолчанию `retrieve`).
+    Удаление объекта из списка или выход строки из фильтра не меняют максимальную дату изменения оставшихся
+    строк, поэтому для списков дата изменения не годится как валидатор: это замечает только ETag, в который
+    входит количество строк.
+
+    Атрибуты:
+        conditional_modified_fields (tuple[str, ...]): Поля с датой изменения, по которым строится валидатор.
+            Для вложенных в ответ связанных объектов указываются их поля, например `comments__modified_at`.
+        conditional_count_fields (tuple[str, ...]): Поля, количество значений которых входит в валидатор.
+            Позволяет заметить удаление объектов, которое не меняет максимальную дату изменения.
+        conditional_volatile_filter (Q | None): Условие на объекты, представление которых зависит не только
+            от базы данных, например от текущих цен. Если такие объекты есть в наборе данных, в ETag входит
+            `get_conditional_volatile_version()`, а Last-Modified не отдается. Количество таких объектов
+            считается тем же агрегирующим запросом.
+        conditional_last_modified_actions (tuple[str, ...]): Действия, для которых отдается Last-Modified.
+    """
+
+    conditional_modified_fields: tuple[str, ...] = ('modified_at',)
+    conditional_last_modified_actions: tuple[str, ...] = ('retrieve',)
+    conditional_count_fields: tuple[str, ...] = ('pk',)
+    conditional_volatile_filter: Q | None = None
+
+    request: Any
+    kwargs: dict[str, Any]
+    lookup_field: str
+    lookup_url_kwarg: str | None
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        list_action = super().list  # type: ignore[misc]
+        return self.conditional_response(self.get_conditional_queryset(), list_action, request, *args, **kwargs)
+
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_conditional_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        retrieve_action = super().retrieve  # type: ignore[misc]
+        return self.conditional_response(queryset, retrieve_action, request, *args, **kwargs)
+
+    def get_conditional_queryset(self) -> QuerySet:
+        """Возвращает отфильтрованный набор данных, по которому считается валидатор."""
+        return self.filter_queryset(self.get_queryset()).prefetch_related(None).order_by()  # type: ignore[attr-defined]
+
+    def get_conditional_validators(self, queryset: QuerySet) -> tuple[str | None, datetime | None]:
+        """
+        Считает ETag и дату последнего изменения набора данных одним агрегирующим запросом.
+
+        Возвращает:
+            tuple[str | None, datetime | None]: ETag и дату последнего изменения. Дата равна None для действий
+                не из `conditional_last_modified_actions` и для наборов с `conditional_volatile_filter`.
+                Если набор данных пуст, возвращается (None, None), и запрос выполняется как обычно.
+        """
+        fields = self.conditional_modified_fields + self.conditional_count_fields
+        distinct = any('__' in field for field in fields)
+        aggregates: dict[str, Any] = {
+            f'modified_{index}': Max(field) for index, field in enumerate(self.conditional_modified_fields)
+        }
+        aggregates |= {
+            f'count_{index}': Count(field, distinct=distinct)
+            for index, field in enumerate(self.conditional_count_fields)
+        }
+        if self.conditional_volatile_filter is not None:
+            aggregates['volatile'] = Count('pk', filter=self.conditional_volatile_filter, distinct=distinct)
+        values = queryset.aggregate(**aggregates)
+        if not values['count_0']:
+            return None, None
+        volatile_version = None
+        if values.pop('volatile', 0):
+            volatile_version = self.get_conditional_volatile_version()
+            if volatile_version is None:
+                return None, None
+        modified = [value for name, value in values.items() if name.startswith('modified_') and value is not None]
+        last_modified = max(modified) if modified else None
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        key = (
+            type(self).__name__,
+            getattr(self, 'action', None),
+            sorted(self.kwargs.items()),
+            sorted(self.request.query_params.lists()),
+            getattr(renderer, 'format', None),
+            self.request.user.pk,
+            [value.isoformat() if isinstance(value, datetime) else value for value in values.values()],
+            volatile_version,
+        )
+        etag = quote_etag(md5(repr(key).encode(), usedforsecurity=False).hexdigest())
+        if volatile_version is not None or getattr(self, 'action', None) not in self.conditional_last_modified_actions:
+            last_modified = None
+        return etag, last_modified
+
+    def get_conditional_volatile_version(self) -> str | None:
+        """
+        Возвращает номер версии данных вне базы данных, от которых зависит представление объектов
+        `conditional_volatile_filter`.
+
+        Возвращает:
+            str | None: Номер версии или None, если его не удалось получить: тогда запрос выполняется как обычно.
+        """
+        return None
+
+    def conditional_response(
+        self, queryset: QuerySet, action: Any, request: Request, *args: Any, **kwargs: Any
+    ) -> Response:
+        """Возвращает 304 Not Modified, если данные не изменились, иначе выполняет действие и добавляет заголовки."""
+        etag, last_modified = self.get_conditional_validators(queryset)
+        if etag is None:
+            return action(request, *args, **kwargs)
+        last_modified_timestamp = int(last_modified.timestamp()) if last_modified else None
+        conditional_response = get_conditional_response(request, etag=etag, last_modified=last_modified_timestamp)
+        if conditional_response is not None:
+            response = Response(status=conditional_response.status_code)
+        else:
+            response = action(request, *args, **kwargs)
+        if response.status_code == status.HTTP_304_NOT_MODIFIED or status.is_success(response.status_code):
+            response.headers['ETag'] = etag
+            if last_modified_timestamp is not None:
+                response.headers['Last-Modified'] = http_date(last_modified_timestamp)
+        return response
+
+
+class SyncWatermarkMixin:
+    """
+    Отдает в заголовке `X-Sync-Watermark` время, которое клиент передает следующим `modified_since`.
+
+    Дата изменения объекта ставится до фиксации транзакции, поэтому строка с датой раньше времени запроса
+    может стать видна уже после него. Клиент, взявший следующий `modified_since` по своим часам, такую строку
+    не получит. Водяной знак - время начала запроса на сервере минус `SYNC_WATERMARK_MARGIN` секунд:
+    изменения транзакций короче запаса попадают в следующую синхронизацию, а повторно полученные строки
+    клиент просто перезаписывает.
+
+    Атрибуты:
+        sync_watermark_actions (tuple[str, ...]): Действия, ответы которых содержат водяной знак.
+        sync_watermark_header (str): Заголовок ответа с водяным знаком.
+    """
+
+    sync_watermark_actions: tuple[str, ...] = ('list', 'deleted')
+    sync_watermark_header = 'X-Sync-Watermark'
+
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        self.sync_watermark = timezone.now() - timedelta(seconds=settings.SYNC_WATERMARK_MARGIN)
+        super().initial(request, *args, **kwargs)  # type: ignore[misc]
+
+    def finalize_response(self, request: Request, response: Response, *args: Any, **kwargs: Any) -> Response:
+        response = super().finalize_response(request, response, *args, **kwargs)  # type: ignore[misc]
+        watermark = getattr(self, 'sync_watermark', None)
+        action = getattr(self, 'action', None)
+        if watermark is not None and action in self.sync_watermark_actions and response.status_code < 400:
+            response[self.sync_watermark_header] = watermark.isoformat()
+        return response
@@ -1,7 +1,156 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import reduce
+from operator import or_
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
 from rest_framework.pagination import PageNumberPagination as RestFrameworkPageNumberPagination
+from rest_framework.pagination import _positive_int
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
 
 class PageNumberPagination(RestFrameworkPageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 500
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничная навигация по ключу (keyset pagination).
+
+    Вместо `OFFSET` и `COUNT(*)` следующая страница выбирается условием по значениям полей сортировки
+    последнего элемента предыдущей страницы, поэтому стоимость запроса не зависит от глубины страницы
+    и обслуживается индексом по полям сортировки.
+
+    Сортировка берется из атрибута `keyset_ordering` представления или из `ordering` пагинатора.
+    Поля сортировки должны быть полями модели без NULL, а их комбинация - уникальной
+    (последним полем обычно ставится `id`).
+
+    Курсор - это значения полей сортировки граничного элемента и направление, закодированные в base64.
+    Ответ содержит ссылки `next` и `previous` и список `results`, общее количество не считается.
+    """
+
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    ordering: tuple[str, ...] = ('-id',)
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view: APIView | None = None) -> list[Any]:
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.base_url = request.build_absolute_uri()
+        values, reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.reverse_ordering() if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.get_keyset_filter(values, reverse))
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_values = self.get_values(results[-1]) if results else None
+        self.previous_values = self.get_values(results[0]) if results else None
+        self.has_next = has_more if not reverse else values is not None
+        self.has_previous = has_more if reverse else values is not None
+        return results
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request: Request) -> int:
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or self.next_values is None:
+            return None
+        return self.encode_cursor(self.next_values, reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or self.previous_values is None:
+            return None
+        return self.encode_cursor(self.previous_values, reverse=True)
+
+    def reverse_ordering(self) -> tuple[str, ...]:
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def get_keyset_filter(self, values: list[Any], reverse: bool) -> Q:
+        """
+        Строит условие "строго после курсора" для лексикографической сортировки по нескольким полям.
+
+        Для сортировки (-opened_at, -id) условие имеет вид:
+        opened_at < v1 OR (opened_at = v1 AND id < v2).
+        """
+        conditions = []
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            condition = Q(**{f'{name}__{lookup}': values[index]})
+            for previous_field, previous_value in zip(self.ordering[:index], values[:index]):
+                condition &= Q(**{previous_field.lstrip('-'): previous_value})
+            conditions.append(condition)
+        return reduce(or_, conditions)
+
+    def get_values(self, instance: Model) -> list[Any]:
+        return [getattr(instance, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, values: list[Any], reverse: bool) -> str:
+        payload: dict[str, Any] = {'v': values}
+        if reverse:
+            payload['r'] = True
+        cursor = urlsafe_b64encode(json.dumps(payload, separators=(',', ':'), default=str).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request: Request, model: type[Model]) -> tuple[list[Any] | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            raw_values = payload['v']
+            if len(raw_values) != len(self.ordering):
+                raise ValueError('Cursor does not match ordering')
+            fields = [model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+            values = [field.to_python(value) for field, value in zip(fields, raw_values)]  # type: ignore[union-attr]
+        except (FieldDoesNotExist, KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload.get('r'))
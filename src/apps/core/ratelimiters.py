@@ -0,0 +1,99 @@
+from logging import getLogger
+from time import sleep
+from typing import cast
+
+from redis import Redis, RedisError, WatchError
+
+from apps.core.exceptions import RateLimitTimeoutError
+
+logger = getLogger('main')
+
+
+class RedisTokenBucket:
+    """
+    Ограничитель частоты запросов по алгоритму token bucket, общий для всех процессов через Redis.
+
+    Состояние ведра (количество токенов и время последнего пополнения) хранится в хэше Redis
+    и изменяется оптимистичной транзакцией (WATCH/MULTI), а время берется из Redis, поэтому
+    все процессы и серверы видят одно ведро и одни часы.
+
+    Токены резервируются в долг: если токенов не хватает, запрос все равно резервирует их, и вызывающий
+    ждет, пока ведро пополнится. Так запросы обслуживаются по очереди резервирования, каждый делает
+    одно обращение к Redis, а суммарная частота не превышает `rate` с запасом `capacity` на всплеск.
+
+    Если Redis недоступен, запросы не ограничиваются: лимит биржи защищает повтор с задержкой в клиенте.
+
+    Атрибуты:
+        redis (Redis): Клиент Redis.
+        key (str): Ключ хэша с состоянием ведра.
+        rate (float): Скорость пополнения, токенов в секунду.
+        capacity (float): Емкость ведра, максимальный всплеск запросов.
+        max_wait (float): Максимальное время ожидания токена в секундах.
+
+    Методы:
+        reserve(tokens: float = 1) -> float:
+            Резервирует токены и возвращает время ожидания до их появления.
+        acquire(tokens: float = 1) -> None:
+            Резервирует токены и ждет их появления.
+    """
+
+    def __init__(self, redis: Redis, key: str, rate: float, capacity: float, max_wait: float = 30) -> None:
+        self.redis = redis
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Резервирует токены и возвращает время ожидания до их появления в секундах.
+
+        Если ожидание превысило бы `max_wait`, токены не резервируются.
+
+        Аргументы:
+            tokens (float): Количество токенов.
+
+        Возвращает:
+            float: Время ожидания в секундах, 0 - токены доступны сразу.
+
+        Исключения:
+            RateLimitTimeoutError: Если ожидание превысило бы `max_wait`.
+        """
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.key)
+                    seconds, microseconds = cast(tuple[int, int], pipe.time())
+                    now = seconds + microseconds / 1_000_000
+                    state = cast(list[bytes | None], pipe.hmget(self.key, ['tokens', 'updated_at']))
+                    available = float(state[0]) if state[0] is not None else self.capacity
+                    updated_at = float(state[1]) if state[1] is not None else now
+                    available = min(self.capacity, available + max(0.0, now - updated_at) * self.rate) - tokens
+                    wait = max(0.0, -available) / self.rate
+                    if wait > self.max_wait:
+                        raise RateLimitTimeoutError(self.key, wait)
+                    pipe.multi()
+                    pipe.hset(self.key, mapping={'tokens': available, 'updated_at': now})
+                    pipe.expire(self.key, int((self.capacity + self.max_wait * self.rate) / self.rate) + 1)
+                    pipe.execute()
+                    return wait
+                except WatchError:
+                    continue
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Резервирует токены и ждет их появления.
+
+        Аргументы:
+            tokens (float): Количество токенов.
+
+        Исключения:
+            RateLimitTimeoutError: Если ожидание превысило бы `max_wait`.
+        """
+        try:
+            wait = self.reserve(tokens)
+        except RedisError:
+            logger.warning('Redis недоступен, запрос по ключу %s выполняется без ограничения частоты', self.key)
+            return
+        if wait:
+            sleep(wait)
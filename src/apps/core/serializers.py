@@ -0,0 +1,233 @@
+from datetime import datetime
+from operator import attrgetter
+from typing import Any, Callable
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models import Model
+from django.db.models.manager import BaseManager
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import Field, SkipField
+from rest_framework.relations import ManyRelatedField, PKOnlyObject, RelatedField
+from rest_framework.settings import api_settings
+
+Representation = Callable[[Any], dict[str, Any]]
+
+
+def is_plain_source(model: type[Model] | None, source_attrs: list[str]) -> bool:
+    """
+    Проверяет, что источник поля - цепочка обычных атрибутов модели, которую можно прочитать через `attrgetter`.
+
+    Подходят поля модели, прямые связи (последний элемент может быть и обратной связью) и свойства
+    в конце цепочки. Методы, словари и произвольные атрибуты читаются стандартным `Field.get_attribute`.
+    """
+    if model is None or not source_attrs:
+        return False
+    last_index = len(source_attrs) - 1
+    for index, attr in enumerate(source_attrs):
+        if model is None:
+            return False
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return index == last_index and isinstance(getattr(model, attr, None), property)
+        if not model_field.is_relation:
+            return index == last_index
+        if (model_field.one_to_many or model_field.many_to_many) and index != last_index:
+            return False
+        model = model_field.related_model  # type: ignore[assignment]
+    return True
+
+
+def compile_getter(field: Field, model: type[Model] | None) -> Callable[[Any], Any]:
+    """
+    Возвращает функцию чтения значения поля из объекта.
+
+    Для обычных атрибутов используется `attrgetter`, а при любой ошибке чтения значение повторно читается
+    через `Field.get_attribute`, чтобы сохранить поведение DRF (значение по умолчанию, None, SkipField).
+    """
+
+    def get_attribute(instance: Any) -> Any:
+        attribute = field.get_attribute(instance)
+        if isinstance(attribute, PKOnlyObject) and attribute.pk is None:
+            return None
+        return attribute
+
+    if isinstance(field, (RelatedField, ManyRelatedField)) or not is_plain_source(model, field.source_attrs):
+        return get_attribute
+    getter = attrgetter('.'.join(field.source_attrs))
+
+    def get_plain_attribute(instance: Any) -> Any:
+        try:
+            return getter(instance)
+        except (AttributeError, ObjectDoesNotExist):
+            return get_attribute(instance)
+
+    return get_plain_attribute
+
+
+def compile_to_representation(field: Field) -> Callable[[Any], Any]:
+    """
+    Возвращает функцию преобразования значения поля в представление.
+
+    `DateTimeField.to_representation` для каждого значения заново читает настройки формата и текущий
+    часовой пояс. Для формата ISO 8601 они читаются один раз при сборке, а для остальных случаев
+    (наивные даты, строки, другие форматы) используется метод поля.
+    """
+    if not isinstance(field, serializers.DateTimeField):
+        return field.to_representation
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    field_timezone: Any = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if field_timezone is None:
+        return field.to_representation
+
+    def represent_datetime(value: Any) -> Any:
+        if not isinstance(value, datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    return represent_datetime
+
+
+def compile_primary_key(field: Field, model: type[Model] | None) -> Callable[[Any], Any] | None:
+    """
+    Возвращает функцию чтения первичного ключа связанного объекта для `PrimaryKeyRelatedField`.
+
+    DRF в этом случае читает `<поле>_id` и возвращает его как есть, здесь то же значение читается напрямую
+    без создания `PKOnlyObject`. Для подклассов поля и полей с `pk_field` возвращается None.
+    """
+    if type(field) is not serializers.PrimaryKeyRelatedField or field.pk_field is not None or model is None:
+        return None
+    if len(field.source_attrs) != 1:
+        return None
+    try:
+        model_field = model._meta.get_field(field.source_attrs[0])
+    except FieldDoesNotExist:
+        return None
+    if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+        return None
+    return attrgetter(model_field.attname)  # type: ignore[union-attr]
+
+
+def has_default_representation(serializer: Field) -> bool:
+    """
+    Проверяет, что вложенный сериализатор строит представление стандартным методом DRF.
+
+    Только такой сериализатор можно развернуть функцией `compile_representation`: переопределенный
+    `to_representation` сериализатора или его `list_serializer_class` вызывается как есть.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        return type(serializer).to_representation in (
+            serializers.ListSerializer.to_representation,
+            CompiledListSerializer.to_representation,
+        )
+    return (
+        isinstance(serializer, serializers.Serializer)
+        and type(serializer).to_representation is serializers.Serializer.to_representation
+    )
+
+
+def compile_field(field: Field, model: type[Model] | None) -> Callable[[Any], Any]:
+    """Возвращает функцию, которая строит представление одного поля объекта."""
+    primary_key = compile_primary_key(field, model)
+    if primary_key is not None:
+        return primary_key
+    getter = compile_getter(field, model)
+    if isinstance(field, serializers.ListSerializer) and has_default_representation(field):
+        child = field.child
+        represent_child = (
+            compile_representation(child)  # type: ignore[arg-type]
+            if has_default_representation(child)  # type: ignore[arg-type]
+            else child.to_representation  # type: ignore[union-attr]
+        )
+
+        def represent_list(instance: Any) -> Any:
+            value = getter(instance)
+            if value is None:
+                return None
+            iterable = value.all() if isinstance(value, BaseManager) else value
+            return [represent_child(item) for item in iterable]
+
+        return represent_list
+
+    if has_default_representation(field):
+        to_representation = compile_representation(field)  # type: ignore[arg-type]
+    elif isinstance(field, serializers.BaseSerializer):
+        to_representation = field.to_representation
+    else:
+        to_representation = compile_to_representation(field)
+
+    def represent(instance: Any) -> Any:
+        value = getter(instance)
+        if value is None:
+            return None
+        return to_representation(value)
+
+    return represent
+
+
+def compile_representation(serializer: serializers.Serializer) -> Representation:
+    """
+    Собирает функцию представления объекта для сериализатора, дающую тот же результат, что `to_representation`.
+
+    Стандартный `Serializer.to_representation` для каждого объекта и каждого вложенного сериализатора
+    заново проходит по полям, разбирает источник и проверяет PKOnlyObject. Здесь это делается один раз:
+    для каждого поля заранее выбирается способ чтения значения, а вложенные сериализаторы разворачиваются
+    в такие же функции, если не переопределяют `to_representation` (см. `has_default_representation`).
+    Значения по-прежнему преобразуются методами `to_representation` полей,
+    поэтому форматы дат, чисел и выбора совпадают с исходным сериализатором.
+
+    Функция сохраняется в сериализаторе и собирается один раз на экземпляр.
+
+    Аргументы:
+        serializer (serializers.Serializer): Привязанный экземпляр сериализатора.
+
+    Возвращает:
+        Representation: Функция, которая принимает объект и возвращает словарь с его представлением.
+    """
+    compiled = getattr(serializer, '_compiled_representation', None)
+    if compiled is not None:
+        return compiled
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    steps = [(str(field.field_name), compile_field(field, model)) for field in serializer._readable_fields]
+
+    def represent(instance: Any) -> dict[str, Any]:
+        ret: dict[str, Any] = {}
+        for name, step in steps:
+            try:
+                ret[name] = step(instance)
+            except SkipField:
+                continue
+        return ret
+
+    serializer._compiled_representation = represent  # type: ignore[attr-defined]
+    return represent
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """Сериализатор списка, который строит представление элементов функцией из `compile_representation`."""
+
+    def to_representation(self, data: Any) -> list[dict[str, Any]]:
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        represent = compile_representation(self.child)  # type: ignore[arg-type]
+        return [represent(item) for item in iterable]
+
+
+class CompiledSerializerMixin:
+    """
+    Ускоряет чтение сериализатора без изменения его вывода.
+
+    Представление объекта строится функцией из `compile_representation`. Для списков в `Meta`
+    указывается `list_serializer_class = CompiledListSerializer`. Подходит для сериализаторов
+    только для чтения: поля и их форматирование берутся из исходного сериализатора.
+    """
+
+    def to_representation(self, instance: Any) -> dict[str, Any]:
+        return compile_representation(self)(instance)  # type: ignore[arg-type]
@@ -0,0 +1,36 @@
+from time import perf_counter
+from typing import Any
+
+from celery import Task
+from celery.signals import task_postrun, task_prerun, worker_process_shutdown
+
+from apps.core.metrics import metrics_registry
+
+celery_task_duration = metrics_registry.histogram(
+    'celery_task_duration_seconds',
+    'Время выполнения задач Celery по итоговому состоянию задачи.',
+    ('task', 'state'),
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+# Время начала выполняемых задач процесса по идентификаторам задач.
+task_started_at: dict[str, float] = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id: str, **kwargs: Any) -> None:
+    task_started_at[task_id] = perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id: str, task: Task, state: str | None = None, **kwargs: Any) -> None:
+    """Записывает время выполнения задачи и ее состояние: SUCCESS, FAILURE, RETRY."""
+    started_at = task_started_at.pop(task_id, None)
+    if started_at is not None:
+        celery_task_duration.observe(perf_counter() - started_at, task=task.name, state=state or 'UNKNOWN')
+
+
+@worker_process_shutdown.connect
+def flush_metrics(**kwargs: Any) -> None:
+    """Записывает метрики процесса воркера перед его завершением."""
+    metrics_registry.flush()
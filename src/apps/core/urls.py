@@ -1,9 +1,10 @@
 from django.urls import path
 
-from apps.core.views import HomeView
+from apps.core.views import HomeView, MetricsView
 
 app_name = 'core'
 
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
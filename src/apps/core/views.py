@@ -1,7 +1,36 @@
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views import View
 from django.views.generic import TemplateView
 
+from apps.core.metrics import metrics_registry
+
 
 class HomeView(TemplateView):
     """Главная страница сайта."""
 
     template_name = 'home.html'
+
+
+class MetricsView(View):
+    """
+    Метрики всех процессов в текстовом формате Prometheus.
+
+    Метрики доступны сотрудникам (`is_staff`) и, если задана настройка `METRICS_TOKEN`, запросам
+    с заголовком `Authorization: Bearer <токен>`. Без токена сборщик метрик доступа не получает.
+    """
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if not self.has_access(request):
+            return HttpResponseForbidden()
+        return HttpResponse(metrics_registry.collect(), content_type=self.content_type)
+
+    def has_access(self, request: HttpRequest) -> bool:
+        if request.user.is_staff:
+            return True
+        return bool(settings.METRICS_TOKEN) and constant_time_compare(
+            request.headers.get('Authorization', ''), f'Bearer {settings.METRICS_TOKEN}'
+        )
@@ -1,6 +1,13 @@
 import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from logging import Handler, LogRecord, getLogger
-from os import getenv
+from os import getenv, getpid, register_at_fork
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from time import monotonic
+from typing import Hashable
 
 import sqlparse
 from telebot import TeleBot
@@ -14,31 +21,213 @@ tg_logger = getLogger('telegram')
 main_logger = getLogger('main')
 
 
+@dataclass
+class CoalescedRecord:
+    """Запись лога, ожидающая отправки, и количество одинаковых записей за окно."""
+
+    text: str
+    record: LogRecord
+    count: int = 1
+
+
+QueuedRecord = tuple[Hashable, str, LogRecord]
+
+
 class TelegramHandler(Handler):
-    def __init__(self) -> None:
+    """
+    Обработчик логов, отправляющий записи в чат Telegram из фонового потока.
+
+    `emit` только форматирует запись и кладет ее в ограниченную очередь, поэтому поток, записавший ошибку
+    (например, обработчик запроса gunicorn), не ждет API Telegram и пауз antiflood. Если очередь заполнена,
+    запись отбрасывается, а количество отброшенных записей сообщается в чат со следующей отправкой.
+
+    Фоновый поток собирает записи в течение `window` секунд после первой полученной записи и отправляет
+    одинаковые записи (логгер, уровень, место в коде, сообщение и тип исключения) одним сообщением
+    с количеством повторов. Поток запускается при первой записи в каждом процессе, в том числе
+    в воркерах, созданных fork после загрузки приложения. `close` отправляет накопленные записи.
+
+    Атрибуты:
+        bot (TeleBot): Бот Telegram.
+        chat_id (str): Чат для ошибок.
+        window (float): Окно объединения одинаковых записей в секундах.
+        close_timeout (float): Максимальное время отправки накопленных записей при закрытии в секундах.
+        queue (Queue[QueuedRecord | None]): Очередь записей, ожидающих фонового потока.
+        dropped (int): Количество отброшенных записей с последней отправки.
+    """
+
+    def __init__(self, capacity: int = 1000, window: float = 10, close_timeout: float = 5) -> None:
         super().__init__()
         self.bot = log_bot
         self.chat_id = ERROR_CHAT_ID
         self.MAX_MESSAGE_LENGTH = MAX_MESSAGE_LENGTH
+        self.window = window
+        self.close_timeout = close_timeout
+        self.queue: Queue[QueuedRecord | None] = Queue(capacity)
+        self.dropped = 0
+        self._dropped_lock = Lock()
+        self._thread: Thread | None = None
+        self._pid: int | None = None
+        self._start_lock = Lock()
+        register_at_fork(after_in_child=self.reset)
 
     def emit(self, record: LogRecord) -> None:
-        log_entry = self.format(record)
-        for i in range(0, len(log_entry), self.MAX_MESSAGE_LENGTH):
-            antiflood(
-                self.bot.send_message,
-                self.chat_id,
-                log_entry[i : i + self.MAX_MESSAGE_LENGTH],
-            )
+        try:
+            entry = (self.get_key(record), self.format(record), record)
+        except Exception:
+            self.handleError(record)
+            return
+        self.start()
+        try:
+            self.queue.put_nowait(entry)
+        except Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def get_key(self, record: LogRecord) -> Hashable:
+        """Возвращает ключ, по которому одинаковые записи объединяются в одно сообщение."""
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        return record.name, record.levelno, record.pathname, record.lineno, record.getMessage(), exc_type
+
+    def start(self) -> None:
+        """Запускает фоновый поток, если он не запущен в текущем процессе."""
+        with self._start_lock:
+            if self._thread is not None and self._pid == getpid():
+                return
+            self._pid = getpid()
+            self._thread = Thread(target=self.listen, name='telegram-log-handler', daemon=True)
+            self._thread.start()
+
+    def reset(self) -> None:
+        """
+        Сбрасывает состояние процесса после fork.
+
+        Поток родителя не копируется, а очередь и блокировки могли быть скопированы заблокированными
+        другим потоком родителя, поэтому они создаются заново.
+        """
+        self._start_lock = Lock()
+        self._dropped_lock = Lock()
+        self.queue = Queue(self.queue.maxsize)
+        self.dropped = 0
+        self._thread = None
+        self._pid = None
+
+    def listen(self) -> None:
+        """Собирает записи из очереди и раз в окно отправляет их, пока не получит None."""
+        pending: dict[Hashable, CoalescedRecord] = {}
+        send_at: float | None = None
+        while True:
+            try:
+                entry = self.queue.get(timeout=None if send_at is None else max(send_at - monotonic(), 0))
+            except Empty:
+                self.send(pending)
+                pending, send_at = {}, None
+                continue
+            if entry is None:
+                self.send(pending)
+                return
+            key, text, record = entry
+            if key in pending:
+                pending[key].count += 1
+            else:
+                pending[key] = CoalescedRecord(text, record)
+            if send_at is None:
+                send_at = monotonic() + self.window
+
+    def send(self, pending: dict[Hashable, CoalescedRecord]) -> None:
+        """Отправляет накопленные записи и количество отброшенных записей."""
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        last_record = None
+        for coalesced in pending.values():
+            text = coalesced.text
+            if coalesced.count > 1:
+                text = f'{text}\n\nПовторов за {self.window:g} с: {coalesced.count}'
+            self.send_message(text, coalesced.record)
+            last_record = coalesced.record
+        if dropped and last_record is not None:
+            self.send_message(f'Очередь логов Telegram переполнена, отброшено записей: {dropped}', last_record)
+
+    def send_message(self, text: str, record: LogRecord) -> None:
+        for i in range(0, len(text), self.MAX_MESSAGE_LENGTH):
+            try:
+                antiflood(
+                    self.bot.send_message,
+                    self.chat_id,
+                    text[i : i + self.MAX_MESSAGE_LENGTH],
+                )
+            except Exception:
+                self.handleError(record)
+                return
+
+    def close(self) -> None:
+        """Отправляет накопленные записи, останавливает фоновый поток и закрывает обработчик."""
+        thread = self._thread
+        if thread is not None and self._pid == getpid() and thread.is_alive():
+            try:
+                self.queue.put(None, timeout=self.close_timeout)
+            except Full:
+                pass
+            thread.join(self.close_timeout)
+        self._thread = None
+        super().close()
+
+
+SQL_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_PLACEHOLDER = '%s'
+SQL_FORMAT_CACHE_SIZE = 1024
+
+
+def format_sql(sql: str) -> str:
+    """
+    Форматирует SQL-запрос для лога.
+
+    Строки и числа запроса заменяются заполнителями, и форматируется только полученный отпечаток запроса,
+    поэтому запросы, отличающиеся только значениями параметров, форматируются один раз.
+
+    Аргументы:
+        sql (str): SQL-запрос с подставленными параметрами.
+
+    Возвращает:
+        str: Отформатированный запрос.
+    """
+    if SQL_PLACEHOLDER in sql:
+        return format_sql_fingerprint(sql)
+    literals = SQL_LITERAL_RE.findall(sql)
+    parts = format_sql_fingerprint(SQL_LITERAL_RE.sub(SQL_PLACEHOLDER, sql)).split(SQL_PLACEHOLDER)
+    if len(parts) != len(literals) + 1:
+        return format_sql_fingerprint.__wrapped__(sql)
+    return ''.join(part + literal for part, literal in zip(parts, [*literals, '']))
+
+
+@lru_cache(maxsize=SQL_FORMAT_CACHE_SIZE)
+def format_sql_fingerprint(fingerprint: str) -> str:
+    """Форматирует отпечаток SQL-запроса, результат кэшируется для последних `SQL_FORMAT_CACHE_SIZE` отпечатков."""
+    return sqlparse.format(fingerprint, reindent=True, keyword_case='upper', indent_width=4)
+
+
+class FormattedSQL:
+    """SQL-запрос в аргументах записи лога, который форматируется при первом выводе записи."""
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self._formatted: str | None = None
+
+    def __str__(self) -> str:
+        if self._formatted is None:
+            self._formatted = format_sql(self.sql)
+        return self._formatted
 
 
 class SQLFormatterFilter(logging.Filter):
+    """
+    Форматирует SQL-запросы в записях `django.db.backends`.
+
+    Фильтр только подменяет запрос в аргументах записи на `FormattedSQL`, поэтому запрос форматируется,
+    когда обработчик выводит запись, и один раз для всех обработчиков.
+    """
+
     def filter(self, record: logging.LogRecord) -> bool:
-        formatted_message = record.getMessage()
-        record.msg = sqlparse.format(
-            formatted_message,
-            reindent=True,
-            keyword_case='upper',
-            indent_width=4,
-        )
-        record.args = ()
+        sql = getattr(record, 'sql', None)
+        if isinstance(sql, str) and isinstance(record.args, tuple):
+            record.args = tuple(FormattedSQL(sql) if arg is sql else arg for arg in record.args)
         return True
@@ -56,6 +56,8 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 # Конфигурация middleware
 # ======================================================
 MIDDLEWARE = [
+    'apps.core.middleware.RequestProfilingMiddleware',
+    'apps.core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +85,8 @@ DATABASES = {
         'HOST': getenv('SQL_HOST', 'localhost'),
         'PORT': getenv('SQL_PORT', '5432'),
         'ATOMIC_REQUESTS': True,
+        'CONN_MAX_AGE': int(getenv('CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -181,6 +185,37 @@ CELERY_RESULT_EXPIRES = 60
 BROKER_URL = f'{REDIS_URL}/0'
 BROKER_TRANSPORT_OPTIONS = {'visibility_timeout': 3600}
 
+CELERY_BEAT_SCHEDULE = {
+    'prune-tombstones': {
+        'task': 'apps.accounting.tasks.prune_tombstones',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+# ======================================================
+# Инкрементальная синхронизация
+# ======================================================
+# Отметки об удалении хранятся указанное количество дней, удаленные объекты за более ранний период не отдаются.
+TOMBSTONE_RETENTION_DAYS = int(getenv('TOMBSTONE_RETENTION_DAYS', 30))
+# Запас в секундах, на который водяной знак синхронизации меньше времени запроса: изменения транзакций,
+# которые короче запаса и фиксируются после запроса, попадают в следующую синхронизацию.
+SYNC_WATERMARK_MARGIN = float(getenv('SYNC_WATERMARK_MARGIN', 60))
+
+# ======================================================
+# Профилирование запросов
+# ======================================================
+REQUEST_PROFILING = int(getenv('REQUEST_PROFILING', 0))
+REQUEST_PROFILING_SLOW_MS = float(getenv('REQUEST_PROFILING_SLOW_MS', 500))
+REQUEST_PROFILING_MAX_QUERIES = int(getenv('REQUEST_PROFILING_MAX_QUERIES', 50))
+REQUEST_PROFILING_REPEATED_QUERIES = int(getenv('REQUEST_PROFILING_REPEATED_QUERIES', 5))
+
+# ======================================================
+# Метрики
+# ======================================================
+METRICS = int(getenv('METRICS', 1))
+METRICS_FLUSH_INTERVAL = float(getenv('METRICS_FLUSH_INTERVAL', 5))
+METRICS_TOKEN = getenv('METRICS_TOKEN', '')
+
 # ======================================================
 # Логирование
 # ======================================================